@@ -0,0 +1,24 @@
+"""
+group7_db 測試資料產生器。
+
+在放有 學系代碼表.csv / 課程_校碼3.csv 的目錄執行（輸出也寫在該目錄）：
+
+    PYTHONPATH=/path/to/db/init python -m light generate --scale-factor 10 --format copy --workers 4
+    python -m light load --scale-factor 10 --workers 4 --truncate   # 直接 COPY 進 docker-compose 的 db
+    python -m light generate --profile   # 另存各階段 cProfile；每次產生都會寫 run_report.json
+    python -m light generate --search-snapshot   # 另外輸出 student_search_mv 的快照與 load_student_search.sql
+    python -m light generate --delta-days 30     # 另外輸出之後 30 天每天的增量寫入 delta/day_NNNN.sql
+    python -m light generate --check-constraints   # 產生時就依 01_schema.sql 檢查每一列，違反時立刻中止
+    python -m light tables
+    python -m light validate
+    python -m light bench --scale-factors 1,10 --baseline bench_results.json   # 各階段 rows/sec / 記憶體
+
+也可以直接在程式中使用：
+
+    from light import config
+    from light.pipeline import run_generate
+    config.configure(scale_factor=2, output_format='tsv')
+    run_generate()
+
+import 本套件不會讀寫任何檔案，也不會載入 Faker / numpy。
+"""
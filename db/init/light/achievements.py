@@ -0,0 +1,157 @@
+"""
+成就相關表格：achievement、achievement_verification。
+兩者都在 Phase 2 的 shard 內串流產生，achievement 寫完一筆就交給 verification 使用。
+"""
+from datetime import datetime, timedelta
+
+from .config import TZ
+from .writers import ROW_TYPES
+
+AchievementRow = ROW_TYPES['achievement']
+AchievementVerificationRow = ROW_TYPES['achievement_verification']
+
+
+def generate_achievement_uuid(n):
+    """
+    生成固定前綴 + 序號的 UUID 字串
+    例如：
+      1 -> 00000000-0000-0000-0000-000000000001
+      2 -> 00000000-0000-0000-0000-000000000002
+    """
+    return f"00000000-0000-0000-0004-{n:012d}"
+
+def generate_achievements(students, index, rng, first_achievement=1):
+    """
+    每位學生的成就數（0~MAX_ACHIEVEMENTS_PER_STUDENT）在 Phase 1 已決定，
+    所以每個 shard 的第一個 achievement 編號可以事先算好。
+    """
+    achievement_data = first_achievement
+
+    for student, num_achievements in students:
+        entry_year = student['entry_year']  # ← 使用 student_profile 統一過的 entry_year
+        entry_date = datetime(entry_year + 1911, 9, 1, tzinfo=TZ)
+
+        for _ in range(num_achievements):
+
+            category = rng.choice([
+                'Competition', 'Research', 'Intern', 'Project', 'Others'
+            ])
+
+            # ---------- Title / Description ----------
+            if rng.random() < 0.5:
+                source = rng.choice(index.dept_names)
+            else:
+                source = rng.choice(index.company_names) if index.company_names else "某單位"
+
+            if category == 'Competition':
+                title = f"{source}競賽第{rng.randint(1, 10)}名"
+            elif category == 'Research':
+                title = f"{source}研究成果"
+            elif category == 'Intern':
+                title = f"{source}實習計畫"
+            elif category == 'Project':
+                title = f"{source}專案合作"
+            else:
+                title = f"{source}參與活動"
+
+            description = f"{title}相關說明。"
+
+            # ---------- Start / End Date 必須在入學之後 ----------
+            days_after_entry = rng.randint(30, 900)
+            start_date = entry_date + timedelta(days=days_after_entry)
+
+            # Intern / Project：end_date 可能比 creation_date 晚（ongoing）
+            if category in ['Intern', 'Project']:
+                end_date = start_date + timedelta(days=rng.randint(30, 200))
+            else:
+                # 一般活動：結束時間正常結束
+                end_date = start_date + timedelta(days=rng.randint(1, 90))
+
+            # ---------- creation_date 必須大於 start_date ----------
+            creation_date = start_date + timedelta(days=rng.randint(1, 30))
+            
+            # ---------- status ----------
+            r = rng.random()
+            if r < 0.05:
+                status = 'rejected'
+            elif r < 0.15:
+                status = 'unrecognized'
+            else:
+                status = 'recognized'
+            achievement_uuid = generate_achievement_uuid(achievement_data)
+            achievement_data += 1
+            yield AchievementRow(
+                achievement_id=achievement_uuid,  # <- 自動生成 UUID
+                user_id=student['user_id'],
+                category=category,
+                title=title,
+                description=description,
+                start_date=start_date.date(),     # DATE
+                end_date=end_date.date(),         # DATE
+                creation_date=creation_date,      # TIMESTAMP
+                status=status
+            )
+
+
+# ------------------ 寫 SQL ------------------
+
+def write_achievement_part(achievements, writer):
+    """
+    寫入 achievement，並把寫過的每一筆再 yield 出去，
+    讓 achievement_verification 可以接在後面串流產生，不必保留整份 achievements。
+    """
+    for a in achievements:
+        writer.write(a)
+        yield a
+
+
+def generate_achievement_verifications(achievements, index, rng, max_verifiers=3):
+    """
+    生成 achievement_verification 假資料（逐筆 yield）
+    verifier email 直接從 UserIndex 的 department / company email 抽
+    """
+    for ach in achievements:
+        num_verifiers = rng.randint(1, max_verifiers)
+        for i in range(num_verifiers):
+            # 隨機選 verifier type
+            verifier_type = rng.choice(['department', 'company', 'professor'])
+            
+            # verifier_email 模擬
+            if verifier_type == 'department':
+                emails = index.department_emails
+                verifier_email = rng.choice(emails) if emails else 'dept@example.com'
+            elif verifier_type == 'company':
+                emails = index.company_emails
+                verifier_email = rng.choice(emails) if emails else 'comp@example.com'
+            else:
+                verifier_email = f"prof{i}@example.com"
+
+            # 根據 achievement.status 設定 verification_status
+            if ach.status == 'recognized':
+                verification_status = 'approved'
+            elif ach.status == 'rejected':
+                # 至少有一個是 rejected
+                if i == 0:
+                    verification_status = 'rejected'
+                else:
+                    verification_status = rng.choice(['approved','rejected', 'pending'])
+            else:  # unrecognized
+                verification_status = rng.choice(['pending','approved'])
+
+            # created_at: achievement.created_at 後 2~3 分鐘
+            created_at = ach.creation_date + timedelta(minutes=rng.randint(2,3))
+
+            # decided_at: 只有 approved/rejected 才有
+            if verification_status in ['approved','rejected']:
+                decided_at = created_at + timedelta(minutes=rng.randint(1,10))
+            else:
+                decided_at = None
+
+            yield AchievementVerificationRow(
+                achievement_id=ach.achievement_id,
+                verifier_type=verifier_type,
+                verifier_email=verifier_email,
+                verification_status=verification_status,
+                created_at=created_at,
+                decided_at=decided_at
+            )
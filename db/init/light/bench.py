@@ -0,0 +1,381 @@
+"""
+效能基準測試：python -m light bench
+
+在暫存目錄中以多個 scale factor 依產生順序逐一執行各個階段（generate_* / write_*），
+記錄每個階段的筆數、wall time、rows/sec、寫出的 bytes 與 tracemalloc 峰值記憶體，輸出成 JSON。
+--baseline 指定上一次的 JSON 時逐階段比較 rows/sec，變慢超過 --tolerance 就回傳 1，可以直接放進 CI。
+
+ - 全部在單一 process 內執行，所有 shard 依序跑（--workers 不影響結果，量到的是單核效能）
+ - generate_* 的結果不寫檔、只逐筆消耗並計數；對應的 write_* 重新產生一次再寫檔
+   （與正式產生一樣是串流寫入），所以 write_* 的時間包含產生，兩者相減就是寫檔成本
+ - tracemalloc 會讓程式慢好幾倍，所以時間與記憶體分兩輪量：第一輪只計時，
+   第二輪從頭再跑一次（輸出完全相同）並開 tracemalloc 取各階段峰值；--no-memory 只跑第一輪
+"""
+import contextlib
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from types import SimpleNamespace
+
+from . import config
+from .config import CSV_FILENAME
+
+DEFAULT_SCALE_FACTORS = (1, 4)
+BENCH_FILE = 'bench_results.json'
+
+
+def _dir_bytes(path='.'):
+    return sum(e.stat().st_size for e in os.scandir(path) if e.is_file())
+
+def _count(iterable):
+    return sum(1 for _ in iterable)
+
+def _each_shard(task):
+    """依 shard 順序執行 task(shard, start, end)，回傳結果 list。"""
+    from .users import num_student_shards, shard_range
+    return [task(shard, *shard_range(shard)) for shard in range(num_student_shards())]
+
+
+# ---------------------------
+# 各個階段：stage(st) 執行一次並回傳筆數，需要留給下游的資料放在 st
+# ---------------------------
+def stage_generate_user_data(st):
+    from .users import UserIndex, StudentSpine, generate_user_data
+    st.supplier_users, st.department_data = generate_user_data(CSV_FILENAME)
+    st.index = UserIndex(st.supplier_users, st.department_data)
+    st.spine = StudentSpine(st.department_data)
+    return len(st.supplier_users)
+
+def stage_student_user_shard(st):
+    from .users import student_user_shard
+    st.student_results = _each_shard(lambda shard, start, end: student_user_shard(
+        shard, len(st.supplier_users) + 1, st.department_data))
+    for result in st.student_results:
+        st.spine.add_shard(result)
+    return len(st.spine)
+
+def stage_assign_student_numbers(st):
+    from .users import assign_student_numbers
+    assign_student_numbers(st.spine)
+    return len(st.spine)
+
+def stage_write_sql_file(st):
+    from .users import write_sql_file
+    return write_sql_file(st.index, st.student_results)
+
+def stage_write_department_profile_sql(st):
+    from .users import write_department_profile_sql
+    return write_department_profile_sql(st.department_data)
+
+def stage_write_company_profile_sql(st):
+    from .users import write_company_profile_sql
+    return write_company_profile_sql(st.index)
+
+def stage_write_user_application_sql(st):
+    from .pipeline import ADMIN_USER_ID
+    from .users import write_user_application_sql
+    return write_user_application_sql(st.index, ADMIN_USER_ID)
+
+def stage_write_student_profile_part(st):
+    from .users import write_student_profile_part
+    from .writers import stitch_parts
+
+    def write_shard(shard, start, end):
+        w = write_student_profile_part(st.spine, shard)
+        return {'shard': shard, 'parts': {'student_profile': w.count}}
+    return stitch_parts('student_profile', _each_shard(write_shard)).count
+
+def stage_generate_resources(st):
+    from .resources import generate_resources
+    st.resources = generate_resources(st.index, NUM_RESOURCE=config.NUM_RESOURCE)
+    return len(st.resources)
+
+def stage_write_resource_sql(st):
+    from .resources import write_resource_sql
+    return write_resource_sql(st.resources)
+
+def stage_generate_resource_conditions(st):
+    from .resources import generate_resource_conditions
+    return _count(generate_resource_conditions(st.resources, st.index))
+
+def stage_write_resource_condition_sql(st):
+    from .resources import generate_resource_conditions, write_resource_condition_sql
+    return write_resource_condition_sql(generate_resource_conditions(st.resources, st.index))
+
+def stage_generate_course_offerings(st):
+    from .courses import COURSE_CSV, read_course_names_from_csv, generate_course_offerings
+    st.course_offerings = generate_course_offerings(st.spine, read_course_names_from_csv(COURSE_CSV))
+    return sum(len(ids) for ids in st.course_offerings['course_id'])
+
+def _course_and_gpa(st, open_writer):
+    from .courses import generate_course_and_gpa
+    from .seeding import make_np_rng
+
+    def run_shard(shard, start, end):
+        course_writer = open_writer('student_course_record', shard)
+        gpa_writer = open_writer('student_gpa', shard)
+        with course_writer, gpa_writer:
+            gpa = generate_course_and_gpa(st.spine.iter_students(start, end), st.course_offerings,
+                                          course_writer, gpa_writer, make_np_rng('student_course_record', shard))
+        return {'shard': shard, 'gpa': gpa,
+                'parts': {'student_course_record': course_writer.count,
+                          'student_gpa': gpa_writer.count}}
+    return _each_shard(run_shard)
+
+def stage_generate_course_and_gpa(st):
+    from .writers import NullWriter, TABLE_SPECS
+    results = _course_and_gpa(st, lambda key, shard: NullWriter(TABLE_SPECS[key][0]))
+    st.gpa = [r['gpa'] for r in results]
+    return sum(count for r in results for count in r['parts'].values())
+
+def stage_write_student_course_record(st):
+    """選課與 GPA 沒有獨立的 write_* 函式（產生時直接寫入 writer），這裡量產生 + 寫 part 檔 + 接回，兩張表合計。"""
+    from .writers import open_table_writer, stitch_parts
+    results = _course_and_gpa(st, lambda key, shard: open_table_writer(key, part=shard))
+    return sum(stitch_parts(key, results).count for key in ('student_course_record', 'student_gpa'))
+
+def stage_match_eligibility(st):
+    """資格引擎：建規則表 + 全體學生的 bulk join（筆數為符合資格的 (學生, resource) 數）。"""
+    from .eligibility import EligibilityRules, concat_gpa
+    from .resources import generate_resource_conditions
+    rules = EligibilityRules(st.resources, st.index.dept_codes)
+    for _ in rules.collect(generate_resource_conditions(st.resources, st.index)):
+        pass
+    students, _ = rules.build().match(st.spine.dept_idx, *concat_gpa(st.gpa)).pairs()
+    return len(students)
+
+def stage_generate_student_department_records(st):
+    from .courses import generate_student_department_records
+    from .seeding import make_rng
+    return sum(_each_shard(lambda shard, start, end: _count(generate_student_department_records(
+        st.spine.iter_students(start, end), st.index, make_rng('student_department', shard)))))
+
+def stage_write_student_department_part(st):
+    from .courses import generate_student_department_records, write_student_department_part
+    from .seeding import make_rng
+    from .writers import stitch_parts
+
+    def write_shard(shard, start, end):
+        rows = generate_student_department_records(st.spine.iter_students(start, end), st.index,
+                                                   make_rng('student_department', shard))
+        w = write_student_department_part(rows, shard)
+        return {'shard': shard, 'parts': {'student_department': w.count}}
+    return stitch_parts('student_department', _each_shard(write_shard)).count
+
+def _achievements(st, shard, start, end):
+    from .achievements import generate_achievements
+    from .seeding import make_rng
+    return generate_achievements(zip(st.spine.iter_students(start, end), st.spine.num_achievements[start:end]),
+                                 st.index, make_rng('achievement', shard),
+                                 first_achievement=1 + sum(st.spine.num_achievements[:start]))
+
+def stage_generate_achievements(st):
+    return sum(_each_shard(lambda shard, start, end: _count(_achievements(st, shard, start, end))))
+
+def stage_write_achievement_part(st):
+    """achievement 與 achievement_verification 串流一起寫（與 pipeline 相同），兩張表的筆數合計。"""
+    from .achievements import write_achievement_part, generate_achievement_verifications
+    from .seeding import make_rng
+    from .writers import open_table_writer, stitch_parts
+
+    def write_shard(shard, start, end):
+        achievement_writer = open_table_writer('achievement', part=shard)
+        verification_writer = open_table_writer('achievement_verification', part=shard)
+        with achievement_writer, verification_writer:
+            for v in generate_achievement_verifications(
+                    write_achievement_part(_achievements(st, shard, start, end), achievement_writer),
+                    st.index, make_rng('achievement_verification', shard)):
+                verification_writer.write(v)
+        return {'shard': shard, 'parts': {
+            'achievement': achievement_writer.count,
+            'achievement_verification': verification_writer.count}}
+    results = _each_shard(write_shard)
+    return sum(stitch_parts(key, results).count for key in ('achievement', 'achievement_verification'))
+
+def stage_draw_applications(st):
+    from .resources import draw_applications
+    from .seeding import make_rng
+    st.application_results = _each_shard(lambda shard, start, end: {'applications': draw_applications(
+        st.spine, start, end, st.resources, make_rng('application', shard))})
+    return sum(len(r['applications']['student']) for r in st.application_results)
+
+def stage_generate_applications(st):
+    from .resources import generate_applications
+    return _count(generate_applications(st.spine, st.resources, st.application_results))
+
+def stage_write_application_sql(st):
+    from .resources import generate_applications, write_application_sql
+    return write_application_sql(generate_applications(st.spine, st.resources, st.application_results))
+
+def stage_plan_push_events(st):
+    from .push import plan_push_events
+    st.push_events = plan_push_events(st.spine, st.index, st.resources)
+    return len(st.push_events)
+
+def stage_generate_push_records(st):
+    from .push import generate_push_records
+    return _count(generate_push_records(st.spine, st.resources, st.push_events))
+
+def stage_write_push_record_sql(st):
+    from .push import generate_push_records, write_push_record_sql
+    return write_push_record_sql(generate_push_records(st.spine, st.resources, st.push_events))
+
+# 執行順序即資料相依順序（後面的階段會用到前面放進 st 的資料）
+STAGES = [
+    ('generate_user_data', stage_generate_user_data),
+    ('student_user_shard', stage_student_user_shard),
+    ('assign_student_numbers', stage_assign_student_numbers),
+    ('write_sql_file', stage_write_sql_file),
+    ('write_department_profile_sql', stage_write_department_profile_sql),
+    ('write_company_profile_sql', stage_write_company_profile_sql),
+    ('write_user_application_sql', stage_write_user_application_sql),
+    ('write_student_profile_part', stage_write_student_profile_part),
+    ('generate_resources', stage_generate_resources),
+    ('write_resource_sql', stage_write_resource_sql),
+    ('generate_resource_conditions', stage_generate_resource_conditions),
+    ('write_resource_condition_sql', stage_write_resource_condition_sql),
+    ('generate_course_offerings', stage_generate_course_offerings),
+    ('generate_course_and_gpa', stage_generate_course_and_gpa),
+    ('write_student_course_record', stage_write_student_course_record),
+    ('match_eligibility', stage_match_eligibility),
+    ('generate_student_department_records', stage_generate_student_department_records),
+    ('write_student_department_part', stage_write_student_department_part),
+    ('generate_achievements', stage_generate_achievements),
+    ('write_achievement_part', stage_write_achievement_part),
+    ('draw_applications', stage_draw_applications),
+    ('generate_applications', stage_generate_applications),
+    ('write_application_sql', stage_write_application_sql),
+    ('plan_push_events', stage_plan_push_events),
+    ('generate_push_records', stage_generate_push_records),
+    ('write_push_record_sql', stage_write_push_record_sql),
+]
+
+
+def measure(stage, st, memory=True):
+    """執行一個階段，回傳 {rows, wall_s, rows_per_s, bytes_written, peak_memory_bytes}。"""
+    before = _dir_bytes()
+    if memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        # 階段本身的進度訊息不印出來
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            rows = stage(st)
+        wall = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+    finally:
+        if memory:
+            tracemalloc.stop()
+    return {
+        'rows': rows,
+        'wall_s': round(wall, 6),
+        'rows_per_s': round(rows / wall, 1) if wall > 0 else None,
+        'bytes_written': _dir_bytes() - before,
+        'peak_memory_bytes': peak,
+    }
+
+def run_stages(stages=None, memory=False):
+    """從頭依序執行 STAGES（只跑到 stages 中最後一個），回傳 {階段: measure() 結果}。"""
+    st = SimpleNamespace()
+    names = [name for name, _ in STAGES]
+    last = max(names.index(s) for s in stages) if stages else len(STAGES) - 1
+    return {name: measure(stage, st, memory) for name, stage in STAGES[:last + 1]}
+
+def run_scale(scale_factor, memory=True, stages=None, **settings):
+    """以 scale_factor 在目前目錄量測各階段，回傳該 scale 的結果。"""
+    config.configure(scale_factor=scale_factor, **settings)
+    print(f"\n⏱️ scale factor {scale_factor:g}（{config.NUM_STUDENTS} 位學生、"
+          f"{config.NUM_COMPANIES} 間公司、{config.NUM_RESOURCE} 個 resource）")
+    timed = run_stages(stages)
+    peaks = run_stages(stages, memory=True) if memory else {}
+    results = []
+    for name, r in timed.items():
+        # 上游階段一定要跑（下游需要它的資料），但只記錄有指定的
+        if stages and name not in stages:
+            continue
+        if memory:
+            r['peak_memory_bytes'] = peaks[name]['peak_memory_bytes']
+        results.append(dict(stage=name, **r))
+        peak = f"，峰值 {r['peak_memory_bytes'] / (1 << 20):.1f} MB" if memory else ""
+        print(f"  {name:<38} {r['rows']:>10} 筆 {r['wall_s']:>9.3f}s "
+              f"{r['rows_per_s'] or 0:>12,.0f} rows/s{peak}")
+    return {
+        'scale_factor': scale_factor,
+        'num_students': config.NUM_STUDENTS,
+        'num_companies': config.NUM_COMPANIES,
+        'num_resource': config.NUM_RESOURCE,
+        'total_wall_s': round(sum(r['wall_s'] for r in results), 6),
+        'stages': results,
+    }
+
+def run_bench(scale_factors=DEFAULT_SCALE_FACTORS, output=BENCH_FILE, memory=True, stages=None, keep=False,
+              **settings):
+    """
+    在暫存目錄（複製目前目錄的輸入 CSV）依序跑每個 scale factor，結果寫到 output（相對於目前目錄）。
+    settings 直接傳給 config.configure()（output_format、seed、now、name_pools……）。
+    """
+    from .courses import COURSE_CSV
+    output = os.path.abspath(output)
+    settings['cache_dir'] = os.path.abspath(settings.get('cache_dir', config.CACHE_DIR))
+    workdir = tempfile.mkdtemp(prefix='light_bench_')
+    for name in (CSV_FILENAME, COURSE_CSV):
+        if os.path.exists(name):
+            shutil.copy(name, workdir)
+
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        runs = [run_scale(sf, memory=memory, stages=stages, **settings) for sf in scale_factors]
+    finally:
+        os.chdir(cwd)
+        if keep:
+            print(f"📁 輸出檔保留在 {workdir}")
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        'created_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'output_format': config.OUTPUT_FORMAT,
+        'seed': config.SEED,
+        'today': config.TODAY.isoformat(),
+        'name_pools': config.USE_NAME_POOLS,
+        'tracemalloc': memory,
+        'runs': runs,
+    }
+    tmp = output + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, output)
+    print(f"🎉 已寫入 {output}")
+    return report
+
+
+def compare_reports(report, baseline, tolerance=0.2):
+    """
+    逐 (scale factor, 階段) 比較 rows/sec，回傳變慢超過 tolerance 的 [(scale, 階段, 舊, 新)]。
+    兩邊都有的項目才比較；rows 為 0 的階段（沒有 rows/sec）略過。
+    """
+    old = {(run['scale_factor'], s['stage']): s['rows_per_s']
+           for run in baseline['runs'] for s in run['stages']}
+    regressions = []
+    for run in report['runs']:
+        for s in run['stages']:
+            before = old.get((run['scale_factor'], s['stage']))
+            after = s['rows_per_s']
+            if not before or not after:
+                continue
+            ratio = after / before
+            mark = '❌' if ratio < 1 - tolerance else '✅'
+            print(f"{mark} {run['scale_factor']:>6g}× {s['stage']:<38} {before:>12,.0f} → {after:>12,.0f} rows/s "
+                  f"({ratio - 1:+.1%})")
+            if ratio < 1 - tolerance:
+                regressions.append((run['scale_factor'], s['stage'], before, after))
+    return regressions
@@ -0,0 +1,122 @@
+"""
+增量產生（--incremental）用的 content hash。
+
+每張表的 hash 由下列內容決定：
+ - 產生它的模組原始碼（含共用的 config / seeding / writers / pipeline）
+ - 會影響它的執行參數（seed、參考日期、輸出格式、資料量……）與輸入 CSV 的內容
+ - 上游表（TABLE_DEPENDS）的 hash
+
+上次產生時的 hash 與輸出檔大小記在 {--cache-dir}/build_manifest.json，
+hash 沒變且檔案還在的表直接沿用，只重新產生有變動的表與其下游。
+例如改 NUM_RESOURCE 只會重建 resource / resource_condition / application / push_record。
+"""
+import hashlib
+import json
+import os
+
+from . import config
+from .config import CSV_FILENAME
+from .courses import COURSE_CSV
+from .writers import TABLE_SPECS, TABLE_DEPENDS, LOAD_ORDER, output_path
+
+MANIFEST_FILE = 'build_manifest.json'
+
+# 所有表共用的模組與參數
+COMMON_MODULES = ['config', 'seeding', 'writers', 'pipeline']
+COMMON_PARAMS = ['SEED', 'TODAY', 'OUTPUT_FORMAT']
+
+# key -> (產生它的模組, 另外會影響它的 config 參數, 輸入檔)
+TABLE_INPUTS = {
+    'user': (['users'], ['NUM_STUDENTS', 'NUM_COMPANIES', 'USE_NAME_POOLS'], [CSV_FILENAME]),
+    'department_profile': (['users'], [], []),
+    'student_profile': (['users'], [], []),
+    'company_profile': (['users'], [], []),
+    'user_application': (['users'], [], []),
+    'student_gpa': (['courses'], [], [COURSE_CSV]),
+    'student_course_record': (['courses'], [], [COURSE_CSV]),
+    'student_department': (['courses'], [], []),
+    'resource': (['resources'], ['NUM_RESOURCE', 'SKEW'], []),
+    'resource_condition': (['resources'], [], []),
+    'application': (['resources', 'eligibility', 'courses'], ['SKEW', 'ELIGIBLE_ONLY'], [COURSE_CSV]),
+    'achievement': (['achievements'], [], []),
+    'achievement_verification': (['achievements'], [], []),
+    'push_record': (['push', 'eligibility', 'courses'], ['SKEW', 'ELIGIBLE_ONLY'], [COURSE_CSV]),
+}
+
+def _file_digest(path):
+    h = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+    except FileNotFoundError:
+        h.update(b'<missing>')
+    return h.hexdigest()
+
+def _module_path(name):
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{name}.py")
+
+def table_hashes():
+    """依 LOAD_ORDER（上游在前）計算每張表的 content hash。"""
+    hashes = {}
+    for key in LOAD_ORDER:
+        modules, params, inputs = TABLE_INPUTS[key]
+        description = {
+            'table': key,
+            'modules': {m: _file_digest(_module_path(m)) for m in COMMON_MODULES + modules},
+            'params': {p: str(getattr(config, p)) for p in COMMON_PARAMS + params},
+            'inputs': {path: _file_digest(path) for path in inputs},
+            'upstream': {dep: hashes[dep] for dep in TABLE_DEPENDS[key]},
+        }
+        hashes[key] = hashlib.sha256(json.dumps(description, sort_keys=True).encode()).hexdigest()
+    return hashes
+
+def table_files(key):
+    """key 產生的檔案。"""
+    filename, table = TABLE_SPECS[key][:2]
+    return [output_path(filename, table)]
+
+def _manifest_path():
+    return os.path.join(config.CACHE_DIR, MANIFEST_FILE)
+
+def _load_manifest():
+    try:
+        with open(_manifest_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _is_fresh(entry, digest):
+    if not entry or entry.get('hash') != digest:
+        return False
+    for name, size in entry['files'].items():
+        if not os.path.exists(name) or os.path.getsize(name) != size:
+            return False
+    return True
+
+def plan_build(tables=None):
+    """
+    回傳 (hashes, stale)：stale 為需要重新產生的表（依 LOAD_ORDER），
+    tables 不為 None 時只考慮其中的表。
+    """
+    hashes = table_hashes()
+    entries = _load_manifest().get(os.getcwd(), {})
+    stale = [key for key in hashes
+             if (tables is None or key in tables) and not _is_fresh(entries.get(key), hashes[key])]
+    return hashes, stale
+
+def record_build(hashes, keys):
+    """把剛產生的表的 hash 與檔案大小寫進 manifest（先寫暫存檔再 rename）。"""
+    manifest = _load_manifest()
+    entries = manifest.setdefault(os.getcwd(), {})
+    for key in keys:
+        entries[key] = {
+            'hash': hashes[key],
+            'files': {name: os.path.getsize(name) for name in table_files(key)},
+        }
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    path = _manifest_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, path)
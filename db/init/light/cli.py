@@ -0,0 +1,239 @@
+"""
+命令列介面：python -m light <command>
+
+  generate   產生測試資料（insert_*.sql / merged.sql 等，輸出到目前目錄）
+  load       產生 tsv / binary 資料並以 COPY 平行載入 PostgreSQL
+  tables     列出所有表格、輸出檔名與 FK 依賴（依載入順序）
+  validate   檢查目前目錄的輸出檔並計算各表列數
+  bench      以多個 scale factor 量測各產生 / 寫入階段的 rows/sec、時間與記憶體，輸出 JSON
+
+只有 generate / load / bench 會 import Faker / numpy（load 另外需要 psycopg），其餘子指令不會載入它們。
+"""
+import argparse
+from datetime import date
+
+from . import config
+
+
+def parse_tables(value):
+    """--tables a,b,c → LOAD_ORDER 中的 key 的 list（快照表請用 --search-snapshot）。"""
+    from .writers import LOAD_ORDER
+    tables = [t.strip() for t in value.split(',') if t.strip()]
+    unknown = [t for t in tables if t not in LOAD_ORDER]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"未知的表格: {', '.join(unknown)}（可用 `python -m light tables` 查詢）")
+    return tables
+
+def parse_skew(value):
+    """--skew 1.1 → 三種對象都用 1.1；--skew resource=1.2,student=0.8 → 只設定指定的對象。"""
+    try:
+        if '=' not in value:
+            skew = {kind: float(value) for kind in config.SKEW_KINDS}
+        else:
+            skew = {}
+            for item in value.split(','):
+                kind, _, s = item.partition('=')
+                skew[kind.strip()] = float(s)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"skew 必須是數字: {value}")
+    unknown = set(skew) - set(config.SKEW_KINDS)
+    if unknown:
+        raise argparse.ArgumentTypeError(f"未知的 skew 對象: {', '.join(sorted(unknown))}"
+                                         f"（可用: {', '.join(config.SKEW_KINDS)}）")
+    if any(s < 0 for s in skew.values()):
+        raise argparse.ArgumentTypeError("skew 必須 >= 0")
+    return skew
+
+def parse_scale_factors(value):
+    """--scale-factors 1,10,100 → float 的 list。"""
+    try:
+        factors = [float(v) for v in value.split(',') if v.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"scale factor 必須是數字: {value}")
+    if not factors or any(f <= 0 for f in factors):
+        raise argparse.ArgumentTypeError("至少要一個大於 0 的 scale factor")
+    return factors
+
+def parse_stages(value):
+    """--stages a,b → bench.STAGES 中的階段名稱 list。"""
+    from .bench import STAGES
+    names = [name for name, _ in STAGES]
+    stages = [s.strip() for s in value.split(',') if s.strip()]
+    unknown = [s for s in stages if s not in names]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"未知的階段: {', '.join(unknown)}（可用: {', '.join(names)}）")
+    return stages
+
+def add_generate_arguments(gen, formats=config.OUTPUT_FORMATS, default_format='insert'):
+    """generate 與 load 共用的產生參數。"""
+    gen.add_argument('--scale-factor', type=float, default=1,
+                     help='資料量倍數：學生 500×N、公司 50×N、資源 200×N（預設 1）')
+    gen.add_argument('--format', choices=list(formats), default=default_format,
+                     help='輸出格式：insert = multi-row INSERT（預設）；'
+                          'copy = COPY ... FROM STDIN 區塊（仍是 .sql，可直接 psql / initdb 載入）；'
+                          'tsv = 每張表一個 .tsv，另產生 load_tsv.sql 用 \\copy 載入；'
+                          'binary = 同 tsv，但大表 (student_course_record / push_record / resource_condition) 改用 binary PGCOPY')
+    gen.add_argument('--verify-binary', action='store_true',
+                     help='binary 模式寫完後把每個 .pgcopy（含 shard 的 part 檔）的前 1000 筆解碼回來，'
+                          '與產生的資料逐欄比對（round-trip 檢查）')
+    gen.add_argument('--workers', type=int, default=1,
+                     help='平行產生學生相關資料的 process 數（預設 1）；不論幾個 worker 輸出都完全相同')
+    gen.add_argument('--seed', type=int, default=42,
+                     help='全域亂數種子；每個 (表, shard) 的亂數都由它衍生（預設 42）')
+    gen.add_argument('--now', type=date.fromisoformat, default=None,
+                     help='資料的「今天」(YYYY-MM-DD)，所有相對時間都以它為準（預設為執行當天）')
+    gen.add_argument('--name-pools', action='store_true',
+                     help='不逐筆呼叫 Faker：姓名 / email / 公司名從預先抽好的 pool 取樣（pool 快取在 --cache-dir），'
+                          'email 與 username 後綴改由序號換算，保證不重複')
+    gen.add_argument('--cache-dir', default='.light_cache',
+                     help='快取目錄（預設 .light_cache）')
+    gen.add_argument('--incremental', action='store_true',
+                     help='依各表的 content hash（產生程式、參數、seed、上游表）只重新產生有變動的表，'
+                          '其餘沿用上次的輸出（紀錄在 --cache-dir/build_manifest.json）')
+    gen.add_argument('--skew', type=parse_skew, default=None,
+                     help='Zipf 熱門度指數（0 = 均勻，預設）：resource = 申請集中在少數資源、'
+                          'supplier = 少數供應者擁有大部分資源（推播也跟著集中）、student = 推播集中在少數學生。'
+                          '單一數字套用到全部，或 resource=1.2,student=0.8')
+    gen.add_argument('--eligible-only', action='store_true',
+                     help='application / push_record 只從符合 resource_condition（系、GPA 門檻、is_poor）的'
+                          '(學生, resource) 中抽，規則與後端申請時的檢查相同')
+    gen.add_argument('--check-constraints', action='store_true',
+                     help='產生時就依 01_schema.sql 檢查每一列（NOT NULL、CHECK、長度、PK / UNIQUE、FK），'
+                          '違反時立刻中止並印出該列，不必等到載入資料庫才失敗')
+    gen.add_argument('--profile', action='store_true',
+                     help='每個階段各自以 cProfile 量測，存成 light_profile/NN_階段.prof（python -m pstats 開啟）')
+    gen.add_argument('--trace-memory', action='store_true',
+                     help='run_report.json 另外記錄各階段的 tracemalloc 峰值（只含主程序，產生會慢好幾倍）')
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m light',
+                                     description='產生 group7_db 測試資料 (insert_*.sql / merged.sql)')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    gen = sub.add_parser('generate', help='產生測試資料（輸出到目前目錄）')
+    add_generate_arguments(gen)
+    gen.add_argument('--compress', choices=list(config.COMPRESSIONS), default='none',
+                     help='merged.sql 直接壓縮輸出為 merged.sql.gz / merged.sql.zst（zstd 需要 zstandard 套件）')
+    gen.add_argument('--chunks', type=int, default=0,
+                     help='不產生 merged.sql，改為 chunks/：大表切成最多 N 個檔案，'
+                          '依 FK 層級以 chunks/load_chunks.sh 平行載入')
+    gen.add_argument('--tables', type=parse_tables, default=None,
+                     help='只輸出指定的表（逗號分隔，例如 user,push_record）；上游資料仍會在記憶體中產生，'
+                          '不會產生 merged.sql / load_tsv.sql')
+    gen.add_argument('--search-snapshot', action='store_true',
+                     help='另外輸出 student_search_mv 的快照表 student_search_snapshot'
+                          '（載入主資料後 psql -f load_student_search.sql），供 benchmark 直接查詢；'
+                          '後端仍查 student_search_mv，第一次搜尋照樣會 REFRESH，這張表不會讓後端的 view 變熱')
+    gen.add_argument('--delta-days', type=int, default=0,
+                     help='基礎資料之後再模擬 N 天的寫入（新申請、審核狀態、推播、本學期成績、resource 狀態），'
+                          '每天一個交易 delta/day_NNNN.sql，主資料載入後 sh delta/apply_delta.sh 依序套用')
+
+    load = sub.add_parser('load', help='產生 tsv / binary 資料並以 COPY 直接載入資料庫')
+    add_generate_arguments(load, formats=('tsv', 'binary'), default_format='binary')
+    load.add_argument('--dsn', default=None,
+                      help='PostgreSQL 連線字串（預設為 docker-compose 的 db 服務：127.0.0.1:6666/group7_db）')
+    load.add_argument('--jobs', type=int, default=4, help='同時載入的連線數（預設 4）')
+    load.add_argument('--truncate', action='store_true', help='載入前先 TRUNCATE 所有資料表')
+    load.add_argument('--no-defer-constraints', action='store_true',
+                      help='不暫時移除 PK / UNIQUE / FK 與索引，直接依 FK 順序載入（預設會延後到載入完再重建）')
+    load.add_argument('--no-generate', action='store_true', help='不重新產生，直接載入目前目錄已有的輸出檔')
+
+    sub.add_parser('tables', help='列出所有表格、輸出檔名與 FK 依賴')
+
+    val = sub.add_parser('validate', help='檢查輸出檔並計算各表列數')
+    val.add_argument('--dir', default='.', help='輸出目錄（預設為目前目錄）')
+
+    bench = sub.add_parser('bench', help='量測各產生 / 寫入階段的效能，結果寫成 JSON')
+    bench.add_argument('--scale-factors', type=parse_scale_factors, default=None,
+                       help='逗號分隔的 scale factor（預設 1,4；例如 1,10,100，push_record 約與 scale factor 平方成正比）')
+    bench.add_argument('--stages', type=parse_stages, default=None,
+                       help='只記錄指定的階段（逗號分隔）；上游階段仍會執行但不記錄')
+    bench.add_argument('--format', choices=list(config.OUTPUT_FORMATS), default='insert',
+                       help='write_* 階段使用的輸出格式（預設 insert）')
+    bench.add_argument('--seed', type=int, default=42, help='全域亂數種子（預設 42）')
+    bench.add_argument('--now', type=date.fromisoformat, default=None,
+                       help='資料的「今天」(YYYY-MM-DD)；要比較不同次的結果時請固定')
+    bench.add_argument('--name-pools', action='store_true', help='同 generate --name-pools')
+    bench.add_argument('--cache-dir', default='.light_cache', help='快取目錄（預設 .light_cache）')
+    bench.add_argument('--output', default='bench_results.json', help='結果 JSON（預設 bench_results.json）')
+    bench.add_argument('--no-memory', action='store_true',
+                       help='不量峰值記憶體（省下開 tracemalloc 重跑一輪的時間）')
+    bench.add_argument('--keep', action='store_true', help='保留暫存目錄中產生的輸出檔')
+    bench.add_argument('--baseline', default=None,
+                       help='與先前的結果 JSON 比較 rows/sec，有階段變慢超過 --tolerance 時回傳 1')
+    bench.add_argument('--tolerance', type=float, default=0.2,
+                       help='--baseline 容許的 rows/sec 下降比例（預設 0.2 = 20%%）')
+    return parser
+
+def configure_from_args(args, **extra):
+    config.configure(scale_factor=args.scale_factor, output_format=args.format, workers=args.workers,
+                     seed=args.seed, now=args.now, name_pools=args.name_pools, cache_dir=args.cache_dir,
+                     verify_binary=args.verify_binary, incremental=args.incremental,
+                     trace_memory=args.trace_memory, profile=args.profile, skew=args.skew,
+                     eligible_only=args.eligible_only, check_constraints=args.check_constraints, **extra)
+
+def cmd_generate(args):
+    if (args.compress != 'none' or args.chunks) and args.format in ('tsv', 'binary'):
+        build_parser().error("--compress / --chunks 只適用於 insert / copy 格式")
+    if args.delta_days < 0:
+        build_parser().error("--delta-days 必須 >= 0")
+    if args.delta_days and (args.tables or args.incremental):
+        build_parser().error("--delta-days 需要完整的基礎資料，不能與 --tables / --incremental 一起使用")
+    configure_from_args(args, tables=args.tables, compress=args.compress, chunks=args.chunks,
+                        search_snapshot=args.search_snapshot, delta_days=args.delta_days)
+    from .pipeline import run_generate
+    run_generate()
+    return 0
+
+def cmd_load(args):
+    configure_from_args(args)
+    if not args.no_generate:
+        from .pipeline import run_generate
+        run_generate()
+    from .load import DEFAULT_DSN, load_database
+    load_database(args.dsn or DEFAULT_DSN, jobs=max(1, args.jobs), truncate=args.truncate,
+                  defer_constraints=not args.no_defer_constraints)
+    return 0
+
+def cmd_tables(args):
+    from .writers import TABLE_SPECS, TABLE_DEPENDS, LOAD_ORDER
+    for key in LOAD_ORDER:
+        depends = ', '.join(TABLE_DEPENDS[key]) or '-'
+        print(f"{key:<26} {TABLE_SPECS[key][0]:<38} <- {depends}")
+    return 0
+
+def cmd_validate(args):
+    from .validate import validate_output
+    counts = validate_output(args.dir)
+    return 1 if any(n is None for n in counts.values()) else 0
+
+def cmd_bench(args):
+    import json
+    from .bench import DEFAULT_SCALE_FACTORS, run_bench, compare_reports
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)    # 先讀，--output 與 --baseline 同一個檔時才比得到舊結果
+    report = run_bench(args.scale_factors or DEFAULT_SCALE_FACTORS, output=args.output,
+                       memory=not args.no_memory, stages=args.stages, keep=args.keep,
+                       output_format=args.format, seed=args.seed, now=args.now,
+                       name_pools=args.name_pools, cache_dir=args.cache_dir)
+    if baseline is None:
+        return 0
+    regressions = compare_reports(report, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} 個階段的 rows/sec 下降超過 {args.tolerance:.0%}")
+        return 1
+    return 0
+
+COMMANDS = {
+    'generate': cmd_generate,
+    'load': cmd_load,
+    'tables': cmd_tables,
+    'validate': cmd_validate,
+    'bench': cmd_bench,
+}
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return COMMANDS[args.command](args)
@@ -0,0 +1,119 @@
+"""
+產生器的共用設定。
+
+固定常數直接定義在這裡；與執行參數有關的值（資料量、輸出格式、seed、參考日期……）
+由 configure() 設定，預設值與 CLI 相同。import 本模組不會讀寫任何檔案。
+其他模組一律以 config.NAME 讀取執行參數，configure() 之後馬上生效
+（--workers 的 worker 由 fork 產生，也會繼承同一份設定）。
+"""
+from datetime import date, datetime, timedelta, timezone
+
+# --- 1. 常數定義 ---
+# 設定時區為 UTC+8
+TZ = timezone(timedelta(hours=8))
+
+STUDENT_SHARD_SIZE = 5000   # 每個 shard 的學生數，固定值（與 worker 數無關，才能保證輸出一致）
+
+# 密碼 Hash 值 (ntu-test-2025)
+DEFAULT_PASSWORD_HASH = "$2b$10$mSAYMiRM1448LuLpBqQOHOJ8H0941/3Rc1a9bSRkPmFRJC6mDVQ9i"
+
+NUM_SOFT_DELETED_STUDENTS = 5
+NUM_SOFT_DELETED_COMPANIES = 5
+MAX_ACHIEVEMENTS_PER_STUDENT = 6
+
+SUFFIX_MULTIPLIER = 7919   # 質數，與 900000 互質（--name-pools 的 username 後綴）
+
+# 輸出格式與文件名
+OUTPUT_FORMATS = ('insert', 'copy', 'tsv', 'binary')
+COMPRESSIONS = ('none', 'gzip', 'zstd')
+SKEW_KINDS = ('resource', 'supplier', 'student')   # --skew 可設定熱門度的對象
+OUTPUT_SQL_FILE = 'insert_user_data.sql'
+CSV_FILENAME = '學系代碼表.csv'
+
+# --- 執行參數（configure() 設定） ---
+NOW = None
+TODAY = None
+SEED = 42
+WORKERS = 1
+SCALE_FACTOR = 1
+NUM_STUDENTS = 500
+NUM_COMPANIES = 50
+NUM_RESOURCE = 200
+OUTPUT_FORMAT = 'insert'
+VERIFY_BINARY = False
+USE_NAME_POOLS = False
+CACHE_DIR = '.light_cache'
+SELECTED_TABLES = None   # None = 全部；否則為要輸出的 TABLE_SPECS key 集合
+INCREMENTAL = False      # 只重新產生 content hash 有變的表（見 cache.py）
+COMPRESS = 'none'        # merged.sql 的壓縮方式（見 merge.py）
+CHUNKS = 0               # > 0 時改為輸出 chunks/，大表切成最多 CHUNKS 個可平行載入的檔案
+TRACE_MEMORY = False     # 各階段另外以 tracemalloc 記錄峰值（見 instrument.py）
+PROFILE = False          # 各階段另外以 cProfile 量測，存成 .prof
+SKEW = {kind: 0.0 for kind in SKEW_KINDS}   # Zipf 指數，0 = 均勻（見 seeding.popularity）
+SEARCH_SNAPSHOT = False  # 另外輸出 student_search_mv 的快照（見 search.py）
+ELIGIBLE_ONLY = False    # application / push_record 只從符合 resource_condition 的 (學生, resource) 抽（見 eligibility.py）
+DELTA_DAYS = 0           # > 0 時在基礎資料之後另外輸出 N 天的增量寫入 delta/（見 delta.py）
+CHECK_CONSTRAINTS = False   # 寫出的每一列先依 01_schema.sql 的約束檢查（見 constraints.py）
+
+
+def configure(scale_factor=1, output_format='insert', workers=1, seed=42, now=None,
+              name_pools=False, cache_dir='.light_cache', verify_binary=False, tables=None, incremental=False,
+              compress='none', chunks=0, trace_memory=False, profile=False, skew=None,
+              search_snapshot=False, eligible_only=False, delta_days=0, check_constraints=False):
+    """設定本次產生的參數（對應 CLI 的同名選項）。"""
+    global NOW, TODAY, SEED, WORKERS, SCALE_FACTOR, NUM_STUDENTS, NUM_COMPANIES, NUM_RESOURCE
+    global OUTPUT_FORMAT, VERIFY_BINARY, USE_NAME_POOLS, CACHE_DIR, SELECTED_TABLES, INCREMENTAL
+    global COMPRESS, CHUNKS, TRACE_MEMORY, PROFILE, SKEW, SEARCH_SNAPSHOT, ELIGIBLE_ONLY, DELTA_DAYS
+    global CHECK_CONSTRAINTS
+
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"未知的輸出格式: {output_format}")
+    if compress not in COMPRESSIONS:
+        raise ValueError(f"未知的壓縮方式: {compress}")
+    unknown = set(skew or {}) - set(SKEW_KINDS)
+    if unknown:
+        raise ValueError(f"未知的 skew 對象: {', '.join(sorted(unknown))}（可用: {', '.join(SKEW_KINDS)}）")
+    if any(s < 0 for s in (skew or {}).values()):
+        raise ValueError("skew 必須 >= 0")
+    if (compress != 'none' or chunks) and output_format in ('tsv', 'binary'):
+        raise ValueError("--compress / --chunks 只適用於 insert / copy 格式（merged.sql）")
+    if delta_days < 0:
+        raise ValueError("delta_days 必須 >= 0")
+    if delta_days and (tables or incremental):
+        raise ValueError("--delta-days 需要完整的基礎資料，不能與 --tables / --incremental 一起使用")
+
+    # 資料的參考時間：固定為某天 00:00，同一天重跑、不同 worker 數都會得到相同結果
+    today = now or datetime.now(TZ).date()
+    if isinstance(today, str):
+        today = date.fromisoformat(today)
+    NOW = datetime(today.year, today.month, today.day, tzinfo=TZ)
+    TODAY = NOW.date()
+
+    # 亂數：不使用全域 random / Faker.seed，每個 (表, shard) 各自衍生獨立的亂數流
+    SEED = seed
+    WORKERS = max(1, workers)
+
+    # 數量設定（依 --scale-factor 放大）
+    SCALE_FACTOR = scale_factor
+    NUM_STUDENTS = max(1, round(500 * scale_factor))
+    NUM_COMPANIES = max(5, round(50 * scale_factor))   # 至少 5 間（user_application 會抽 5 間公司）
+    NUM_RESOURCE = max(1, round(200 * scale_factor))
+
+    OUTPUT_FORMAT = output_format
+    VERIFY_BINARY = verify_binary
+    USE_NAME_POOLS = name_pools
+    CACHE_DIR = cache_dir
+    SELECTED_TABLES = frozenset(tables) if tables else None
+    INCREMENTAL = incremental
+    COMPRESS = compress
+    CHUNKS = max(0, chunks)
+    TRACE_MEMORY = trace_memory
+    PROFILE = profile
+    SKEW = {kind: float((skew or {}).get(kind, 0.0)) for kind in SKEW_KINDS}
+    SEARCH_SNAPSHOT = search_snapshot
+    ELIGIBLE_ONLY = eligible_only
+    DELTA_DAYS = delta_days
+    CHECK_CONSTRAINTS = check_constraints
+
+
+configure()
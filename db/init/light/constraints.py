@@ -0,0 +1,678 @@
+"""
+產生時的約束檢查（--check-constraints）：規則直接從 01_schema.sql 解析，資料列寫出的同時交給另一個 validator process 檢查，
+違反時立刻以 ConstraintViolation 中止並印出該列，不必等到載入 PostgreSQL 跑了幾分鐘才失敗。
+
+ - NOT NULL、VARCHAR(n) 長度、CHECK（IN (...) / BETWEEN / >= 等比較；NULL 視為通過，與 PostgreSQL 相同）
+ - PRIMARY KEY / UNIQUE：最近 KEY_CHUNK 個 key 原樣放在 dict（附原始列，重複時可以直接印出），
+   滿了只留 64-bit hash 在排序好的 numpy array（每個 key 16 bytes，含 key 在暫存檔的位置），key 本身寫到暫存檔；
+   array 分成大小成倍數的幾段，一樣大才合併，總成本 O(n log n)。
+   hash 相同時讀回原本的 key 比對，真的相同才算重複（hash 碰撞不會誤判）。含 NULL 的 key 不檢查（NULL 彼此不相等）
+ - SERIAL 主鍵（push_id）：產生時就依序配號，只檢查是否嚴格遞增，不必記住任何 key
+ - REFERENCES：上游表這次有輸出時，檢查值是否出現在上游寫過的 key 裡（上游一定比下游先寫）；
+   上游表這次沒有重新產生時（--tables、--incremental 沿用的表）從目前目錄的輸出檔讀回，找不到輸出檔時警告並在最後列出沒檢查的 FK。
+   被參照的都是上游的單一欄位 PK（user_id 等，會隨 scale factor 成長），直接查上游 PK 的 KeySet，不另外保存值；
+   只比 hash，不存在的值與某個 key 同 hash 時會漏報（機率約 n / 2^64），不會誤報
+ - 產生的欄位缺少沒有 DEFAULT 的 NOT NULL 欄位、或有 schema 沒有的欄位時，開始寫入前就中止
+
+主程序與 worker 的 writer.write() 不為了檢查多做任何事：每次 flush() 寫出 batch 時，把 batch 中已經編碼好的列
+（INSERT / COPY 文字或 PGCOPY bytes，也就是實際寫進檔案的內容）累積起來，滿 CHECK_BATCH 列經 pipe 送給 validator process；
+解碼與檢查（每張表與 row_encoder 一樣編成單一函式）全在 validator 中執行，與產生平行。validator 發現違反時記下訊息並設定旗標，
+各 process 下一次送出時就會拋出 ConstraintViolation。numpy 在第一次用到時才 import。
+"""
+import multiprocessing
+import os
+import pickle
+import re
+import tempfile
+
+from .writers import TABLE_SPECS, COLUMN_TYPES, LOAD_ORDER, table_selected, output_path, decode_pgcopy_rows
+from .validate import find_table_file, iter_rows, row_decoder
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '01_schema.sql')
+KEY_CHUNK = 1 << 15    # 每個 key 集合最近幾筆原樣放在 dict，滿了才併入排序好的 hash array
+CHECK_BATCH = 4096     # 每個 process 累積幾列才送給 validator 一次
+MESSAGE_SIZE = 1 << 16
+_FINISH = b''          # 主程序送出的結束標記
+
+_stream = None
+
+
+class ConstraintViolation(ValueError):
+    """產生的資料違反 01_schema.sql 的約束。"""
+
+
+# ---------------------------
+# 解析 01_schema.sql
+# ---------------------------
+class Column:
+    def __init__(self, name, pg_type, length=None):
+        self.name = name
+        self.type = pg_type          # 大寫的型別名稱（VARCHAR / UUID / SERIAL ...）
+        self.length = length         # VARCHAR(n) 的 n
+        self.not_null = False
+        self.has_default = False
+        self.checks = []             # (種類, 參數, 原文)
+        self.references = None       # (table, column)
+
+class TableSchema:
+    def __init__(self, name):
+        self.name = name
+        self.columns = {}
+        self.keys = []               # PRIMARY KEY / UNIQUE：(欄位 tuple, 原文)
+
+def _split_top_level(body):
+    """以不在括號內的逗號切開 CREATE TABLE 的內容。"""
+    items, depth, start = [], 0, 0
+    for k, ch in enumerate(body):
+        if ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            items.append(body[start:k].strip())
+            start = k + 1
+    items.append(body[start:].strip())
+    return [item for item in items if item]
+
+def _balanced(text, start):
+    """text[start] 為 '(' 時，回傳對應的 ')' 的位置。"""
+    depth = 0
+    for k in range(start, len(text)):
+        if text[k] == '(':
+            depth += 1
+        elif text[k] == ')':
+            depth -= 1
+            if depth == 0:
+                return k
+    raise ValueError(f"01_schema.sql 括號不成對: {text[start:start + 40]}")
+
+def _number(text):
+    return float(text) if '.' in text else int(text)
+
+def _parse_check(expr):
+    """CHECK(...) 的內容 → (欄位, 種類, 參數)；不支援的寫法回傳 None。"""
+    m = re.fullmatch(r"\s*(\w+)\s+IN\s*\((.*)\)\s*", expr, re.S | re.I)
+    if m:
+        return m.group(1), 'in', frozenset(re.findall(r"'([^']*)'", m.group(2)))
+    m = re.fullmatch(r"\s*(\w+)\s+BETWEEN\s+(-?[\d.]+)\s+AND\s+(-?[\d.]+)\s*", expr, re.I)
+    if m:
+        return m.group(1), 'between', (_number(m.group(2)), _number(m.group(3)))
+    m = re.fullmatch(r"\s*(\w+)\s*(>=|<=|>|<)\s*(-?[\d.]+)\s*", expr)
+    if m:
+        return m.group(1), m.group(2), _number(m.group(3))
+    return None
+
+def _parse_column(table, item):
+    m = re.match(r'("?\w+"?)\s+(\w+)(?:\s*\((\d+)\))?', item)
+    column = Column(m.group(1).strip('"'), m.group(2).upper(), int(m.group(3)) if m.group(3) else None)
+    rest = item[m.end():]
+    upper = rest.upper()
+    column.not_null = 'NOT NULL' in upper or 'PRIMARY KEY' in upper or column.type == 'SERIAL'
+    column.has_default = 'DEFAULT' in upper or column.type == 'SERIAL'
+    if 'PRIMARY KEY' in upper:
+        table.keys.append(((column.name,), f"PRIMARY KEY({column.name})"))
+    elif re.search(r'\bUNIQUE\b', upper):
+        table.keys.append(((column.name,), f"UNIQUE({column.name})"))
+    ref = re.search(r'REFERENCES\s+("?\w+"?)\s*\(\s*(\w+)\s*\)', rest, re.I)
+    if ref:
+        column.references = (ref.group(1).strip('"'), ref.group(2))
+    for check in re.finditer(r'CHECK\s*\(', rest, re.I):
+        open_paren = check.end() - 1
+        expr = rest[open_paren + 1:_balanced(rest, open_paren)]
+        parsed = _parse_check(expr)
+        if parsed is None:
+            print(f"⚠️ 略過無法解析的 CHECK: {table.name}.{column.name} CHECK({expr.strip()})")
+            continue
+        column.checks.append((parsed[1], parsed[2], f"CHECK({' '.join(expr.split())})"))
+    table.columns[column.name] = column
+
+def parse_schema(path=SCHEMA_FILE):
+    """解析 01_schema.sql，回傳 {table 名稱（不含引號）: TableSchema}。"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            text = re.sub(r'--[^\n]*', '', f.read())
+    except FileNotFoundError:
+        raise SystemExit(f"❌ --check-constraints 找不到 {path}")
+    tables = {}
+    for m in re.finditer(r'CREATE TABLE\s+("?\w+"?)\s*\(', text, re.I):
+        table = TableSchema(m.group(1).strip('"'))
+        body = text[m.end():_balanced(text, m.end() - 1)]
+        for item in _split_top_level(body):
+            upper = item.upper()
+            key = re.match(r'(?:CONSTRAINT\s+\w+\s+)?(PRIMARY KEY|UNIQUE)\s*\(([^)]*)\)', item, re.I)
+            if key:
+                columns = tuple(c.strip().strip('"') for c in key.group(2).split(','))
+                table.keys.append((columns, f"{key.group(1).upper()}({', '.join(columns)})"))
+                if key.group(1).upper() == 'PRIMARY KEY':
+                    for c in columns:
+                        table.columns[c].not_null = True
+            elif not upper.startswith(('CONSTRAINT', 'CHECK', 'FOREIGN KEY')):
+                _parse_column(table, item)
+        tables[table.name] = table
+    return tables
+
+
+# ---------------------------
+# key 集合
+# ---------------------------
+class KeySet:
+    """
+    一個 PRIMARY KEY / UNIQUE 的 key：最近的放在 recent（key -> 原始列），滿 KEY_CHUNK 筆後把 hash 排序成一段 run
+    （int64 array，附 key 在暫存檔的位置），key 本身 pickle 後附加到暫存檔。
+    runs 由大到小，新的一段與前一段一樣大時才合併（兩段都已排序，stable argsort 只需線性時間），
+    每個 hash 只會被搬動 log(n / KEY_CHUNK) 次，而不是每次 flush 都複製整個 array。
+    單一欄位的 key 被 REFERENCES 時，下游的 FK 直接查這個集合（missing()），不另外保存值。
+    """
+    def __init__(self, key, text):
+        self.key = key
+        self.text = text
+        self.recent = {}
+        self.runs = []         # [(排序好的 hash, 對應的暫存檔位置)]
+        self.spill = None
+
+    def __len__(self):
+        return sum(len(hashes) for hashes, _ in self.runs) + len(self.recent)
+
+    def duplicate(self, row, other):
+        table = TABLE_SPECS[self.key][1]
+        raise ConstraintViolation(f"❌ {table} 違反 {self.text}：{list(row)!r}（與先前的 {list(other)!r} 重複）")
+
+    def flush(self):
+        """recent 排序成新的一段 run：hash 已經出現過時讀回原本的 key 確認，真的重複才中止。"""
+        import numpy as np
+
+        if not self.recent:
+            return
+        keys = list(self.recent)
+        hashes = np.fromiter(map(hash, keys), dtype=np.int64, count=len(keys))
+        for seen, offsets in self.runs:
+            lo = np.searchsorted(seen, hashes, 'left')
+            hi = np.searchsorted(seen, hashes, 'right')
+            for i in np.flatnonzero(hi > lo):
+                for offset in offsets[lo[i]:hi[i]]:
+                    if self._read(int(offset)) == keys[i]:
+                        raise ConstraintViolation(f"❌ {TABLE_SPECS[self.key][1]} 違反 {self.text}："
+                                                  f"{list(self.recent[keys[i]])!r}（key 與先前寫出的資料重複）")
+        offsets = self._write(keys)
+        order = np.argsort(hashes, kind='stable')
+        self.runs.append((hashes[order], offsets[order]))
+        while len(self.runs) > 1 and len(self.runs[-2][0]) <= len(self.runs[-1][0]):
+            (h1, o1), (h2, o2) = self.runs[-2:]
+            hashes, offsets = np.concatenate((h1, h2)), np.concatenate((o1, o2))
+            order = np.argsort(hashes, kind='stable')
+            self.runs[-2:] = [(hashes[order], offsets[order])]
+        self.recent.clear()
+
+    def missing(self, values):
+        """
+        values 中不在集合裡的位置（FK 檢查）。recent 比對原值，之前的只比 64-bit hash：
+        不存在的值剛好與某個 key 同 hash 時會漏報，但不會把存在的值誤判為違反。
+        """
+        import numpy as np
+
+        hashes = np.fromiter(map(hash, values), dtype=np.int64, count=len(values))
+        found = np.zeros(len(values), dtype=bool)
+        for seen, _ in self.runs:
+            pos = np.minimum(np.searchsorted(seen, hashes), len(seen) - 1)
+            found |= seen[pos] == hashes
+        return [i for i in np.flatnonzero(~found).tolist() if values[i] not in self.recent]
+
+    def _write(self, keys):
+        """keys 依序附加到暫存檔（4 bytes 長度 + pickle），回傳各自的位置。"""
+        import numpy as np
+
+        if self.spill is None:
+            self.spill = tempfile.TemporaryFile(prefix='light_keys_')
+        start = self.spill.seek(0, os.SEEK_END)
+        blobs = [pickle.dumps(k, pickle.HIGHEST_PROTOCOL) for k in keys]
+        sizes = np.fromiter((len(b) + 4 for b in blobs), dtype=np.int64, count=len(blobs))
+        self.spill.write(b''.join(len(b).to_bytes(4, 'little') + b for b in blobs))
+        return start + np.cumsum(sizes) - sizes
+
+    def _read(self, offset):
+        self.spill.seek(offset)
+        size = int.from_bytes(self.spill.read(4), 'little')
+        return pickle.loads(self.spill.read(size))
+
+    def close(self):
+        if self.spill is not None:
+            self.spill.close()
+            self.spill = None
+
+
+# ---------------------------
+# 檢查函式（在 validator process 中執行）
+# ---------------------------
+class ConstraintValidator:
+    """
+    依 01_schema.sql 檢查各表的資料列。checker(key) 為該表編好的 check(row)（只編一次），
+    refs 為被 REFERENCES 的欄位（上游的單一欄位 PK）的 KeySet，上游表寫出時就是它的 PK 檢查用的集合；
+    ref_files 為這次沒有重新產生的上游表要讀回的輸出檔，skipped_refs 為找不到輸出檔、沒辦法檢查的上游欄位。
+    recent 找不到的 FK 值先記在 pending，每段資料檢查完再以 numpy 一次比對 hash。
+    """
+    def __init__(self, schema, ref_files=None, skipped_refs=()):
+        self.schema = schema
+        self.keysets = {}      # (key, 第幾個 key) -> KeySet
+        self.refs = {}         # (table, column) -> KeySet
+        self.pending = []      # (等待比對的列, 欄位位置, KeySet, fail, 說明)
+        self.checkers = {}
+        self.rows = 0
+        self.ref_files = ref_files or {}
+        self.skipped_refs = set(skipped_refs)
+        self.table_keys = {TABLE_SPECS[key][1].strip('"'): key for key in TABLE_SPECS}
+        for table in schema.values():
+            for column in table.columns.values():
+                parent = column.references
+                if parent and parent not in self.refs:
+                    texts = {columns: text for columns, text in schema[parent[0]].keys}
+                    self.refs[parent] = KeySet(self.table_keys[parent[0]],
+                                               texts.get((parent[1],), f"REFERENCES {parent[0]}({parent[1]})"))
+
+    def load_refs(self):
+        """從輸出檔讀回這次沒有重新產生的上游表被參照的值（與產生時一樣經過 PK 檢查）。"""
+        for (table, column), path in self.ref_files.items():
+            key = self.table_keys[table]
+            i = TABLE_SPECS[key][2].index(column)
+            keyset = self.refs[(table, column)]
+            for row in iter_rows(path, key):
+                value = row[i]
+                if value in keyset.recent:
+                    keyset.duplicate(row, keyset.recent[value])
+                keyset.recent[value] = row
+                if len(keyset.recent) >= KEY_CHUNK:
+                    keyset.flush()
+
+    def check(self, segments):
+        """檢查寫入端送來的一批 (key, kind, 編碼好的資料列)，見 ValidationStream.sync()。"""
+        for key, kind, data in segments:
+            check = self.checker(key)
+            types = COLUMN_TYPES[key]
+            if kind == 'binary':
+                rows = decode_pgcopy_rows(data, types, TABLE_SPECS[key][1])
+            else:
+                rows = map(row_decoder(kind, tuple(types)), data.split('\x00'))
+            for row in rows:
+                check(row)
+                self.rows += 1
+            self.check_refs()
+
+    def check_refs(self):
+        """比對 pending 中的 FK 值：recent 之外的值以 hash 批次查上游的 KeySet。"""
+        for rows, i, keyset, fail, message in self.pending:
+            if rows:
+                missing = keyset.missing([row[i] for row in rows])
+                bad = rows[missing[0]] if missing else None
+                rows.clear()
+                if bad is not None:
+                    fail(bad, message)
+
+    def checker(self, key):
+        """key 表的 check(row)；不在 schema 裡的表為 None。"""
+        if key not in self.checkers:
+            self.checkers[key] = self._compile(key)
+        return self.checkers[key]
+
+    def columns(self, key):
+        """
+        key 表在 schema 中的 TableSchema 與輸出欄位（不在 schema 裡的表回傳 None）；
+        輸出了 schema 沒有的欄位、或缺少沒有 DEFAULT 的 NOT NULL 欄位時中止。
+        """
+        table_name = TABLE_SPECS[key][1].strip('"')
+        schema = self.schema.get(table_name)
+        if schema is None:
+            return None    # 不在 schema 裡的表（student_search_mv 快照）
+        columns = TABLE_SPECS[key][2]
+        unknown = [name for name in columns if name not in schema.columns]
+        if unknown:
+            raise ConstraintViolation(f"❌ {table_name} 沒有欄位 {', '.join(unknown)}（01_schema.sql）")
+        missing = [c.name for c in schema.columns.values() if c.not_null and not c.has_default and c.name not in columns]
+        if missing:
+            raise ConstraintViolation(f"❌ {table_name} 沒有輸出 NOT NULL 欄位 {', '.join(missing)}（01_schema.sql）")
+        return schema, columns
+
+    def _compile(self, key):
+        """
+        產生 check(row)。所有欄位的檢查合成一個 or 條件，成立時才交給 explain(row) 逐項找出違反哪一條；
+        例如 student_gpa 相當於
+            def check(row):
+                v0, v1, v2, = row
+                if v0 is None or v1 is None or len(v1) > 10 or v2 is not None and not (0 <= v2 <= 4.3):
+                    explain(row)
+                if v0 not in ref0: pend0.append(row)
+                k = (v0, v1)
+                if k in recent0: dup0(row, recent0[k])
+                recent0[k] = row
+                if len(recent0) >= KEY_CHUNK: flush0()
+        """
+        found = self.columns(key)
+        if found is None:
+            return None
+        schema, columns = found
+        table_name = schema.name
+        position = {name: i for i, name in enumerate(columns)}
+
+        namespace = {'fail': self._fail(table_name), 'KEY_CHUNK': KEY_CHUNK}
+        unpack = f"{''.join(f'v{i}, ' for i in range(len(columns)))}= row"
+        tests = []       # (條件, 違反時的說明)；NOT NULL 排在同一欄的其他檢查之前
+        ref_lines = []
+        key_lines = []
+
+        for i, name in enumerate(columns):
+            column = schema.columns[name]
+            v = f"v{i}"
+            # NOT NULL 的欄位在 or 條件中已先檢查過 is None，之後的條件不必再判斷
+            guard = '' if column.not_null else f"{v} is not None and "
+            if column.not_null:
+                tests.append((f"{v} is None", f"{name} NOT NULL"))
+            if column.length:
+                tests.append((f"{guard}len({v}) > {column.length}", f"{name} VARCHAR({column.length})"))
+            for kind, arg, text in column.checks:
+                if kind == 'in':
+                    namespace[f"allowed{i}"] = arg
+                    tests.append((f"{guard}{v} not in allowed{i}", f"{name} {text}"))
+                elif kind == 'between':
+                    tests.append((f"{guard}not ({arg[0]!r} <= {v} <= {arg[1]!r})", f"{name} {text}"))
+                else:
+                    tests.append((f"{guard}not ({v} {kind} {arg!r})", f"{name} {text}"))
+            parent = column.references
+            if parent and parent not in self.skipped_refs:
+                keyset = self.refs[parent]
+                namespace[f"ref{i}"] = keyset.recent
+                namespace[f"pend{i}"] = pending = []
+                self.pending.append((pending, i, keyset, namespace['fail'],
+                                     f"{name} REFERENCES {parent[0]}({parent[1]})（上游沒有這個值）"))
+                ref_lines.append(f"if {guard}{v} not in ref{i}: pend{i}.append(row)")
+
+        for k, (key_columns, text) in enumerate(schema.keys):
+            if any(c not in position for c in key_columns):
+                continue    # key 欄位由資料庫產生（DEFAULT uuid_generate_v4() 等）
+            vs = [f"v{position[c]}" for c in key_columns]
+            if len(vs) == 1 and schema.columns[key_columns[0]].type == 'SERIAL':
+                namespace[f"last{k}"] = [float('-inf')]
+                tests.append((f"{vs[0]} <= last{k}[0]", f"{text}（SERIAL 必須遞增）"))
+                key_lines.append(f"last{k}[0] = {vs[0]}")
+                continue
+            keyset = self.keysets.get((key, k))
+            if keyset is None:
+                keyset = self.refs.get((table_name, key_columns[0])) if len(key_columns) == 1 else None
+                if keyset is None:
+                    keyset = KeySet(key, text)
+                self.keysets[(key, k)] = keyset
+            namespace.update({f"recent{k}": keyset.recent, f"dup{k}": keyset.duplicate, f"flush{k}": keyset.flush})
+            nullable = [v for v, c in zip(vs, key_columns) if not schema.columns[c].not_null]
+            indent = '    ' if nullable else ''
+            if nullable:
+                key_lines.append(f"if {' and '.join(f'{v} is not None' for v in nullable)}:")
+            key_lines.append(f"{indent}k = {vs[0] if len(vs) == 1 else '(' + ', '.join(vs) + ')'}")
+            key_lines.append(f"{indent}if k in recent{k}: dup{k}(row, recent{k}[k])")
+            key_lines.append(f"{indent}recent{k}[k] = row")
+            key_lines.append(f"{indent}if len(recent{k}) >= KEY_CHUNK: flush{k}()")
+
+        lines = ["def explain(row):", f"    {unpack}"]
+        lines += [f"    if {test}: fail(row, {message!r})" for test, message in tests]
+        lines += ["def check(row):", f"    {unpack}"]
+        if tests:
+            lines.append(f"    if ({' or '.join(test for test, _ in tests)}):")
+            lines.append("        explain(row)")
+        lines += [f"    {line}" for line in ref_lines + key_lines]
+        if not tests and not ref_lines and not key_lines:
+            lines.append("    pass")
+        exec('\n'.join(lines) + '\n', namespace)
+        return namespace['check']
+
+    @staticmethod
+    def _fail(table_name):
+        def fail(row, message):
+            raise ConstraintViolation(f"❌ {table_name} 違反 {message}：{list(row)!r}")
+        return fail
+
+    def finish(self):
+        """把最後一批 key 併入並檢查，回傳統計（列數、表數、key 集合數、key 數）。"""
+        try:
+            for keyset in self.keysets.values():
+                keyset.flush()
+            return {'rows': self.rows,
+                    'tables': sum(1 for check in self.checkers.values() if check is not None),
+                    'keysets': len(self.keysets),
+                    'keys': sum(len(keyset) for keyset in self.keysets.values())}
+        finally:
+            for keyset in [*self.keysets.values(), *self.refs.values()]:
+                keyset.close()
+
+
+def _run_validator(validator, conn, result, failed, message):
+    """
+    validator process：依序檢查各 process 送來的資料列。發現違反後記下訊息、設定 failed，
+    之後只收不檢查（寫入端不會卡在 pipe 上），收到結束標記再把統計或錯誤訊息送回主程序。
+    """
+    error = None
+    try:
+        validator.load_refs()
+    except Exception as e:
+        error = f"❌ --check-constraints 讀取上游表的輸出檔失敗：{e}"
+    if error:
+        message.value = error.encode('utf-8')[:MESSAGE_SIZE - 1]
+        failed.set()
+    while True:
+        data = conn.recv_bytes()
+        if data == _FINISH:
+            break
+        if error:
+            continue
+        try:
+            validator.check(pickle.loads(data))
+        except Exception as e:
+            error = str(e) if isinstance(e, ConstraintViolation) else f"❌ --check-constraints 檢查失敗：{e!r}"
+            message.value = error.encode('utf-8')[:MESSAGE_SIZE - 1]
+            failed.set()
+    if error is None:
+        try:
+            result.send(('ok', validator.finish()))
+            return
+        except Exception as e:
+            error = str(e) if isinstance(e, ConstraintViolation) else f"❌ --check-constraints 檢查失敗：{e!r}"
+    result.send(('error', error))
+
+
+# ---------------------------
+# 寫入端（主程序與 worker）
+# ---------------------------
+class ValidationStream:
+    """
+    validator process 與送資料過去的 pipe。主程序在 start_validation() 建立，fork 出的 worker 直接繼承。
+    writers 為這個 process 開著的 writer（[LOAD_ORDER 順序, key, writer, 已送出幾列]），
+    送的是 writer batch 中已經編碼好的列（不必為了檢查另外複製或 pickle 每一列的值），
+    pending 為這個 process 還沒送出的 (key, kind, data)。
+    """
+    def __init__(self, validator):
+        ctx = multiprocessing.get_context('fork')
+        recv, self.conn = ctx.Pipe(duplex=False)
+        self.result, result_send = ctx.Pipe(duplex=False)
+        self.lock = ctx.Lock()
+        self.failed = ctx.Event()
+        self.message = ctx.Array('c', MESSAGE_SIZE, lock=False)
+        self.writers = []
+        self.pending = []
+        self.pending_rows = 0
+        self.pid = os.getpid()
+        self.schema = validator.schema
+        self.skipped_refs = sorted(validator.skipped_refs)
+        self.process = ctx.Process(target=_run_validator, name='light-check-constraints', daemon=True,
+                                   args=(validator, recv, result_send, self.failed, self.message))
+        self.process.start()
+        recv.close()
+        result_send.close()
+
+    def add(self, key, kind, rows):
+        """rows（writer 的 batch，一列一個 str / bytes）接成一段：文字格式以 NUL 分隔（PostgreSQL 的文字不會有 NUL）。"""
+        self.pending.append((key, kind, b''.join(rows) if kind == 'binary' else '\x00'.join(rows)))
+        self.pending_rows += len(rows)
+
+    def sync(self):
+        """
+        把這個 process 所有 writer 還沒送出的列加進 pending。依 LOAD_ORDER（FK 順序）排列，
+        上游 writer 還留在 batch 中的列一定排在參照它的下游列之前（例如同一個 shard 的 achievement 與 verification）。
+        """
+        for entry in self.writers:
+            batch = entry[2].batch
+            if len(batch) > entry[3]:
+                self.add(entry[1], entry[2].kind, batch[entry[3]:])
+                entry[3] = len(batch)
+
+    def send(self):
+        """送出這個 process 累積的資料；validator 已經發現違反時拋出 ConstraintViolation。"""
+        if self.pending:
+            data = pickle.dumps(self.pending, pickle.HIGHEST_PROTOCOL)
+            self.pending = []
+            self.pending_rows = 0
+            with self.lock:
+                self.conn.send_bytes(data)
+        if self.failed.is_set():
+            raise ConstraintViolation(self.violation())
+
+    def violation(self):
+        return self.message.value.decode('utf-8', errors='ignore')
+
+    def finish(self):
+        """送出最後一批並等 validator 檢查完，回傳統計；有違反時拋出 ConstraintViolation。"""
+        self.sync()
+        self.send()
+        with self.lock:
+            self.conn.send_bytes(_FINISH)
+        try:
+            status, value = self.result.recv()
+        except EOFError:
+            raise ConstraintViolation(f"❌ --check-constraints 的 validator process 異常結束（exit code {self.process.exitcode}）")
+        self.process.join()
+        if status != 'ok':
+            raise ConstraintViolation(value)
+        return value
+
+    def close(self):
+        if self.process.is_alive():
+            self.process.terminate()
+        self.process.join()
+        self.conn.close()
+        self.result.close()
+
+
+def _selected_tables(schema):
+    """這次有輸出、而且在 schema 裡的表。"""
+    names = {TABLE_SPECS[key][1].strip('"') for key in TABLE_SPECS if table_selected(key)}
+    return [table for name, table in schema.items() if name in names]
+
+def _parent_sources(schema):
+    """
+    選到的表參照、但這次沒有重新產生的上游表：回傳 ({(table, column): 輸出檔}, 找不到輸出檔的 (table, column))。
+    先找目前 --format 的輸出檔，再找其他格式的（validate.find_table_file）。
+    """
+    table_keys = {TABLE_SPECS[key][1].strip('"'): key for key in TABLE_SPECS}
+    files, skipped = {}, []
+    parents = sorted({column.references for table in _selected_tables(schema) for column in table.columns.values()
+                      if column.references})
+    for table, column in parents:
+        key = table_keys[table]
+        if table_selected(key):
+            continue
+        path = output_path(*TABLE_SPECS[key][:2])
+        if not os.path.exists(path):
+            path = find_table_file(key)
+        if path is None:
+            skipped.append((table, column))
+        else:
+            files[(table, column)] = path
+    return files, skipped
+
+def _fk_text(schema, parents):
+    """選到的表中參照 parents 的 FK 欄位，例如 push_record.receiver_id → user(user_id)。"""
+    return '、'.join(f"{table.name}.{column.name} → {column.references[0]}({column.references[1]})"
+                     for table in _selected_tables(schema) for column in table.columns.values()
+                     if column.references in parents)
+
+def start_validation():
+    """
+    依 01_schema.sql 開始這次產生的檢查：先確認選到的表欄位都對得上，再開 validator process，
+    之後 open_table_writer() 開的 writer 寫出的每一列都會送過去檢查。
+    """
+    global _stream
+    schema = parse_schema()
+    ref_files, skipped = _parent_sources(schema)
+    validator = ConstraintValidator(schema, ref_files, skipped)
+    for key in TABLE_SPECS:
+        if table_selected(key):
+            validator.columns(key)
+    for table, column in skipped:
+        print(f"⚠️ --check-constraints：{table} 這次沒有產生、目前目錄也沒有它的輸出檔，"
+              f"不檢查 {_fk_text(schema, {(table, column)})}")
+    if ref_files:
+        print(f"🔎 FK 的上游從輸出檔讀回：{', '.join(sorted(set(os.path.basename(p) for p in ref_files.values())))}")
+    _stream = ValidationStream(validator)
+    return _stream
+
+def finish_validation():
+    """等 validator 檢查完所有資料列並印出結果，回傳檢查的列數；有違反時拋出 ConstraintViolation。"""
+    summary = _stream.finish()
+    text = (f"{summary['rows']} 列、{summary['tables']} 張表、"
+            f"{summary['keysets']} 組 PRIMARY KEY / UNIQUE、{summary['keys']} 個 key")
+    if _stream.skipped_refs:
+        print(f"⚠️ 約束檢查通過（{text}），但沒有檢查 FK：{_fk_text(_stream.schema, set(_stream.skipped_refs))}")
+    else:
+        print(f"✅ 約束檢查通過：{text}")
+    return summary['rows']
+
+def stop_validation():
+    """結束 validator process（中途失敗時直接終止）。"""
+    global _stream
+    stream, _stream = _stream, None
+    if stream is not None and stream.pid == os.getpid():
+        stream.close()
+
+def flush_checks():
+    """送出這個 process 累積的資料列（fork worker 之前，worker 才不會重複送出主程序的列）。"""
+    if _stream is not None:
+        _stream.sync()
+        _stream.send()
+
+def _checked(key):
+    return _stream is not None and TABLE_SPECS[key][1].strip('"') in _stream.schema
+
+def attach_checks(key, writer):
+    """
+    writer 每次 flush() 寫出 batch 之前，先把 batch 中的列送給 validator（沒有在檢查或表不在 schema 裡時不變）。
+    write() 本身不變，每列不多任何動作。
+    """
+    if not _checked(key):
+        return writer
+    stream = _stream
+    entry = [LOAD_ORDER.index(key), key, writer, 0]
+    stream.writers.append(entry)
+    stream.writers.sort(key=lambda e: e[0])
+    flush, close = writer.flush, writer.close
+
+    def checked_flush():
+        stream.sync()
+        flush()
+        entry[3] = len(writer.batch)
+        if stream.pending_rows >= CHECK_BATCH:
+            stream.send()
+
+    def checked_close():
+        close()
+        stream.writers.remove(entry)
+
+    writer.flush = checked_flush
+    writer.close = checked_close
+    return writer
+
+def check_rows(key, kind, rows):
+    """直接送出一批編碼好的列（delta 的一天）。"""
+    if _checked(key) and rows:
+        _stream.add(key, kind, rows)
+        if _stream.pending_rows >= CHECK_BATCH:
+            _stream.send()
+
+def checked_shard_task(task, shard):
+    """worker 執行 shard：結束時送出這個 shard 剩下的資料列（主程序拿到結果時，validator 已經收到全部的列）。"""
+    result = task(shard)
+    flush_checks()
+    return result
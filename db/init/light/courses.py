@@ -0,0 +1,359 @@
+"""
+課程相關表格：student_course_record、student_gpa、student_department。
+
+課程 offering（各學期的 course_id / credit / course_name）只在主程序產生一次，各 shard 共用；
+選課與 GPA 以 numpy 向量化計算，numpy 在第一次用到時才 import。
+
+輸入檔案依賴：
+ - 課程名稱 CSV：`課程_校碼3.csv`（第 5 欄，index=4）
+
+主要規則：
+ - 不指定每個 course_id 的最少人數或上限。
+ - 每個學期生成 COURSE_IDS_PER_SEM 個 *全域唯一* 的 course_id（不同學期不得重複）。
+ - course_id 格式為 3 個英文字母 + 5 位數字（例如 ABC01234）。
+ - 每個 course_id 綁定固定的 credit（從 [2,3,4] 中隨機選）與一個 course_name（來自課程 CSV）。
+ - 每位學生於其應有的每個 semester 必須至少達到 MIN_CREDIT_PER_STUDENT_PER_SEM 學分（同一學期不重複同一 course_id）。
+ - 分數隨機從集合 [0, 1.7, 2.0, 2.3, 2.7, 3.0, 3.3, 3.7, 4.0, 4.3] 選取。
+ - GPA 為該學期的加權平均（score * credit / sum(credit)），四捨五入到小數點第三位。
+ - 當前學期視為 ROC 114-1，**不**包含在生成範圍內。
+"""
+import csv
+import random
+import string
+from datetime import datetime
+
+from .config import TZ
+from .eligibility import gpa_aggregates
+from .seeding import make_rng, derive_seed
+from .writers import ROW_TYPES, open_table_writer
+
+StudentDepartmentRow = ROW_TYPES['student_department']
+
+# ---------------------------
+# 可調參數（如需修改請在此調整）
+# ---------------------------
+COURSE_CSV = '課程_校碼3.csv'                 # 課程名稱 CSV（第5欄）
+COURSE_IDS_PER_SEM = 50               # 每個學期產生的 course_id 數量（全域唯一）
+MIN_CREDIT_PER_STUDENT_PER_SEM = 10      # 每位學生每學期至少學分
+COURSE_CREDIT_CHOICES = [2, 3, 4]        # course_id 的 credit 從此集合隨機選
+SCORE_CHOICES = [0, 1.7, 2.0, 2.3, 2.7, 3.0, 3.3, 3.7, 4.0, 4.3]
+# 目前學期設定（固定）：114-1 不包含
+CURRENT_ROC_YEAR = 114
+CURRENT_SEM_NO = 1
+LAST_COMPLETED_ROC_YEAR = CURRENT_ROC_YEAR - 1
+CURRENT_SEMESTER = f"{CURRENT_ROC_YEAR}-{CURRENT_SEM_NO}"   # 基礎資料不含；--delta-days 時成績陸續公布
+# ---------------------------
+
+def read_course_names_from_csv(filename):
+    names = []
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            for row in reader:
+                if len(row) >= 5:
+                    name = row[4].strip()
+                    if name:
+                        names.append(name)
+    except FileNotFoundError:
+        print(f"錯誤: 找不到 {filename}，將使用 fallback course names。")
+    # 去重保留順序
+    seen = set()
+    uniq = []
+    for n in names:
+        if n not in seen:
+            uniq.append(n)
+            seen.add(n)
+    if not uniq:
+        # fallback
+        uniq = [f"Course_{i}" for i in range(1, 1001)]
+        print("警告: 使用 fallback 課程名稱清單（Course_1..Course_1000）。")
+    return uniq
+
+
+# ---------------------------
+# 產生 course_id（3 個英文大寫 + 5 位數字），確保全域唯一
+# ---------------------------
+
+COURSE_ID_SPACE = 26 ** 3 * 100000   # AAA00000 ~ ZZZ99999
+
+class CourseIdAllocator:
+    """
+    以 seeded Feistel 置換把流水號 0, 1, 2, ... 一對一映射到 course_id 空間，
+    每個 id O(1) 產生、保證不重複，不需要保留已用過的 id 集合，也沒有碰撞重抽。
+    Feistel 作用在 32-bit 上（2^32 >= COURSE_ID_SPACE），落在空間外就再置換一次（cycle walking）。
+    """
+    HALF_BITS = 16
+    HALF_MASK = (1 << HALF_BITS) - 1
+    ROUNDS = 4
+
+    def __init__(self, seed):
+        rng = random.Random(seed)
+        self.keys = [rng.getrandbits(32) for _ in range(self.ROUNDS)]
+        self.next_index = 0
+
+    def _round(self, half, key):
+        x = ((half ^ key) * 0x45D9F3B) & 0xFFFFFFFF
+        return (x ^ (x >> 16)) & self.HALF_MASK
+
+    def _permute(self, x):
+        left, right = x >> self.HALF_BITS, x & self.HALF_MASK
+        for key in self.keys:
+            left, right = right, left ^ self._round(right, key)
+        return (left << self.HALF_BITS) | right
+
+    def allocate(self):
+        if self.next_index >= COURSE_ID_SPACE:
+            raise ValueError("course_id 空間已用完")
+        n = self._permute(self.next_index)
+        while n >= COURSE_ID_SPACE:
+            n = self._permute(n)
+        self.next_index += 1
+
+        letters, digits = divmod(n, 100000)
+        a, rest = divmod(letters, 26 * 26)
+        b, c = divmod(rest, 26)
+        return f"{string.ascii_uppercase[a]}{string.ascii_uppercase[b]}{string.ascii_uppercase[c]}{digits:05d}"
+
+# ---------------------------
+# 計算每位學生應該存在的 semester（B / R 規則，與你指定一致）
+# 假設 student dict 有 'student_id' 與 'registered_at'（datetime）
+# ---------------------------
+
+def semester_list_for_student(user):
+    # 尋找 level
+    sid = user.get('student_id', '')
+    level = 'B'
+    if sid and sid[0] in ('B', 'R'):
+        level = sid[0]
+    # 以 registered_at 的年分推 entry_year
+    reg = user.get('registered_at')
+    if reg is None:
+        # 若沒有 registered_at，退回以 student_id 的年碼推（若有）
+        # 否則假設 entry_year = CURRENT_ROC_YEAR - 1
+        entry_year = CURRENT_ROC_YEAR - 1
+    else:
+        entry_year = reg.year - 1911
+    semesters = []
+    if level == 'B':
+        start = entry_year
+        end = LAST_COMPLETED_ROC_YEAR
+        for y in range(start, end + 1):
+            semesters.append(f"{y}-1")
+            semesters.append(f"{y}-2")
+    else:
+        # R: undergraduate period (entry_year-4 .. entry_year-1) + graduate period (entry_year .. LAST_COMPLETED)
+        ug_start = entry_year - 4
+        ug_end = entry_year - 1
+        for y in range(max(0, ug_start), ug_end + 1):
+            semesters.append(f"{y}-1")
+            semesters.append(f"{y}-2")
+        for y in range(entry_year, LAST_COMPLETED_ROC_YEAR + 1):
+            semesters.append(f"{y}-1")
+            semesters.append(f"{y}-2")
+    # filter out any sem with year > LAST_COMPLETED
+    semesters = [s for s in semesters if int(s.split('-')[0]) <= LAST_COMPLETED_ROC_YEAR]
+    # sort
+    semesters = sorted(semesters, key=lambda s: (int(s.split('-')[0]), int(s.split('-')[1])))
+    return semesters
+
+# ---------------------------
+# 主要生成程序
+# ---------------------------
+
+def generate_course_offerings(spine, course_name_candidates):
+    """
+    收集所有學生出現過的 semester，並為每個 semester 產生 COURSE_IDS_PER_SEM 個 course_id（且全域唯一）。
+    只在主程序執行一次，結果由各 shard 共用。course_name 從 course_name_candidates（read_course_names_from_csv）抽。
+    """
+    if not len(spine):
+        raise ValueError('找不到任何學生，請確認 student_spine 是否已由 student_user_shard 填入。')
+
+    # semester 只由 (學制, 註冊年) 決定，不必逐位學生展開
+    all_semesters = set()
+    for level, reg_year in {(spine.level[i], spine.registered_at(i).year) for i in range(len(spine))}:
+        all_semesters.update(semester_list_for_student({
+            'student_id': chr(level),
+            'registered_at': datetime(reg_year, 1, 1, tzinfo=TZ),
+        }))
+
+    semesters_sorted = sorted(all_semesters, key=lambda s: (int(s.split('-')[0]), int(s.split('-')[1])))
+    print(f"將處理 {len(spine)} 位學生，跨 {len(semesters_sorted)} 個學期。")
+
+    return _build_offerings(semesters_sorted, course_name_candidates, make_rng('course_offering'),
+                            CourseIdAllocator(derive_seed('course_id')))
+
+def generate_semester_offerings(offerings, semester, course_name_candidates):
+    """
+    在 offerings 之後加開一個學期（--delta-days 的 CURRENT_SEMESTER）：course_id 接著 offerings 已配出的流水號往下配，
+    與既有課程仍不重複。回傳只含這個學期的 offerings，格式與 generate_course_offerings() 相同。
+    """
+    course_id_allocator = CourseIdAllocator(derive_seed('course_id'))
+    course_id_allocator.next_index = sum(len(ids) for ids in offerings['course_id'])
+    return _build_offerings([semester], course_name_candidates, make_rng(f"course_offering:{semester}"),
+                            course_id_allocator)
+
+def _build_offerings(semesters, course_name_candidates, rng, course_id_allocator):
+    import numpy as np
+
+    course_ids = []     # [學期][課程] -> course_id
+    course_names = []   # [學期][課程] -> course_name
+    credits = []        # [學期][課程] -> credit
+
+    for sem in semesters:
+        sem_ids, sem_names, sem_credits = [], [], []
+        for _ in range(COURSE_IDS_PER_SEM):
+            sem_ids.append(course_id_allocator.allocate())
+            sem_credits.append(rng.choice(COURSE_CREDIT_CHOICES))
+            sem_names.append(rng.choice(course_name_candidates))
+        course_ids.append(sem_ids)
+        course_names.append(sem_names)
+        credits.append(sem_credits)
+        print(f"學期 {sem} 已生成 {len(sem_ids)} 門課程。")
+
+    # columnar：credit 做成 (學期數, COURSE_IDS_PER_SEM) 的矩陣，選課時整批 fancy indexing
+    return {
+        'semesters': semesters,
+        'sem_index': {sem: k for k, sem in enumerate(semesters)},
+        'course_id': course_ids,
+        'course_name': course_names,
+        'credit': np.array(credits, dtype=np.int64),
+    }
+
+def generate_course_and_gpa(students, offerings, course_writer, gpa_writer, rng, summary=None,
+                            semesters=semester_list_for_student):
+    """
+    向量化選課：一次處理一批學生的所有 (學生, 學期) group。
+     1. 每個 group 以亂數 key argsort 打亂該學期的課程順序
+     2. 依序取課直到學分 >= MIN_CREDIT_PER_STUDENT_PER_SEM
+        （取課前累計學分仍未達門檻的課都會被選到，等同原本的 while 迴圈）
+     3. 分數從 SCORE_CHOICES 抽樣
+     4. GPA = bincount(score * credit) / bincount(credit)，以 group 編號為 key
+    rng 為 numpy Generator（make_np_rng）。
+    summary（search.SearchSummary）不為 None 時另外記下每位學生修過的課與各學期 GPA。
+    semesters(學生) 決定每位學生要產生的學期（預設為 semester_list_for_student，都必須在 offerings 裡）。
+    回傳這批學生的 (avg_gpa, current_gpa) array（eligibility.gpa_aggregates，與 student_gpa_view 相同）。
+    """
+    import numpy as np
+
+    group_uid = []
+    group_sem = []
+    group_student = []
+    num_students = 0
+    for u in students:
+        for sem in semesters(u):
+            group_uid.append(u['user_id'])
+            group_sem.append(offerings['sem_index'][sem])
+            group_student.append(num_students)
+        num_students += 1
+    n_groups = len(group_sem)
+    if not n_groups:
+        return gpa_aggregates(num_students, [], [])
+    sem_of_group = group_sem
+    group_sem = np.array(group_sem, dtype=np.intp)
+
+    # 1. 打亂：order[g] 為第 g 個 group 的選課順序（該學期課程的 index）
+    order = rng.random((n_groups, COURSE_IDS_PER_SEM)).argsort(axis=1)
+    credit = offerings['credit'][group_sem[:, None], order]
+
+    # 2. 學分門檻
+    selected = (np.cumsum(credit, axis=1) - credit) < MIN_CREDIT_PER_STUDENT_PER_SEM
+    rec_group, rec_pos = np.nonzero(selected)     # row-major：同一 group 的紀錄依選課順序排列
+    rec_course = order[rec_group, rec_pos]
+    rec_credit = credit[rec_group, rec_pos]
+
+    # 3. 分數
+    rec_score = rng.integers(len(SCORE_CHOICES), size=len(rec_group))
+
+    # 4. 該學期 GPA：score * credit / sum(credit)
+    total_credits = np.bincount(rec_group, weights=rec_credit, minlength=n_groups)
+    weighted = np.bincount(rec_group, weights=np.array(SCORE_CHOICES, dtype=np.float64)[rec_score] * rec_credit, minlength=n_groups)
+    gpa = np.divide(weighted, total_credits, out=np.zeros(n_groups), where=total_credits > 0)
+
+    semesters = offerings['semesters']
+    course_ids = offerings['course_id']
+    course_names = offerings['course_name']
+    for g, c, cr, s in zip(rec_group.tolist(), rec_course.tolist(), rec_credit.tolist(), rec_score.tolist()):
+        k = sem_of_group[g]
+        course_writer.write([group_uid[g], semesters[k], course_ids[k][c], course_names[k][c], cr, SCORE_CHOICES[s]])
+
+    gpa_values = [round(value, 3) for value in gpa.tolist()]
+    for g, value in enumerate(gpa_values):
+        gpa_writer.write([group_uid[g], semesters[sem_of_group[g]], value])
+
+    if summary is not None:
+        for g, c in zip(rec_group.tolist(), rec_course.tolist()):
+            summary.add_course(group_uid[g], course_ids[sem_of_group[g]][c])
+        for g, value in enumerate(gpa_values):
+            summary.add_gpa(group_uid[g], semesters[sem_of_group[g]], value)
+
+    return gpa_aggregates(num_students, group_student, gpa_values)
+
+
+def generate_student_department_records(students, index, rng):
+    """為每位學生產生 student_department 記錄 (major / minor / double_major / transfer)，逐筆 yield"""
+    dept_codes = index.dept_codes
+
+    for user in students:
+        semesters = semester_list_for_student(user)
+        if not semesters:
+            continue
+        
+        # 主系（必要）
+        main_dept = user['main_dept_code']
+        major_start = semesters[0]
+        major_end = semesters[-1]
+
+        yield StudentDepartmentRow(user['user_id'], main_dept, "major", major_start, major_end)
+
+        # -----------------------------------------------------------
+        # A. 有 10–20% 機率轉系：major → 不同系（起始學期仍然是上學期）
+        # -----------------------------------------------------------
+        if rng.random() < 0.15:
+            # 隨機新科系
+            new_major_dept = rng.choice([c for c in dept_codes if c != main_dept])
+
+            # 找一個「上學期」作為轉系開始
+            eligible_semesters = [s for s in semesters if s.endswith("-1")]
+            if len(eligible_semesters) > 2:
+                transfer_start = rng.choice(eligible_semesters[1:])  # 至少大二後才能轉系
+                transfer_end = semesters[-1]
+
+                yield StudentDepartmentRow(user['user_id'], new_major_dept, "major", transfer_start, transfer_end)
+
+        # -----------------------------------------------------------
+        # B. minor（15–25%）
+        # -----------------------------------------------------------
+        if rng.random() < 0.20:
+            minor_dept = rng.choice([c for c in dept_codes if c != main_dept])
+
+            eligible_semesters = [s for s in semesters if s.endswith("-1")]
+            if eligible_semesters:
+                minor_start = rng.choice(eligible_semesters)
+                # minor 通常持續 3~7 學期
+                idx = semesters.index(minor_start)
+                end_idx = min(idx + rng.randint(3, 7), len(semesters) - 1)
+                minor_end = semesters[end_idx]
+
+                yield StudentDepartmentRow(user['user_id'], minor_dept, "minor", minor_start, minor_end)
+
+        # -----------------------------------------------------------
+        # C. double major（10–15%）
+        # -----------------------------------------------------------
+        if rng.random() < 0.12:
+            double_major_dept = rng.choice([c for c in dept_codes if c != main_dept])
+
+            eligible_semesters = [s for s in semesters if s.endswith("-1")]
+            if eligible_semesters:
+                dm_start = rng.choice(eligible_semesters)
+                idx = semesters.index(dm_start)
+                end_idx = min(idx + rng.randint(4, 8), len(semesters) - 1)
+                dm_end = semesters[end_idx]
+
+                yield StudentDepartmentRow(user['user_id'], double_major_dept, "double_major", dm_start, dm_end)
+
+
+def write_student_department_part(rows, shard):
+    with open_table_writer('student_department', part=shard) as w:
+        for r in rows:
+            w.write(r)
+    return w
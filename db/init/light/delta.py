@@ -0,0 +1,329 @@
+"""
+day-N 增量資料（--delta-days N）：基礎資料產生完後，模擬接下來 N 天每天的寫入，
+每天輸出一個獨立的交易 delta/day_0001.sql、day_0002.sql……，依序套用到已載入基礎資料的資料庫
+（sh delta/apply_delta.sh），用來觀察持續寫入下 student_search_mv 的 refresh、Redis 快取與索引的行為，
+而不是只量一份靜態快照。
+
+第 d 天（config.TODAY + d）依序產生：
+ 1. resource 狀態：過了截止日的 Available → Full（核准已滿 quota）/ Unavailable；少數 Available 被取消（Canceled）
+ 2. application.review_status：submitted → under_review → approved / rejected；
+    核准人數到 quota 時 resource 改為 Full，Canceled 的 resource 的待審申請只會被 rejected
+ 3. 新的 application：學生向開放中（Available 且未過截止日）的 resource 申請，同一 resource 不重複申請
+ 4. 新的 push_record：供應者推播自己開放中的 resource，push_id 接在基礎資料之後，檔尾 setval 序列
+ 5. 本學期（courses.CURRENT_SEMESTER）的成績陸續公布：新增 student_course_record / student_gpa
+週末的申請與推播較少（WEEKEND_FACTOR）；--skew 與 --eligible-only 的規則與基礎資料相同
+（--eligible-only 時公布的成績也會更新學生的資格）。
+insert 格式的新增資料為 multi-row INSERT，其他格式為 COPY ... FROM STDIN；UPDATE 一律以 VALUES 清單批次更新。
+每天只用自己的亂數流 make_rng('delta', d)，同樣的參數重跑輸出完全相同。
+student_search_snapshot（--search-snapshot）只對應基礎資料，不會跟著更新。
+--check-constraints 時新增的資料列與基礎資料一起檢查（PK / UNIQUE / FK 接續基礎資料的 key）。
+"""
+import os
+from datetime import datetime, timedelta
+
+from . import config
+from .config import TZ
+from .courses import (COURSE_CSV, CURRENT_SEMESTER, read_course_names_from_csv, semester_list_for_student,
+                      generate_semester_offerings, generate_course_and_gpa)
+from .push import draw_receivers
+from .seeding import make_rng, make_np_rng, popularity, weighted_index, weighted_sample, subset_weights
+from .writers import TABLE_SPECS, COLUMN_TYPES, ROW_TYPES, row_encoder
+
+ApplicationRow = ROW_TYPES['application']
+PushRecordRow = ROW_TYPES['push_record']
+
+DELTA_DIR = 'delta'
+DELTA_SCRIPT = 'apply_delta.sh'
+
+APPLY_RATE = 0.01            # 平日每位學生每天提出一件申請的機率
+PUSH_RATE = 0.02             # 平日每個開放中的 resource 每天被推播一次的機率
+MAX_RECEIVERS = 100          # 一次推播最多的 receiver 數
+WEEKEND_FACTOR = 0.4         # 週末的申請 / 推播量相對平日的比例
+REVIEW_START_PROB = 0.3      # submitted → under_review（每天）
+REVIEW_DECIDE_PROB = 0.15    # under_review → approved / rejected（每天）
+APPROVE_PROB = 0.5           # 審核結果為 approved 的機率（quota 還沒滿時）
+CANCEL_PROB = 0.002          # Available 的 resource 每天被取消的機率
+GRADE_RELEASE_PROB = 0.05    # 每位學生的本學期成績每天公布的機率
+
+# 新增資料的表（依寫入順序）
+INSERT_TABLES = ['application', 'push_record', 'student_course_record', 'student_gpa']
+
+# UPDATE：名稱 -> (table, 主鍵欄位, 更新的欄位)
+UPDATE_SPECS = {
+    'resource.status': ('resource', ['resource_id'], 'status'),
+    'application.review_status': ('application', ['user_id', 'resource_id'], 'review_status'),
+}
+UPDATE_BATCH_SIZE = 1000
+
+
+def draw_count(rng, mean):
+    """平均為 mean 的事件數（常態近似 Poisson，至少 0）。"""
+    if mean <= 0:
+        return 0
+    return max(0, round(rng.gauss(mean, mean ** 0.5)))
+
+
+class DeltaState:
+    """
+    基礎資料結束時的狀態：resource 狀態與核准人數、已申請 / 待審的 application、下一個 push_id、
+    還沒公布本學期成績的學生。逐日模擬時就地更新。
+    """
+    def __init__(self, spine, resources):
+        self.spine = spine
+        self.resources = resources
+        self.resource_pos = {r.resource_id: k for k, r in enumerate(resources)}
+        self.status = [r.status for r in resources]
+        self.approved = [0] * len(resources)
+        self.applied = set()      # (user_id, resource 位置)
+        self.pending = {}         # (user_id, resource 位置) -> 'submitted' / 'under_review'，依申請順序
+        self.next_push_id = 1
+        self.ungraded = list(range(len(spine)))
+        self.eligibility = None   # --eligible-only：全體學生的 eligibility.Eligibility
+
+    def collect_applications(self, applications):
+        """包住 application 產生器：記下每一筆的狀態，照原樣 yield 出去。"""
+        for a in applications:
+            key = (a.user_id, self.resource_pos[a.resource_id])
+            self.applied.add(key)
+            if a.review_status == 'approved':
+                self.approved[key[1]] += 1
+            elif a.review_status != 'rejected':
+                self.pending[key] = a.review_status
+            yield a
+
+    def set_status(self, batch, ridx, status):
+        self.status[ridx] = status
+        batch.updates['resource.status'].append((self.resources[ridx].resource_id, status))
+
+    def review(self, batch, key, status):
+        user_id, ridx = key
+        if status == 'under_review':
+            self.pending[key] = status
+        else:
+            del self.pending[key]
+        batch.updates['application.review_status'].append((user_id, self.resources[ridx].resource_id, status))
+        if status == 'approved':
+            self.approved[ridx] += 1
+            if self.approved[ridx] >= self.resources[ridx].quota and self.status[ridx] == 'Available':
+                self.set_status(batch, ridx, 'Full')
+
+    def apply(self, batch, user_id, ridx):
+        key = (user_id, ridx)
+        self.applied.add(key)
+        self.pending[key] = 'submitted'
+        batch.inserts['application'].write(
+            ApplicationRow(user_id, self.resources[ridx].resource_id, batch.date, 'submitted'))
+
+
+class TableBuffer:
+    """一天內某張表新增的資料列（寫入時就編碼好），介面與 writer 相同（write / count）。"""
+    def __init__(self, key, kind):
+        self.table, self.columns = TABLE_SPECS[key][1:3]
+        self.batch_size = TABLE_SPECS[key][4]
+        self.encode = row_encoder(kind, tuple(COLUMN_TYPES[key]))
+        self.lines = []
+
+    @property
+    def count(self):
+        return len(self.lines)
+
+    def write(self, values):
+        self.lines.append(self.encode(values))
+
+class DayBatch:
+    """一天的 delta：各表新增的資料列與 UPDATE，write() 寫成一個交易。"""
+    def __init__(self, day):
+        self.day = day
+        self.date = config.TODAY + timedelta(days=day)
+        self.kind = 'sql' if config.OUTPUT_FORMAT == 'insert' else 'copy'
+        self.inserts = {key: TableBuffer(key, self.kind) for key in INSERT_TABLES}
+        self.updates = {name: [] for name in UPDATE_SPECS}
+        self.last_push_id = None
+
+    def counts(self):
+        """新增的筆數（依表）與 UPDATE 的筆數（依 UPDATE_SPECS 名稱）。"""
+        counts = {key: buf.count for key, buf in self.inserts.items()}
+        counts.update({name: len(rows) for name, rows in self.updates.items()})
+        return counts
+
+    def write(self, path):
+        summary = '、'.join(f"{name} {n}" for name, n in self.counts().items())
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"-- delta day {self.day}（{self.date.isoformat()}）：{summary}\n\nBEGIN;\n\n")
+            for name, (table, keys, column) in UPDATE_SPECS.items():
+                self._write_update(f, table, keys, column, self.updates[name])
+            for buf in self.inserts.values():
+                if self.kind == 'sql':
+                    self._write_insert(f, buf)
+                else:
+                    self._write_copy(f, buf)
+            if self.last_push_id is not None:
+                # 基礎資料與 delta 都直接給 push_id，序列要跟上，之後後端 INSERT 才不會撞號
+                f.write(f"SELECT setval(pg_get_serial_sequence('push_record', 'push_id'), {self.last_push_id});\n\n")
+            f.write("COMMIT;\n")
+        if config.CHECK_CONSTRAINTS:
+            from .constraints import check_rows
+            for key, buf in self.inserts.items():
+                check_rows(key, self.kind, buf.lines)
+
+    @staticmethod
+    def _write_update(f, table, keys, column, rows):
+        encode = row_encoder('sql', ('text',) * (len(keys) + 1))
+        match = ' AND '.join(f"t.{k} = v.{k}::uuid" for k in keys)
+        for start in range(0, len(rows), UPDATE_BATCH_SIZE):
+            values = ",\n".join(encode(row) for row in rows[start:start + UPDATE_BATCH_SIZE])
+            f.write(f"UPDATE {table} AS t SET {column} = v.{column}\nFROM (VALUES\n{values}\n) "
+                    f"AS v({', '.join(keys)}, {column})\nWHERE {match};\n\n")
+
+    @staticmethod
+    def _write_insert(f, buf):
+        insert_sql = f"INSERT INTO {buf.table} ({', '.join(buf.columns)}) VALUES\n"
+        for start in range(0, len(buf.lines), buf.batch_size):
+            f.write(insert_sql)
+            f.write(",\n".join(buf.lines[start:start + buf.batch_size]) + ";\n\n")
+
+    @staticmethod
+    def _write_copy(f, buf):
+        if buf.lines:
+            f.write(f"COPY {buf.table} ({', '.join(buf.columns)}) FROM STDIN;\n")
+            f.writelines(buf.lines)
+            f.write("\\.\n\n")
+
+
+def draw_unapplied(rng, state, user_id, candidates, weights):
+    """
+    從 candidates 依權重抽一個 user_id 還沒申請過的 resource：weighted_sample 抽一個、申請過就重抽，
+    與 weighted_sample 一樣重抽超過 4 次（candidates 幾乎都申請過了）才從還沒申請的之中均勻抽；全都申請過回傳 None。
+    """
+    for _ in range(4):
+        ridx = candidates[weighted_sample(rng, len(candidates), 1, weights)[0]]
+        if (user_id, ridx) not in state.applied:
+            return ridx
+    rest = [ridx for ridx in candidates if (user_id, ridx) not in state.applied]
+    return rest[rng.randrange(len(rest))] if rest else None
+
+def simulate_day(state, day, offerings):
+    """模擬第 day 天（從 1 起）的寫入，更新 state 並回傳 DayBatch。"""
+    batch = DayBatch(day)
+    rng = make_rng('delta', day)
+    today = batch.date
+    spine = state.spine
+    resources = state.resources
+    eligibility = state.eligibility
+
+    # 1. resource 狀態
+    for ridx, r in enumerate(resources):
+        if state.status[ridx] != 'Available':
+            continue
+        if r.deadline < today:
+            state.set_status(batch, ridx, 'Full' if state.approved[ridx] >= r.quota else 'Unavailable')
+        elif rng.random() < CANCEL_PROB:
+            state.set_status(batch, ridx, 'Canceled')
+
+    # 2. 審核（今天的新申請明天才開始審）
+    for key, status in list(state.pending.items()):
+        ridx = key[1]
+        if state.status[ridx] == 'Canceled':
+            if rng.random() < REVIEW_DECIDE_PROB:
+                state.review(batch, key, 'rejected')
+        elif status == 'submitted':
+            if rng.random() < REVIEW_START_PROB:
+                state.review(batch, key, 'under_review')
+        elif rng.random() < REVIEW_DECIDE_PROB:
+            approve = state.approved[ridx] < resources[ridx].quota and rng.random() < APPROVE_PROB
+            state.review(batch, key, 'approved' if approve else 'rejected')
+
+    factor = WEEKEND_FACTOR if today.weekday() >= 5 else 1.0
+    resource_weights = popularity('resource', len(resources))
+    open_resources = [ridx for ridx, r in enumerate(resources)
+                      if state.status[ridx] == 'Available' and r.deadline >= today]
+    open_set = set(open_resources)
+    open_weights = subset_weights(resource_weights, open_resources)
+
+    # 3. 新申請
+    for _ in range(draw_count(rng, len(spine) * APPLY_RATE * factor)):
+        i = rng.randrange(len(spine))
+        user_id = spine.user_id(i)
+        if eligibility is None:
+            candidates, weights = open_resources, open_weights
+        else:
+            candidates = [ridx for ridx in eligibility.resources_for(i).tolist() if ridx in open_set]
+            weights = subset_weights(resource_weights, candidates)
+        if not candidates:
+            continue
+        ridx = draw_unapplied(rng, state, user_id, candidates, weights)
+        if ridx is not None:
+            state.apply(batch, user_id, ridx)
+
+    # 4. 推播：先抽好當天所有推播，依時間排序後再分配 push_id
+    events = []
+    for _ in range(draw_count(rng, len(open_resources) * PUSH_RATE * factor)):
+        ridx = open_resources[weighted_index(rng, open_weights) if open_weights else rng.randrange(len(open_resources))]
+        pool = None if eligibility is None else eligibility.students_for(ridx).tolist()
+        if pool is not None and not pool:
+            continue
+        num_receivers = rng.randint(1, min(MAX_RECEIVERS, len(spine) if pool is None else len(pool)))
+        receivers = draw_receivers(rng.getrandbits(64), len(spine), num_receivers, pool)
+        push_datetime = datetime(today.year, today.month, today.day, tzinfo=TZ) + timedelta(seconds=rng.randrange(86400))
+        events.append((push_datetime, len(events), ridx, receivers))
+    events.sort(key=lambda e: (e[0], e[1]))
+    for push_datetime, _, ridx, receivers in events:
+        r = resources[ridx]
+        for receiver in receivers:
+            batch.inserts['push_record'].write(
+                PushRecordRow(state.next_push_id, r.supplier_id, spine.user_id(receiver), r.resource_id, push_datetime))
+            state.next_push_id += 1
+    if events:
+        batch.last_push_id = state.next_push_id - 1
+
+    # 5. 本學期成績公布
+    released, ungraded = [], []
+    for i in state.ungraded:
+        (released if rng.random() < GRADE_RELEASE_PROB else ungraded).append(i)
+    state.ungraded = ungraded
+    if released:
+        _, current_gpa = generate_course_and_gpa(
+            (spine.student(i) for i in released), offerings,
+            batch.inserts['student_course_record'], batch.inserts['student_gpa'], make_np_rng('delta_course', day),
+            semesters=lambda u: [CURRENT_SEMESTER])
+        if eligibility is not None:
+            for i, gpa in zip(released, current_gpa.tolist()):
+                eligibility.add_semester(i, gpa, len(semester_list_for_student(spine.student(i))))
+    return batch
+
+
+def write_delta(state, num_days, offerings):
+    """
+    產生 delta/day_0001.sql ~ day_NNNN.sql 與依序套用的 apply_delta.sh，回傳各項的總數。
+    offerings 為基礎資料的課程（新學期的 course_id 接在其後配置）。
+    """
+    os.makedirs(DELTA_DIR, exist_ok=True)
+    for name in os.listdir(DELTA_DIR):
+        os.remove(os.path.join(DELTA_DIR, name))
+
+    semester_offerings = generate_semester_offerings(offerings, CURRENT_SEMESTER, read_course_names_from_csv(COURSE_CSV))
+    totals = {}
+    for day in range(1, num_days + 1):
+        batch = simulate_day(state, day, semester_offerings)
+        batch.write(os.path.join(DELTA_DIR, f"day_{day:04d}.sql"))
+        for name, n in batch.counts().items():
+            totals[name] = totals.get(name, 0) + n
+
+    script = os.path.join(DELTA_DIR, DELTA_SCRIPT)
+    with open(script, 'w', encoding='utf-8') as f:
+        f.write("#!/bin/sh\n")
+        f.write("# 依日期順序套用 day_*.sql（每個檔案一個交易）；SLEEP 為每天之間暫停的秒數，可模擬持續寫入\n")
+        f.write("# 連線參數用 PGHOST / PGPORT / PGUSER / PGDATABASE 指定\n")
+        f.write("set -e\n")
+        f.write('cd "$(dirname "$0")"\n')
+        f.write("SLEEP=${SLEEP:-0}\n")
+        f.write("for f in day_*.sql; do\n")
+        f.write('    psql -q -v ON_ERROR_STOP=1 -f "$f" >/dev/null\n')
+        f.write('    echo "✅ $f"\n')
+        f.write('    sleep "$SLEEP"\n')
+        f.write("done\n")
+    os.chmod(script, 0o755)
+
+    summary = '、'.join(f"{name} {n}" for name, n in totals.items())
+    print(f"🎉 已產生 {DELTA_DIR}/（{num_days} 天：{summary}；主資料載入後 sh {script} 依序套用）")
+    return totals
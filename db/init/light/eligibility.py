@@ -0,0 +1,179 @@
+"""
+資格判斷引擎：依 resource_condition 找出學生可以申請的 resource，規則與後端 ApplicationService.apply 相同：
+ 1. 取 department_id = 學生 student_profile.department_id 的 condition（有多筆時取第一筆）；
+    沒有時取 department_id IS NULL 的（對所有系開放）；兩者都沒有就不符合
+ 2. condition 的 avg_gpa / current_gpa 不為 NULL 時，學生的 GPA 必須 >= 門檻（沒有 GPA 的學生不符合）
+ 3. condition.is_poor 為 TRUE 時學生必須 is_poor（目前產生的 student_profile.is_poor 都是預設的 FALSE）
+學生的 avg_gpa / current_gpa（對應 student_gpa_view）由 courses.generate_course_and_gpa 回傳。
+
+規則先展開成「每個 (系, resource) 的有效 condition」表（第 1 步的 NULL condition 已套到沒有專屬 condition 的系），
+NULL 門檻存成 -inf、學生沒有 GPA 也當成 -inf，比較時不必另外處理 NULL；再分別依系、依 resource 排好：
+ - pairs()：一次算出一群學生的所有符合的 (學生, resource)，同一系的學生與該系的 condition 以 numpy broadcast 比較
+ - resources_for() / students_for()：只查一位學生 / 一個 resource，不必展開整張表
+numpy 在第一次用到時才 import。
+"""
+PAIRS_BLOCK = 1 << 22    # pairs() 一次 broadcast 比較的 (學生, condition) 格數上限
+
+
+class EligibilityRules:
+    """
+    resource_condition 的規則表。collect() 包住 resource_condition 產生器逐筆記下，
+    產生（寫檔）完再 build()，之後以 match() 套到一群學生上。
+    """
+    def __init__(self, resources, dept_codes):
+        self.num_resources = len(resources)
+        self.resource_pos = {r.resource_id: k for k, r in enumerate(resources)}
+        self.dept_codes = tuple(dept_codes)
+        self.dept_pos = {code: k for k, code in enumerate(self.dept_codes)}
+        self._first = {}   # (resource 位置, 系位置或 -1) -> (avg_gpa, current_gpa, is_poor)，同一組只留第一筆
+
+    def add(self, resource_id, department_id, avg_gpa, current_gpa, is_poor):
+        dept = -1 if department_id is None else self.dept_pos.get(department_id)
+        if dept is None:
+            return    # 不存在的系：沒有學生會符合
+        self._first.setdefault((self.resource_pos[resource_id], dept), (avg_gpa, current_gpa, bool(is_poor)))
+
+    def collect(self, conditions):
+        """記下每一筆 resource_condition，照原樣 yield 出去（可以直接接在 writer 前面）。"""
+        for c in conditions:
+            self.add(c.resource_id, c.department_id, c.avg_gpa, c.current_gpa, c.is_poor)
+            yield c
+
+    def build(self):
+        """展開成有效 condition 表，依 (系, resource) 與 (resource, 系) 各排一份。"""
+        import numpy as np
+
+        rows = [(d, r) + v for (r, d), v in self._first.items() if d >= 0]
+        for (r, d), v in self._first.items():
+            if d < 0:
+                rows.extend((k, r) + v for k in range(len(self.dept_codes)) if (r, k) not in self._first)
+        rows.sort(key=lambda row: (row[0], row[1]))
+
+        def threshold(v):
+            return -np.inf if v is None else v
+
+        self.dept = np.array([row[0] for row in rows], dtype=np.intp)
+        self.resource = np.array([row[1] for row in rows], dtype=np.intp)
+        self.avg_gpa = np.array([threshold(row[2]) for row in rows], dtype=np.float64)
+        self.current_gpa = np.array([threshold(row[3]) for row in rows], dtype=np.float64)
+        self.is_poor = np.array([row[4] for row in rows], dtype=bool)
+        self.dept_offsets = np.searchsorted(self.dept, np.arange(len(self.dept_codes) + 1))
+        self.by_resource = np.lexsort((self.dept, self.resource))
+        self.resource_offsets = np.searchsorted(self.resource[self.by_resource], np.arange(self.num_resources + 1))
+        return self
+
+    def __len__(self):
+        return len(self.dept)
+
+    def match(self, dept, avg_gpa, current_gpa, is_poor=None):
+        """把規則套到一群學生（各欄為等長的 array，dept 為 dept_codes 的位置，GPA 為 NaN 表示沒有）。"""
+        return Eligibility(self, dept, avg_gpa, current_gpa, is_poor)
+
+
+class Eligibility:
+    """一群學生對 EligibilityRules 的資格；學生以在這群中的位置 0..n-1 表示。"""
+    def __init__(self, rules, dept, avg_gpa, current_gpa, is_poor=None):
+        import numpy as np
+
+        self.rules = rules
+        self.dept = np.asarray(dept, dtype=np.intp)
+        # 沒有 GPA（NaN）以 -inf 表示：只能通過沒有門檻（-inf）的 condition
+        self.avg_gpa = np.nan_to_num(np.asarray(avg_gpa, dtype=np.float64), nan=-np.inf)
+        self.current_gpa = np.nan_to_num(np.asarray(current_gpa, dtype=np.float64), nan=-np.inf)
+        self.is_poor = np.zeros(len(self.dept), dtype=bool) if is_poor is None else np.asarray(is_poor, dtype=bool)
+        self.order = np.argsort(self.dept, kind='stable')    # 依系排好的學生
+        self.offsets = np.searchsorted(self.dept[self.order], np.arange(len(rules.dept_codes) + 1))
+
+    def __len__(self):
+        return len(self.dept)
+
+    def add_semester(self, i, gpa, num_semesters):
+        """第 i 位學生新增一個學期的 GPA（原本有 num_semesters 個學期），更新 avg / current（--delta-days 公布成績時）。"""
+        if num_semesters:
+            self.avg_gpa[i] = (self.avg_gpa[i] * num_semesters + gpa) / (num_semesters + 1)
+        else:
+            self.avg_gpa[i] = gpa
+        self.current_gpa[i] = gpa
+
+    def pairs(self):
+        """
+        所有符合資格的 (學生, resource)，回傳兩個等長的 array，依 (學生, resource) 排序。
+        每個系的學生 × 該系的 condition 做一次 broadcast 比較（太大時把學生切塊）。
+        """
+        import numpy as np
+
+        rules = self.rules
+        students, resources = [], []
+        for d in range(len(rules.dept_codes)):
+            lo, hi = rules.dept_offsets[d], rules.dept_offsets[d + 1]
+            members = self.order[self.offsets[d]:self.offsets[d + 1]]
+            if lo == hi or not len(members):
+                continue
+            step = max(1, PAIRS_BLOCK // (hi - lo))
+            for k in range(0, len(members), step):
+                block = members[k:k + step]
+                ok = ((self.avg_gpa[block, None] >= rules.avg_gpa[None, lo:hi])
+                      & (self.current_gpa[block, None] >= rules.current_gpa[None, lo:hi])
+                      & (self.is_poor[block, None] | ~rules.is_poor[None, lo:hi]))
+                s, c = np.nonzero(ok)
+                students.append(block[s])
+                resources.append(rules.resource[lo + c])
+        if not students:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        # 以 學生 * resource 數 + resource 為 key 排一次（比 lexsort 兩個欄位快）
+        key = np.concatenate(students).astype(np.int64) * rules.num_resources + np.concatenate(resources)
+        key.sort()
+        return np.divmod(key, rules.num_resources)
+
+    def resources_for(self, i):
+        """第 i 位學生符合資格的 resource 位置（遞增）。"""
+        rules = self.rules
+        d = self.dept[i]
+        lo, hi = rules.dept_offsets[d], rules.dept_offsets[d + 1]
+        ok = ((self.avg_gpa[i] >= rules.avg_gpa[lo:hi]) & (self.current_gpa[i] >= rules.current_gpa[lo:hi])
+              & (self.is_poor[i] | ~rules.is_poor[lo:hi]))
+        return rules.resource[lo:hi][ok]
+
+    def students_for(self, ridx):
+        """符合 resource ridx 資格的學生位置（遞增）：對該 resource 的每個系，從依系排好的學生中篩。"""
+        import numpy as np
+
+        rules = self.rules
+        matched = []
+        for j in rules.by_resource[rules.resource_offsets[ridx]:rules.resource_offsets[ridx + 1]]:
+            d = rules.dept[j]
+            members = self.order[self.offsets[d]:self.offsets[d + 1]]
+            ok = ((self.avg_gpa[members] >= rules.avg_gpa[j]) & (self.current_gpa[members] >= rules.current_gpa[j])
+                  & (self.is_poor[members] | ~rules.is_poor[j]))
+            matched.append(members[ok])
+        if not matched:
+            return np.zeros(0, dtype=np.intp)
+        return np.sort(np.concatenate(matched))
+
+
+def concat_gpa(parts):
+    """把各 shard 的 (avg_gpa, current_gpa) 依 shard 順序接成全體學生的 array。"""
+    import numpy as np
+
+    parts = list(parts)
+    return (np.concatenate([avg_gpa for avg_gpa, _ in parts]),
+            np.concatenate([current_gpa for _, current_gpa in parts]))
+
+def gpa_aggregates(num_students, group_student, gpa):
+    """
+    每位學生的 (avg_gpa, current_gpa)（numpy array，沒有 GPA 為 NaN），對應 student_gpa_view：
+    group_student / gpa 為依 (學生, 學期) 順序排列的 student_gpa，current_gpa 取每位學生最後一個學期。
+    """
+    import numpy as np
+
+    group_student = np.asarray(group_student, dtype=np.intp)
+    gpa = np.asarray(gpa, dtype=np.float64)
+    counts = np.bincount(group_student, minlength=num_students)
+    total = np.bincount(group_student, weights=gpa, minlength=num_students)
+    avg_gpa = np.full(num_students, np.nan)
+    np.divide(total, counts, out=avg_gpa, where=counts > 0)
+    current_gpa = np.full(num_students, np.nan)
+    if len(group_student):
+        last = np.flatnonzero(np.append(group_student[1:] != group_student[:-1], True))
+        current_gpa[group_student[last]] = gpa[last]
+    return avg_gpa, current_gpa
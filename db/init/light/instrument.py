@@ -0,0 +1,160 @@
+"""
+產生流程的逐階段量測：每個階段記錄 wall time、CPU time（含 worker）、產生筆數、寫出的 bytes
+與記憶體峰值，產生完寫成 run_report.json（與 merged.sql 放在同一個目錄）。
+
+ - CPU time = 主程序 process_time + 本階段結束的 worker（fork 出來的子程序）的 user + sys
+ - 記憶體：預設記錄 process 的 max RSS（高水位，只增不減）；--trace-memory 時另外開 tracemalloc
+   記錄本階段 Python 物件的峰值（只含主程序，且會讓產生變慢好幾倍）
+ - --profile 時每個階段各自以 cProfile 量測，存成 {PROFILE_DIR}/NN_階段.prof，
+   可用 python -m pstats 或 snakeviz 開啟（worker 內的執行不會出現在 profile 中，要看請用 --workers 1）
+
+沒有呼叫 start_run() 時 stage() 不做任何量測，單獨呼叫各產生函式不受影響。
+"""
+import cProfile
+import json
+import os
+import resource
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+from . import config
+
+RUN_REPORT_FILE = 'run_report.json'
+PROFILE_DIR = 'light_profile'
+
+_run = None     # 目前的量測（start_run() 建立，finish_run() 結束）
+
+
+def _output_files(path='.'):
+    """目前目錄下所有輸出檔的 {路徑: (大小, mtime)}（略過 . 開頭的快取目錄與 profile 目錄）。"""
+    files = {}
+    for root, dirs, names in os.walk(path):
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d != PROFILE_DIR]
+        for name in names:
+            full = os.path.join(root, name)
+            try:
+                st = os.stat(full)
+            except FileNotFoundError:
+                continue
+            files[full] = (st.st_size, st.st_mtime_ns)
+    return files
+
+def _max_rss_bytes():
+    # Linux 的 ru_maxrss 單位為 KB，macOS 為 bytes
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+def _children_cpu():
+    ru = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return ru.ru_utime + ru.ru_stime
+
+
+def start_run():
+    """開始量測一次產生；之後的 stage() 都會記到這次的報告裡。"""
+    global _run
+    _run = {
+        'started_at': datetime.now().astimezone().isoformat(timespec='seconds'),
+        'start': time.perf_counter(),
+        'cpu_start': time.process_time() + _children_cpu(),
+        'stages': [],
+    }
+    if config.PROFILE:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+    return _run
+
+@contextmanager
+def stage(name):
+    """
+    量測一個階段：with stage('write_resource_sql') as s: ...; s['rows'] = 筆數
+    產生的是多張表時 s['tables'] 可以放 {表: 筆數}，rows 則為合計。
+    """
+    s = {'stage': name, 'rows': None}
+    if _run is None:
+        yield s
+        return
+
+    before = _output_files()
+    trace = config.TRACE_MEMORY and not tracemalloc.is_tracing()
+    if trace:
+        tracemalloc.start()
+    profiler = cProfile.Profile() if config.PROFILE else None
+    cpu = time.process_time()
+    children = _children_cpu()
+    start = time.perf_counter()
+    if profiler:
+        profiler.enable()
+    try:
+        yield s
+    finally:
+        if profiler:
+            profiler.disable()
+        wall = time.perf_counter() - start
+        s['wall_s'] = round(wall, 6)
+        s['cpu_s'] = round(time.process_time() - cpu, 6)
+        s['worker_cpu_s'] = round(_children_cpu() - children, 6)
+        if s['rows'] is not None:
+            s['rows_per_s'] = round(s['rows'] / wall, 1) if wall > 0 else None
+        after = _output_files()
+        written = [p for p, meta in after.items() if before.get(p) != meta]
+        s['bytes_written'] = sum(after[p][0] for p in written)
+        s['max_rss_bytes'] = _max_rss_bytes()
+        if trace:
+            s['tracemalloc_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        if profiler:
+            path = os.path.join(PROFILE_DIR, f"{len(_run['stages']):02d}_{name}.prof")
+            profiler.dump_stats(path)
+            s['profile'] = path
+        _run['stages'].append(s)
+
+def finish_run(path=RUN_REPORT_FILE, **extra):
+    """結束量測，把報告寫到 path（先寫暫存檔再 rename），印出最耗時的階段並回傳報告。"""
+    global _run
+    run, _run = _run, None
+    if run is None:
+        return None
+    wall = time.perf_counter() - run['start']
+    report = {
+        'started_at': run['started_at'],
+        'python': sys.version.split()[0],
+        'params': {
+            'scale_factor': config.SCALE_FACTOR,
+            'num_students': config.NUM_STUDENTS,
+            'num_companies': config.NUM_COMPANIES,
+            'num_resource': config.NUM_RESOURCE,
+            'output_format': config.OUTPUT_FORMAT,
+            'workers': config.WORKERS,
+            'seed': config.SEED,
+            'today': config.TODAY.isoformat(),
+            'name_pools': config.USE_NAME_POOLS,
+            'tables': sorted(config.SELECTED_TABLES) if config.SELECTED_TABLES else None,
+            'incremental': config.INCREMENTAL,
+            'compress': config.COMPRESS,
+            'chunks': config.CHUNKS,
+            'trace_memory': config.TRACE_MEMORY,
+            'profile': config.PROFILE,
+            'skew': config.SKEW,
+            'search_snapshot': config.SEARCH_SNAPSHOT,
+            'eligible_only': config.ELIGIBLE_ONLY,
+            'delta_days': config.DELTA_DAYS,
+            'check_constraints': config.CHECK_CONSTRAINTS,
+        },
+        'wall_s': round(wall, 6),
+        'cpu_s': round(time.process_time() + _children_cpu() - run['cpu_start'], 6),
+        'max_rss_bytes': _max_rss_bytes(),
+        'bytes_written': sum(s['bytes_written'] for s in run['stages']),
+        **extra,
+        'stages': run['stages'],
+    }
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+    top = sorted(run['stages'], key=lambda s: s['wall_s'], reverse=True)[:3]
+    summary = '、'.join(f"{s['stage']} {s['wall_s']:.2f}s ({s['wall_s'] / max(wall, 1e-9):.0%})" for s in top)
+    print(f"⏱️ 總計 {wall:.2f}s，最耗時：{summary}（完整報告：{path}）")
+    return report
@@ -0,0 +1,163 @@
+"""
+合併輸出：依 LOAD_ORDER 把各表的 .sql 串流接成 merged.sql，或產生 load_tsv.sql（tsv / binary）。
+
+--compress gzip / zstd 時直接壓縮輸出 merged.sql.gz / merged.sql.zst
+（postgres 映像的 docker-entrypoint-initdb.d 兩種都能直接執行）。
+--chunks N 時不產生 merged.sql，改為 chunks/ 目錄：
+大表切成最多 N 個可各自獨立載入的檔案（各自有 BEGIN/COMMIT 或 COPY 區塊），
+檔名以 FK 層級開頭（00_user.000.sql、01_resource.000.sql……），同一層的檔案可以平行載入，
+load_chunks.sh 依層級依序執行、層內以 xargs -P 平行跑 psql。
+"""
+import gzip
+import math
+import os
+import shutil
+
+from . import config
+from .writers import TABLE_SPECS, TABLE_DEPENDS, LOAD_ORDER, table_output
+
+CHUNK_DIR = 'chunks'
+CHUNK_MIN_BYTES = 8 << 20   # 小於此大小的表不切
+
+COMPRESS_SUFFIX = {'none': '', 'gzip': '.gz', 'zstd': '.zst'}
+DECOMPRESS_COMMAND = {'none': 'cat', 'gzip': 'gzip -dc', 'zstd': 'zstd -dc'}
+
+
+def open_compressed(path):
+    """依 --compress 開啟文字輸出檔（zstd 需要 zstandard 套件，只在用到時 import）。"""
+    if config.COMPRESS == 'gzip':
+        return gzip.open(path, 'wt', encoding='utf-8', compresslevel=6)
+    if config.COMPRESS == 'zstd':
+        try:
+            import zstandard
+        except ImportError:
+            raise SystemExit("❌ --compress zstd 需要 zstandard 套件（pip install zstandard）")
+        return zstandard.open(path, 'wt', encoding='utf-8', cctx=zstandard.ZstdCompressor(level=3))
+    return open(path, 'w', encoding='utf-8')
+
+def merged_file_name():
+    """本次設定下的合併輸出（檔案或 chunks/load_chunks.sh）。"""
+    if config.OUTPUT_FORMAT in ('tsv', 'binary'):
+        return 'load_tsv.sql'
+    if config.CHUNKS:
+        return os.path.join(CHUNK_DIR, 'load_chunks.sh')
+    return 'merged.sql' + COMPRESS_SUFFIX[config.COMPRESS]
+
+def load_levels():
+    """LOAD_ORDER 中每一項的 FK 層級：沒有依賴為 0，否則為上游最大層級 + 1。"""
+    levels = {}
+    for key in LOAD_ORDER:
+        levels[key] = max((levels[dep] + 1 for dep in TABLE_DEPENDS[key]), default=0)
+    return levels
+
+
+def write_merged_files():
+    """依設定產生 merged.sql(.gz/.zst)、chunks/ 或 load_tsv.sql。"""
+    if config.OUTPUT_FORMAT in ('tsv', 'binary'):
+        write_load_tsv()
+    elif config.CHUNKS:
+        write_chunks(config.CHUNKS)
+    else:
+        write_merged_sql()
+
+def write_load_tsv():
+    # 每張表一個 .tsv / .pgcopy，依 FK 順序以 \copy 載入（psql 的工作目錄需為輸出目錄）
+    with open("load_tsv.sql", "w", encoding="utf-8") as fout:
+        fout.write("-- psql script: load generated .tsv / .pgcopy files with \\copy\n\n")
+        for key in LOAD_ORDER:
+            table, columns, path, is_binary = table_output(key)
+            options = " WITH (FORMAT binary)" if is_binary else ""
+            fout.write(f"\\copy {table} ({', '.join(columns)}) FROM '{path}'{options}\n")
+    print("🎉 已產生 load_tsv.sql（psql -f load_tsv.sql）")
+
+def write_merged_sql():
+    path = merged_file_name()
+    with open_compressed(path) as fout:
+        for key in LOAD_ORDER:
+            with open(TABLE_SPECS[key][0], "r", encoding="utf-8") as fin:
+                # 串流複製，不把整個檔案讀進記憶體
+                shutil.copyfileobj(fin, fout, 1 << 20)
+                fout.write("\n")
+    print(f"🎉 已產生 {path}（{os.path.getsize(path) / (1 << 20):.1f} MB）")
+
+
+def split_sql_file(src, dst_paths):
+    """
+    把一張表的 .sql（multi-row INSERT 或 COPY 區塊）依大小平均切到 dst_paths，
+    只在 INSERT 敘述 / COPY 資料列之間切開；每個檔案各自包一組 BEGIN/COMMIT 或 COPY ... \\.，可以獨立載入。
+    回傳實際寫出的檔案。
+    """
+    target = os.path.getsize(src) / len(dst_paths)
+    written = []
+    out = None
+    out_bytes = 0
+    copy_header = None
+
+    def start_chunk():
+        nonlocal out, out_bytes
+        close_chunk()
+        out = open_compressed(dst_paths[len(written)])
+        written.append(dst_paths[len(written)])
+        out_bytes = 0
+        out.write(copy_header if copy_header else "BEGIN;\n\n")
+
+    def close_chunk():
+        nonlocal out
+        if out is not None:
+            out.write("\\.\n" if copy_header else "COMMIT;\n")
+            out.close()
+            out = None
+
+    with open(src, "r", encoding="utf-8") as fin:
+        for line in fin:
+            if copy_header is not None:
+                if line.startswith("\\."):
+                    break
+                if out is None or (out_bytes >= target and len(written) < len(dst_paths)):
+                    start_chunk()
+            elif line.startswith("COPY "):
+                copy_header = line
+                continue
+            elif line.startswith("INSERT INTO"):
+                if out is None or (out_bytes >= target and len(written) < len(dst_paths)):
+                    start_chunk()
+            elif out is None or line in ("BEGIN;\n", "COMMIT;\n"):
+                continue    # 檔頭註解與原本的 BEGIN / COMMIT
+            out.write(line)
+            out_bytes += len(line)
+    close_chunk()
+    return written
+
+def write_chunks(num_chunks):
+    """產生 chunks/：各表切成最多 num_chunks 個檔案，加上依 FK 層級平行載入的 load_chunks.sh。"""
+    os.makedirs(CHUNK_DIR, exist_ok=True)
+    for name in os.listdir(CHUNK_DIR):
+        os.remove(os.path.join(CHUNK_DIR, name))
+
+    suffix = '.sql' + COMPRESS_SUFFIX[config.COMPRESS]
+    levels = load_levels()
+    total = 0
+    for key in LOAD_ORDER:
+        src = TABLE_SPECS[key][0]
+        n = max(1, min(num_chunks, math.ceil(os.path.getsize(src) / CHUNK_MIN_BYTES)))
+        stem = os.path.join(CHUNK_DIR, f"{levels[key]:02d}_{key}")
+        if n == 1:
+            with open(src, "r", encoding="utf-8") as fin, open_compressed(stem + '.000' + suffix) as fout:
+                shutil.copyfileobj(fin, fout, 1 << 20)
+            total += 1
+        else:
+            total += len(split_sql_file(src, [f"{stem}.{k:03d}{suffix}" for k in range(n)]))
+
+    script = os.path.join(CHUNK_DIR, 'load_chunks.sh')
+    with open(script, 'w', encoding='utf-8') as f:
+        f.write("#!/bin/sh\n")
+        f.write("# 依 FK 層級依序載入，同一層的檔案以 JOBS 個 psql 平行執行\n")
+        f.write("# 連線參數用 PGHOST / PGPORT / PGUSER / PGDATABASE 指定\n")
+        f.write("set -e\n")
+        f.write('cd "$(dirname "$0")"\n')
+        f.write(f"JOBS=${{JOBS:-{num_chunks}}}\n")
+        for level in sorted(set(levels.values())):
+            f.write(f"ls {level:02d}_*{suffix} | xargs -P \"$JOBS\" -I{{}} "
+                    f"sh -c '{DECOMPRESS_COMMAND[config.COMPRESS]} \"{{}}\" | psql -q -v ON_ERROR_STOP=1 -f - >/dev/null'\n")
+    os.chmod(script, 0o755)
+    print(f"🎉 已產生 {CHUNK_DIR}/（{total} 個檔案，{len(set(levels.values()))} 個 FK 層級，sh {script} 載入）")
@@ -0,0 +1,332 @@
+"""
+產生流程：Phase 1（學生 user）→ department / company 相關表格 → resource → Phase 2（學生相關表格）
+→ application → push_record（→ --delta-days 的 delta/）→ merged.sql / load_tsv.sql，最後寫 run_report.json。
+
+run_generate() 依 config 目前的設定執行一次完整產生；各表的產生函式本身不讀寫全域狀態，
+Phase 1 / Phase 2 的 worker 需要的共用資料放在 _ctx（worker 由 fork 產生，直接繼承）。
+"""
+import multiprocessing
+import os
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from types import SimpleNamespace
+
+from . import config
+from .config import CSV_FILENAME
+from .seeding import make_rng, make_np_rng
+from .writers import open_table_writer, output_path, stitch_parts, table_selected
+from .users import (StudentSpine, UserIndex, generate_user_data, num_student_shards, shard_range,
+                    student_user_shard, assign_student_numbers, write_sql_file, write_department_profile_sql,
+                    write_company_profile_sql, write_student_profile_part, write_user_application_sql)
+from .courses import (COURSE_CSV, read_course_names_from_csv, generate_course_offerings, generate_course_and_gpa,
+                      generate_student_department_records, write_student_department_part)
+from .resources import (generate_resources, write_resource_sql, generate_resource_conditions,
+                        write_resource_condition_sql, draw_applications, generate_applications,
+                        write_application_sql)
+from .achievements import generate_achievements, write_achievement_part, generate_achievement_verifications
+from .push import plan_push_events, generate_push_records, write_push_record_sql
+from .search import SearchSummary, write_student_search_part, write_load_script
+from .eligibility import EligibilityRules, concat_gpa
+from .delta import DeltaState, write_delta
+from .constraints import (start_validation, finish_validation, stop_validation, flush_checks, checked_shard_task)
+from .cache import plan_build, record_build
+from .merge import write_merged_files, merged_file_name
+from .instrument import start_run, stage, finish_run
+
+# 資管系管理人的 user_id（user_application 的 reviewed_by）
+ADMIN_USER_ID = '00000000-0000-0000-0000-000000000064'
+
+# Phase 2 在 shard 內產生的表（依 stitch 順序）；student_search_mv 只有 --search-snapshot 時產生
+DETAIL_TABLES = ['student_profile', 'student_course_record', 'student_gpa', 'student_department',
+                 'achievement', 'achievement_verification', 'student_search_mv']
+
+# 需要 Phase 1 學生資料（StudentSpine）的表；都沒被選到時可以略過 Phase 1
+STUDENT_TABLES = ['user'] + DETAIL_TABLES + ['application', 'push_record']
+
+# Phase 1 / Phase 2 worker 共用的資料，由 run_generate() 在開 worker 之前填好
+_ctx = SimpleNamespace()
+
+
+def run_shards(task, num_shards):
+    """
+    依 shard 編號執行 task，回傳結果 list（順序與 shard 編號相同）。
+    --workers > 1 時用 fork 的 process pool：worker 直接繼承主程序目前的全域資料，
+    每個 shard 的亂數只由 (seed, 表, shard) 決定，所以結果與 worker 數無關。
+    """
+    if config.WORKERS <= 1 or num_shards <= 1:
+        return [task(shard) for shard in range(num_shards)]
+    if config.CHECK_CONSTRAINTS:
+        # worker 寫出的列同樣送給 validator process；fork 之前先送出主程序累積的列，worker 才不會重複送出
+        flush_checks()
+        task = partial(checked_shard_task, task)
+    ctx = multiprocessing.get_context('fork')
+    # --trace-memory 的 tracemalloc 會被 fork 繼承，worker 不回報記憶體，關掉以免白白拖慢
+    with ProcessPoolExecutor(max_workers=min(config.WORKERS, num_shards), mp_context=ctx,
+                             initializer=tracemalloc.stop) as pool:
+        return list(pool.map(task, range(num_shards)))
+
+def student_detail_shard(ctx, shard):
+    """
+    Phase 2：一次處理一個 shard 的學生相關表格
+    （student_profile / 選課 + GPA / student_department / achievement + verification），
+    各自寫到 part 檔；application 只抽亂數，回傳給主程序依序決定 review_status。
+    --search-snapshot 時選課與成就產生的同時累積 SearchSummary，最後寫 student_search_mv 的快照。
+    --eligible-only 時 application 只從符合資格的 resource 抽，並回傳學生的 GPA 彙整給 push_record 使用。
+    每張表都用自己的 (表, shard) 亂數流，與其他 shard、worker 數無關，所以沒被 --tables 選到的表可以直接略過。
+    """
+    start, end = shard_range(shard)
+    spine = ctx.spine
+    parts = {}
+    summary = SearchSummary() if table_selected('student_search_mv') else None
+    rules = ctx.eligibility_rules
+    gpa = None
+
+    if table_selected('student_profile'):
+        w = write_student_profile_part(spine, shard)
+        parts['student_profile'] = w.count
+
+    if table_selected('student_course_record') or table_selected('student_gpa') or summary or rules is not None:
+        course_writer = open_table_writer('student_course_record', part=shard)
+        gpa_writer = open_table_writer('student_gpa', part=shard)
+        with course_writer, gpa_writer:
+            gpa = generate_course_and_gpa(spine.iter_students(start, end), ctx.course_offerings,
+                                    course_writer, gpa_writer, make_np_rng('student_course_record', shard),
+                                    summary=summary)
+        parts['student_course_record'] = course_writer.count
+        parts['student_gpa'] = gpa_writer.count
+
+    if table_selected('student_department'):
+        rows = generate_student_department_records(spine.iter_students(start, end), ctx.user_index,
+                                                   make_rng('student_department', shard))
+        w = write_student_department_part(rows, shard)
+        parts['student_department'] = w.count
+
+    if table_selected('achievement') or table_selected('achievement_verification') or summary:
+        achievements = generate_achievements(
+            zip(spine.iter_students(start, end), spine.num_achievements[start:end]),
+            ctx.user_index, make_rng('achievement', shard),
+            first_achievement=1 + sum(spine.num_achievements[:start]))
+        if summary:
+            achievements = summary.collect_achievements(achievements)
+        achievement_writer = open_table_writer('achievement', part=shard)
+        verification_writer = open_table_writer('achievement_verification', part=shard)
+        with achievement_writer, verification_writer:
+            # achievement 寫入後直接接給 verification 產生器，兩個檔案同步串流輸出
+            for v in generate_achievement_verifications(write_achievement_part(achievements, achievement_writer),
+                                                        ctx.user_index, make_rng('achievement_verification', shard)):
+                verification_writer.write(v)
+        parts['achievement'] = achievement_writer.count
+        parts['achievement_verification'] = verification_writer.count
+
+    if summary:
+        w = write_student_search_part(spine, shard, summary)
+        parts['student_search_mv'] = w.count
+
+    applications = None
+    if table_selected('application'):
+        eligibility = rules.match(spine.dept_idx[start:end], *gpa) if rules is not None else None
+        applications = draw_applications(spine, start, end, ctx.resources, make_rng('application', shard),
+                                         eligibility=eligibility)
+
+    return {
+        'shard': shard,
+        'parts': parts,
+        'applications': applications,
+        'gpa': gpa if rules is not None else None,
+    }
+
+def _phase1_task(shard):
+    return student_user_shard(shard, _ctx.first_student_serial, _ctx.department_data)
+
+def _phase2_task(shard):
+    return student_detail_shard(_ctx, shard)
+
+
+def run_generate():
+    """
+    依目前的 config 產生所有（或 --tables 指定的）表格檔，輸出到目前目錄。
+    config.INCREMENTAL 時先比對 content hash（cache.py），只重新產生有變動的表。
+    每個階段的時間 / 筆數 / 寫出大小記錄在 run_report.json（instrument.py）。
+    """
+    start_run()
+    requested = config.SELECTED_TABLES
+    if not config.INCREMENTAL:
+        generate_tables()
+        if requested is None:
+            merge_stage()
+        finish_run()
+        return
+
+    with stage('plan_build'):
+        hashes, stale = plan_build(requested)
+    if not stale and not config.SEARCH_SNAPSHOT:
+        print("✅ 所有表格都沒有變動，沿用上次的輸出。")
+        if requested is None and not os.path.exists(merged_file_name()):
+            merge_stage()
+        finish_run(regenerated=[])
+        return
+    if stale:
+        print(f"♻️ 重新產生 {len(stale)} 張表：{', '.join(stale)}（其餘沿用上次的輸出）")
+
+    config.SELECTED_TABLES = frozenset(stale)
+    try:
+        generate_tables()
+    finally:
+        config.SELECTED_TABLES = requested
+    record_build(hashes, stale)
+    if requested is None:
+        merge_stage()
+    finish_run(regenerated=stale)
+
+def merge_stage():
+    with stage('write_merged_files'):
+        write_merged_files()
+
+
+def generate_tables():
+    """
+    產生 table_selected() 選到的表；沒選到的表只在需要時於記憶體中產生（供下游使用）。
+    --check-constraints 時寫出的每一列都同時送給 constraints.py 的 validator process 檢查，最後再確認所有 PK / UNIQUE。
+    """
+    if config.CHECK_CONSTRAINTS:
+        start_validation()
+    try:
+        _generate_tables()
+        if config.CHECK_CONSTRAINTS:
+            with stage('check_constraints') as s:
+                s['rows'] = finish_validation()
+    finally:
+        stop_validation()
+
+
+def _generate_tables():
+    # 生成資料
+    with stage('generate_user_data') as s:
+        supplier_users, department_data = generate_user_data(CSV_FILENAME)
+        if not supplier_users:
+            raise SystemExit(1)
+        s['rows'] = len(supplier_users)
+
+    user_index = UserIndex(supplier_users, department_data)
+    company_users = user_index.companies
+    student_spine = StudentSpine(department_data)
+
+    _ctx.department_data = department_data
+    _ctx.first_student_serial = len(supplier_users) + 1
+    _ctx.user_index = user_index
+    _ctx.spine = student_spine
+
+    # Phase 1：學生 user 資料（分 shard 平行產生）
+    if any(table_selected(key) for key in STUDENT_TABLES):
+        with stage('student_users') as s:
+            student_results = run_shards(_phase1_task, num_student_shards())
+            for result in student_results:
+                student_spine.add_shard(result)
+            assign_student_numbers(student_spine)
+            s['rows'] = len(student_spine)
+        print(f"✅ 生成 {len(student_spine)} 筆 'student' 使用者資料（{len(student_results)} 個 shard，{config.WORKERS} 個 worker）。")
+
+    if table_selected('user'):
+        # 寫入 SQL 檔案
+        with stage('write_sql_file') as s:
+            num_users = s['rows'] = write_sql_file(user_index, student_results)
+
+        print("\n=======================================================")
+        print(f"🎉 成功生成所有 {num_users} 筆 'user' 資料到 {output_path(config.OUTPUT_SQL_FILE)}。")
+        print("\n下一步是生成 profile 表格，請參考以下 Foreign Key 資訊：")
+
+        print("\n--- Department Profile 資訊 (Code, Contact UUID) ---")
+        for dept in department_data:
+            print(f"代碼: {dept['code']}, 名稱: {dept['name']}, 聯絡人 UUID: {dept['contact_person_id']}")
+
+        print("\n--- Company Profile 資訊 (Name, Contact UUID) ---")
+        for i in range(min(5, len(company_users))):
+            print(f"公司名: {company_users[i]['company_name']}, 聯絡人 UUID: {company_users[i]['user_id']}")
+
+    if table_selected('department_profile'):
+        with stage('write_department_profile_sql') as s:
+            s['rows'] = write_department_profile_sql(department_data)
+    if table_selected('company_profile'):
+        with stage('write_company_profile_sql') as s:
+            s['rows'] = write_company_profile_sql(user_index)
+
+    # 只需要 department / company 使用者
+    if table_selected('user_application'):
+        with stage('write_user_application_sql') as s:
+            s['rows'] = write_user_application_sql(user_index, ADMIN_USER_ID)
+
+    # Phase 2 之前在主程序準備好共用資料：課程、resource
+    with stage('generate_resources') as s:
+        resources = generate_resources(user_index, NUM_RESOURCE=config.NUM_RESOURCE)
+        s['rows'] = len(resources)
+    _ctx.resources = resources
+    # --delta-days：基礎資料寫出的同時記下 application / push_record 的狀態，最後接著模擬之後的每一天
+    delta = DeltaState(student_spine, resources) if config.DELTA_DAYS else None
+    if table_selected('resource'):
+        with stage('write_resource_sql') as s:
+            s['rows'] = write_resource_sql(resources)
+    # --eligible-only：resource_condition 產生（寫檔）的同時記下規則，application / push_record 依規則抽
+    conditions = generate_resource_conditions(resources, user_index)
+    rules = None
+    if config.ELIGIBLE_ONLY and (table_selected('application') or table_selected('push_record')):
+        rules = EligibilityRules(resources, user_index.dept_codes)
+        conditions = rules.collect(conditions)
+    if table_selected('resource_condition'):
+        with stage('write_resource_condition_sql') as s:
+            s['rows'] = write_resource_condition_sql(conditions)
+    if rules is not None:
+        with stage('build_eligibility_rules') as s:
+            for _ in conditions:    # 沒有輸出 resource_condition 時在這裡產生
+                pass
+            s['rows'] = len(rules.build())
+    _ctx.eligibility_rules = rules
+
+    # Phase 2：學生相關表格（分 shard 平行產生），再依 shard 順序接回
+    detail_keys = [key for key in DETAIL_TABLES if table_selected(key)]
+    if detail_keys or table_selected('application') or rules is not None:
+        if (table_selected('student_course_record') or table_selected('student_gpa')
+                or table_selected('student_search_mv') or rules is not None):
+            with stage('generate_course_offerings') as s:
+                course_name_candidates = read_course_names_from_csv(COURSE_CSV)
+                _ctx.course_offerings = generate_course_offerings(student_spine, course_name_candidates)
+                s['rows'] = sum(len(ids) for ids in _ctx.course_offerings['course_id'])
+
+        with stage('student_details') as s:
+            detail_results = run_shards(_phase2_task, num_student_shards())
+            s['tables'] = {}
+            for key in detail_keys:
+                w = stitch_parts(key, detail_results)
+                s['tables'][key] = w.count
+                print(f"🎉 成功生成 {w.count} 筆 '{key}' 資料到 {w.filename}。")
+            s['rows'] = sum(s['tables'].values())
+        if table_selected('student_search_mv'):
+            write_load_script()
+
+        if table_selected('application'):
+            with stage('write_application_sql') as s:
+                applications = generate_applications(student_spine, resources, detail_results)
+                if delta is not None:
+                    applications = delta.collect_applications(applications)
+                s['rows'] = write_application_sql(applications)
+
+    # 生成 push_record
+    if table_selected('push_record'):
+        eligibility = None
+        if rules is not None:
+            with stage('match_eligibility') as s:
+                eligibility = rules.match(student_spine.dept_idx, *concat_gpa(r['gpa'] for r in detail_results))
+                s['rows'] = len(eligibility)
+        with stage('plan_push_events') as s:
+            push_events = plan_push_events(student_spine, user_index, resources, eligibility=eligibility)
+            s['rows'] = len(push_events)
+        with stage('write_push_record_sql') as s:
+            s['rows'] = write_push_record_sql(generate_push_records(student_spine, resources, push_events))
+        if delta is not None:
+            delta.next_push_id = s['rows'] + 1
+            delta.eligibility = eligibility
+
+    if delta is not None:
+        with stage('write_delta') as s:
+            s['tables'] = write_delta(delta, config.DELTA_DAYS, _ctx.course_offerings)
+            s['rows'] = sum(s['tables'].values())
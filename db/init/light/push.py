@@ -0,0 +1,152 @@
+"""
+push_record：department / company 把資源推給學生。
+先規劃每一次 push（event），排序後依序展開成 push_record 寫出，push_id 依時間遞增。
+"""
+import random
+from array import array
+from datetime import datetime, timedelta
+
+from . import config
+from .config import TZ
+from .seeding import make_rng, popularity, weighted_sample, subset_weights
+from .writers import ROW_TYPES, open_table_writer
+
+PushRecordRow = ROW_TYPES['push_record']
+
+
+def to_datetime_safe(dt):
+    """
+    將 date / datetime 統一轉成 tz-aware datetime
+    """
+    if isinstance(dt, datetime):
+        if dt.tzinfo is None:
+            # tz-naive → 加上 TZ
+            return dt.replace(tzinfo=TZ)
+        return dt
+    # dt 是 date → 轉成 tz-aware datetime
+    return datetime(dt.year, dt.month, dt.day, tzinfo=TZ)
+
+
+def index_resources_by_owner(resources, index):
+    """
+    supplier -> 該 supplier「自己的」resource index（依 resource 順序）。
+    department 以學系代碼為 key（同代碼的聯絡人共用資源，例如藥學系六年制 / 四年制），
+    company 以 user_id 為 key。
+    """
+    dept_user_ids = index.dept_code_by_contact
+    owner_index = {}
+    for idx, r in enumerate(resources):
+        supplier_id = r.supplier_id
+        key = ('department', dept_user_ids[supplier_id]) if supplier_id in dept_user_ids else supplier_id
+        owner_index.setdefault(key, []).append(idx)
+    return owner_index, dept_user_ids
+
+def draw_receivers(receiver_seed, num_students, num_receivers, pool=None):
+    """
+    一次 push 的 receiver（學生 index）；--skew student 時熱門學生較常收到推播。
+    pool（學生 index 的 list）不為 None 時只從 pool 中抽。
+    """
+    weights = popularity('student', num_students)
+    rng = random.Random(receiver_seed)
+    if pool is None:
+        return weighted_sample(rng, num_students, num_receivers, weights)
+    return [pool[k] for k in weighted_sample(rng, len(pool), num_receivers, subset_weights(weights, pool))]
+
+def pick_other_resource(rng, num_resources, own_set):
+    """在自己的資源以外均勻抽一個（在補集中抽，不必建整個補集 list）。"""
+    while True:
+        ridx = rng.randrange(num_resources)
+        if ridx not in own_set:
+            return ridx
+
+def plan_push_events(spine, index, resources, push_prob=0.01, max_push_per_resource=1000, eligibility=None):
+    """
+    第一階段：每一次 push（同一 pusher、同一 resource、同一時間）只記成一個 event，
+    receiver 只抽一次，以學生 index 的 array('i') 存在 event 裡（每個 receiver 4 bytes），寫檔時不必重抽。
+    回傳依 (push_datetime, 產生順序) 排好的 event list —— 排序的是 event 而不是 push_record，
+    event 數只跟 resource 數成正比。
+    eligibility（全體學生的 eligibility.Eligibility）不為 None 時先決定要推的 resource，
+    receiver 只從符合該 resource 資格的學生中抽，沒有人符合就不推。
+    """
+    rng = make_rng('push_record')
+    pushers = index.users   # 供應者只有 department / company
+
+    owner_index, dept_user_ids = index_resources_by_owner(resources, index)
+
+    resource_push_count = [0] * len(resources)
+    events = []
+
+    for pusher in pushers:
+        # 找出該 pusher 自己的資源
+        if pusher['role'] == 'department':
+            own_resources = owner_index.get(('department', dept_user_ids.get(pusher['user_id'])), [])
+        else:
+            own_resources = owner_index.get(pusher['user_id'], [])
+        own_set = set(own_resources)
+
+        for ridx in own_resources:
+            if resource_push_count[ridx] >= max_push_per_resource:
+                continue
+
+            remaining = max_push_per_resource - resource_push_count[ridx]
+            if eligibility is None:
+                num_receivers = rng.randint(1, min(len(spine), remaining))
+                receiver_seed = rng.getrandbits(64)
+                receivers = draw_receivers(receiver_seed, len(spine), num_receivers)
+
+                # 1% 機率推送非自己資源
+                if rng.random() < push_prob and len(own_set) < len(resources):
+                    ridx = pick_other_resource(rng, len(resources), own_set)
+            else:
+                if rng.random() < push_prob and len(own_set) < len(resources):
+                    ridx = pick_other_resource(rng, len(resources), own_set)
+                pool = eligibility.students_for(ridx).tolist()
+                if not pool:
+                    continue
+                num_receivers = rng.randint(1, min(len(pool), remaining))
+                receiver_seed = rng.getrandbits(64)
+                receivers = draw_receivers(receiver_seed, len(spine), num_receivers, pool)
+            r = resources[ridx]
+
+            # 同一次 push 的時間
+            start_dt = to_datetime_safe(pusher['registered_at'])
+            earliest_receiver_reg = spine.registered_at(min(receivers, key=spine.registered_us.__getitem__))
+            start_dt = max(start_dt, earliest_receiver_reg)
+            end_dt = to_datetime_safe(r.deadline) if r.deadline else config.NOW
+            if end_dt <= start_dt:
+                push_datetime = start_dt
+            else:
+                delta_days = (end_dt - start_dt).days
+                push_datetime = start_dt + timedelta(days=rng.randint(0, delta_days))
+
+            # 達到 max_push_per_resource 就停（至少會推給一人，與逐筆計數的寫法相同）；
+            # 改推別人的資源時 num_receivers 是依原 resource 的 remaining 抽的，可能要截短
+            num_pushed = max(1, min(num_receivers, max_push_per_resource - resource_push_count[ridx]))
+            resource_push_count[ridx] += num_pushed
+
+            events.append((push_datetime, len(events), pusher['user_id'], ridx, array('i', receivers[:num_pushed])))
+
+    events.sort(key=lambda e: (e[0], e[1]))
+    return events
+
+
+def generate_push_records(spine, resources, events):
+    """
+    第二階段：依排好的 event 順序展開 receiver，逐筆 yield push_record 並分配 push_id。
+    不需要外部排序或暫存檔，時間與 push_record 筆數成線性。
+    """
+    push_id = 0
+    for push_datetime, _, pusher_id, ridx, receivers in events:
+        resource_id = resources[ridx].resource_id
+        for receiver in receivers:
+            push_id += 1
+            yield PushRecordRow(push_id, pusher_id, spine.user_id(receiver), resource_id, push_datetime)
+
+
+def write_push_record_sql(push_records):
+    with open_table_writer('push_record') as w:
+        for r in push_records:
+            w.write(r)
+
+    print(f"🎉 成功以批次方式生成 {w.count} 筆 'push_record' 至 {w.filename}")
+    return w.count
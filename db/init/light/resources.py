@@ -0,0 +1,253 @@
+"""
+資源相關表格：resource、resource_condition、application。
+resource 在主程序產生（會被 application / push_record 隨機抽取）；application 的抽樣在各 shard 進行，
+quota 判斷則由主程序依學生順序決定。
+"""
+from array import array
+from datetime import date, timedelta
+
+from . import config
+from .seeding import make_rng, popularity, weighted_index, weighted_sample, subset_weights
+from .writers import ROW_TYPES, open_table_writer
+
+ResourceRow = ROW_TYPES['resource']
+ResourceConditionRow = ROW_TYPES['resource_condition']
+ApplicationRow = ROW_TYPES['application']
+
+
+def generate_resource_uuid(n):
+    """
+    模仿 generate_sequential_uuid()，但 prefix 從 '0001' 換成 '0002'
+    n 從 1 開始遞增
+    """
+    # n 轉成 12 位
+    tail = f"{n:012d}"
+    return f"00000000-0000-0000-0002-{tail}"
+
+def generate_resources(index, NUM_RESOURCE=200):
+    """
+    生成資源資料，新 schema: supplier_id 指向 user_id
+    保留原邏輯，只修正 supplier_id 與 title/description 對應
+    （resource 會被 application / push_record 隨機抽取，所以仍回傳 list）
+    """
+    resources = []
+    rng = make_rng('resource')
+    supplier_weights = popularity('supplier', len(index.users))   # --skew supplier：少數供應者擁有大部分資源
+
+    for i in range(1, NUM_RESOURCE + 1):
+        resource_id = generate_resource_uuid(i)
+        resource_type = rng.choice(['Scholarship', 'Internship', 'Lab', 'Competition', 'Others'])
+        quota = rng.randint(2, 10)
+
+        # 隨機選供應者
+        if index.users:
+            if supplier_weights:
+                supplier = index.users[weighted_index(rng, supplier_weights)]
+            else:
+                supplier = rng.choice(index.users)
+            supplier_id = supplier['user_id']
+            # 根據 role 決定名稱
+            if supplier['role'] == 'department':
+                supplier_name = (supplier.get('nickname') or supplier.get('real_name')).replace("聯絡人", "")
+            else:
+                supplier_name = (supplier.get('company_name') or supplier.get('nickname') or supplier.get('real_name'))
+        else:
+            supplier_id = None
+            supplier_name = "未知單位"
+
+        # title / description
+        if resource_type == 'Scholarship':
+            title = f"{supplier_name}獎學金"
+        elif resource_type == 'Internship':
+            title = f"{supplier_name}實習機會"
+        elif resource_type == 'Lab':
+            title = f"{supplier_name}實驗室機會"
+        elif resource_type == 'Competition':
+            title = f"{supplier_name}競賽資源"
+        else:
+            title = f"{supplier_name}其他資源"
+
+        description = title
+
+        # deadline 隨機 ±1.5 年
+        deadline = config.TODAY + timedelta(days=rng.randint(-550, 550))
+
+        # status 分配
+        if deadline < config.TODAY:  # 已過期
+            status = rng.choices(['Full','Unavailable'], weights=[0.5,0.5])[0]
+        else:  # 未過期
+            status = rng.choices(['Available','Canceled','Full'], weights=[0.6,0.1,0.3])[0]
+
+        resources.append(ResourceRow(
+            resource_id=resource_id,
+            resource_type=resource_type,
+            quota=quota,
+            supplier_id=supplier_id,
+            title=title,
+            deadline=deadline,
+            description=description,
+            status=status
+        ))
+
+    return resources
+
+
+def write_resource_sql(resources):
+    with open_table_writer('resource') as w:
+        for r in resources:
+            w.write(r)
+    print(f"🎉 成功生成 {w.count} 筆 'resource' 資料到 {w.filename}（batch）")
+    return w.count
+
+
+def generate_resource_conditions(resources, index):
+    """
+    生成 resource_condition 假資料（逐筆 yield）。
+    如果 resource 的 supplier 是 department，必須包含自己。
+    """
+    rng = make_rng('resource_condition')
+
+    # mapping: department user_id -> department_code
+    dept_user_ids = index.dept_code_by_contact
+    dept_codes = index.dept_codes
+
+    for r in resources:
+        # 隨機選一些科系，至少 1 個
+        num_depts = rng.randint(1, len(dept_codes))
+        selected_depts = rng.sample(dept_codes, num_depts)
+
+        # 如果 supplier 是 department，必須包含它
+        if r.supplier_id in dept_user_ids:
+            supplier_dept_code = dept_user_ids[r.supplier_id]
+            if supplier_dept_code not in selected_depts:
+                # 把第一個替換成 supplier 自己
+                selected_depts[0] = supplier_dept_code
+
+        for dept_code in selected_depts:
+            # avg_gpa: 50% 機率有值，介於 3.7~4.3
+            avg_gpa = round(rng.uniform(3.7, 4.3), 2) if rng.random() < 0.5 else None
+
+            # current_gpa: 50% 機率有值，介於 3.7~4.3
+            current_gpa = round(rng.uniform(3.7, 4.3), 2) if rng.random() < 0.5 else None
+
+            # is_poor: 只有 Scholarship 可能 True，20% 機率
+            is_poor = r.resource_type == 'Scholarship' and rng.random() < 0.2
+
+            yield ResourceConditionRow(
+                resource_id=r.resource_id,
+                department_id=dept_code,
+                avg_gpa=avg_gpa,
+                current_gpa=current_gpa,
+                is_poor=is_poor
+            )
+
+
+def write_resource_condition_sql(resource_conditions):
+    with open_table_writer('resource_condition') as w:
+        for rc in resource_conditions:
+            w.write(rc)
+
+    print(f"🎉 成功生成 {w.count} 筆 'resource_condition' 資料到 {w.filename}（batch）")
+    return w.count
+
+
+APPLICATION_STATUSES = ['submitted', 'under_review', 'approved', 'rejected']
+APPLICATION_STATUS_CODE = {s: i for i, s in enumerate(APPLICATION_STATUSES)}
+
+def draw_application_status(r, rng):
+    """
+    回傳 (quota 未滿時的狀態, quota 已滿時的狀態)。
+    兩種情況都先抽好，shard 內的亂數消耗就與其他 shard 的 approved 人數無關；
+    主程序依學生順序累計 approved 人數後再決定用哪一個。
+    """
+    if r.status == 'Canceled':
+        return 'rejected', 'rejected'
+    if r.status == 'Full':
+        # 先 approved 到 quota，剩下都是 rejected
+        return 'approved', 'rejected'
+    if r.status == 'Unavailable':
+        choices = ['under_review', 'approved', 'rejected']
+        weights = [0.4, 0.4, 0.2]
+    else:  # Available
+        choices = ['submitted','under_review','approved','rejected']
+        weights = [0.3, 0.3, 0.2, 0.2]
+    open_status = rng.choices(choices, weights=weights)[0]
+    full_choices = [c for c in choices if c != 'approved']
+    full_weights = [w for c, w in zip(choices, weights) if c != 'approved']
+    full_status = rng.choices(full_choices, weights=full_weights)[0]
+    return open_status, full_status
+
+def draw_applications(spine, start, end, resources, rng, max_apply_per_student=5, eligibility=None):
+    """
+    application 的 shard 部分：選資源、申請日期、兩種候選狀態，以 array 回傳（每筆只佔幾個數字）。
+    --skew resource 時資源依 Zipf 熱門度抽，少數熱門資源拿到大部分申請。
+    eligibility（這個 shard 學生的 eligibility.Eligibility）不為 None 時只從符合資格的 resource 中抽，
+    沒有任何符合資格的 resource 的學生不申請。
+    """
+    resource_weights = popularity('resource', len(resources))
+    drawn = {
+        'student': array('l'),
+        'resource': array('l'),
+        'apply_date': array('l'),
+        'open_status': bytearray(),
+        'full_status': bytearray(),
+    }
+    for i in range(start, end):
+        num_apply = rng.randint(1, max_apply_per_student)
+        apply_start = spine.registered_at(i).date()
+
+        if eligibility is None:
+            chosen = weighted_sample(rng, len(resources), min(num_apply, len(resources)), resource_weights)
+        else:
+            candidates = eligibility.resources_for(i - start).tolist()
+            chosen = [candidates[k] for k in weighted_sample(rng, len(candidates), min(num_apply, len(candidates)),
+                                                             subset_weights(resource_weights, candidates))]
+
+        for ridx in chosen:
+            r = resources[ridx]
+            apply_end = min(r.deadline, config.TODAY) if r.deadline else config.TODAY
+            if apply_start > apply_end:
+                apply_date = apply_end
+            else:
+                apply_date = apply_start + timedelta(days=rng.randint(0, (apply_end - apply_start).days))
+
+            open_status, full_status = draw_application_status(r, rng)
+            drawn['student'].append(i)
+            drawn['resource'].append(ridx)
+            drawn['apply_date'].append(apply_date.toordinal())
+            drawn['open_status'].append(APPLICATION_STATUS_CODE[open_status])
+            drawn['full_status'].append(APPLICATION_STATUS_CODE[full_status])
+    return drawn
+
+def generate_applications(spine, resources, shard_results):
+    """依學生順序累計每個 resource 的 approved 人數，超過 quota 時改用 full_status。"""
+    # 用來追蹤每個 resource 的 approved 人數
+    approved_count = [0] * len(resources)
+    approved = APPLICATION_STATUS_CODE['approved']
+
+    for result in shard_results:
+        drawn = result['applications']
+        for i, ridx, ordinal, open_status, full_status in zip(
+                drawn['student'], drawn['resource'], drawn['apply_date'],
+                drawn['open_status'], drawn['full_status']):
+            r = resources[ridx]
+            quota_full = approved_count[ridx] >= r.quota
+            status = full_status if quota_full else open_status
+
+            if status == approved:
+                approved_count[ridx] += 1
+
+            yield ApplicationRow(
+                user_id=spine.user_id(i),
+                resource_id=r.resource_id,
+                apply_date=date.fromordinal(ordinal),
+                review_status=APPLICATION_STATUSES[status]
+            )
+
+
+def write_application_sql(applications):
+    with open_table_writer('application') as w:
+        for a in applications:
+            w.write(a)
+    print(f"🎉 成功生成 {w.count} 筆 'application' 資料到 {w.filename}（batch）")
+    return w.count
@@ -0,0 +1,113 @@
+"""
+student_search_mv 的離線快照（--search-snapshot）。
+
+後端的 CompanyService.searchStudents 查詢 student_search_mv，RefreshService 在 Redis key 過期時
+執行 REFRESH MATERIALIZED VIEW；剛灌完大量資料的資料庫第一次 refresh 要 join 全部選課與成就，非常慢。
+學生的各學期 GPA、修過的課、成就在 Phase 2 產生時就都知道了，這裡順便在 shard 內算出 view 的欄位，
+輸出成一般的表 student_search_snapshot（欄位與索引與 student_search_mv 相同），
+benchmark 可以直接查這張表，不必先付一次 refresh 的成本。
+
+限制：後端不會讀這張表。CompanyService 仍查 student_search_mv，而 Redis key 不存在（剛啟動）或過期時
+一律先 REFRESH，所以剛灌好的資料庫第一次搜尋還是要付完整的 refresh；matview 的內容也無法從外部載入。
+要量後端的搜尋延遲，得先自行 REFRESH 一次再開始計時。
+
+欄位算法對應 docs/backup.sql 的 view 定義：
+ - current_gpa / avg_gpa：student_gpa_view，semester 字串最大的 GPA 與所有學期的平均；沒有 GPA 為 NULL
+ - courses_taken：array_agg(DISTINCT course_id)
+ - achievements：array_agg(DISTINCT category)，只算 status = 'recognized'
+ 兩個陣列都是 LEFT JOIN 後 array_agg，所以沒有資料時是 {NULL} 而不是 {}（與 view 相同），元素依字串排序。
+ avg_gpa 依學期順序加總；view 的加總順序由執行計畫決定，最後一位數可能不同（差異在 1e-15 以內）。
+"""
+from .users import shard_range, student_profile_row
+from .writers import TABLE_SPECS, ROW_TYPES, open_table_writer, output_path
+
+StudentSearchRow = ROW_TYPES['student_search_mv']
+
+LOAD_SCRIPT = 'load_student_search.sql'
+
+SNAPSHOT_DDL = """CREATE TABLE {table} (
+    user_id UUID NOT NULL,
+    real_name VARCHAR(50) NOT NULL,
+    student_id VARCHAR(10) NOT NULL,
+    department_id VARCHAR(50) NOT NULL,
+    entry_year INT NOT NULL,
+    grade INT NOT NULL,
+    current_gpa FLOAT,
+    avg_gpa FLOAT,
+    courses_taken VARCHAR[],
+    achievements VARCHAR[]
+);
+"""
+
+# 與 student_search_mv 相同的索引（名稱改用 snapshot 前綴），資料載入後才建
+SNAPSHOT_INDEXES = [
+    ('idx_stu_snapshot_achievements', 'gin', 'achievements'),
+    ('idx_stu_snapshot_avg_gpa', 'btree', 'avg_gpa'),
+    ('idx_stu_snapshot_courses', 'gin', 'courses_taken'),
+    ('idx_stu_snapshot_current_gpa', 'btree', 'current_gpa'),
+    ('idx_stu_snapshot_dept', 'btree', 'department_id'),
+    ('idx_stu_snapshot_user', 'btree', 'user_id'),
+]
+
+
+class SearchSummary:
+    """一個 shard 內每位學生的各學期 GPA、修過的課、被認可的成就類別，在產生選課 / 成就時順便累積。"""
+    def __init__(self):
+        self.gpa = {}            # user_id -> [(semester, gpa)]
+        self.courses = {}        # user_id -> {course_id}
+        self.achievements = {}   # user_id -> {category}
+
+    def add_course(self, user_id, course_id):
+        self.courses.setdefault(user_id, set()).add(course_id)
+
+    def add_gpa(self, user_id, semester, gpa):
+        self.gpa.setdefault(user_id, []).append((semester, gpa))
+
+    def collect_achievements(self, achievements):
+        """包住 achievement 產生器：記下 recognized 的類別，每一筆照原樣 yield 出去。"""
+        for a in achievements:
+            if a.status == 'recognized':
+                self.achievements.setdefault(a.user_id, set()).add(a.category)
+            yield a
+
+    def search_row(self, profile, real_name):
+        user_id, student_id, dept_code, entry_year, grade = profile
+        gpas = self.gpa.get(user_id)
+        current_gpa = avg_gpa = None
+        if gpas:
+            current_gpa = max(gpas)[1]
+            avg_gpa = sum(g for _, g in gpas) / len(gpas)
+        return StudentSearchRow(user_id, real_name, student_id, dept_code, entry_year, grade,
+                                current_gpa, avg_gpa,
+                                sorted(self.courses.get(user_id, ())) or [None],
+                                sorted(self.achievements.get(user_id, ())) or [None])
+
+def write_student_search_part(spine, shard, summary):
+    start, end = shard_range(shard)
+    with open_table_writer('student_search_mv', part=shard) as w:
+        for i in range(start, end):
+            w.write(summary.search_row(student_profile_row(spine, i), spine.real_name[i]))
+    return w
+
+
+def write_load_script():
+    """
+    load_student_search.sql：建立 student_search_snapshot、載入快照、建索引並 ANALYZE。
+    需在主資料載入後、以輸出目錄為工作目錄執行（與 load_tsv.sql 相同）。
+    """
+    filename, table, columns = TABLE_SPECS['student_search_mv'][:3]
+    path = output_path(filename, table)
+    with open(LOAD_SCRIPT, 'w', encoding='utf-8') as f:
+        f.write("-- student_search_mv 的離線快照（python -m light generate --search-snapshot）\n")
+        f.write("-- 主資料載入後執行：psql -f load_student_search.sql\n")
+        f.write("-- 注意：只建立 benchmark 用的表，後端查的 student_search_mv 不受影響，第一次搜尋仍會 REFRESH\n\n")
+        f.write(f"DROP TABLE IF EXISTS {table};\n")
+        f.write(SNAPSHOT_DDL.format(table=table))
+        if path.endswith('.tsv'):
+            f.write(f"\\copy {table} ({', '.join(columns)}) FROM '{path}'\n")
+        else:
+            f.write(f"\\i {path}\n")
+        for name, method, column in SNAPSHOT_INDEXES:
+            f.write(f"CREATE INDEX {name} ON {table} USING {method} ({column});\n")
+        f.write(f"ANALYZE {table};\n")
+    print(f"🎉 已產生 {LOAD_SCRIPT}（主資料載入後 psql -f {LOAD_SCRIPT}）")
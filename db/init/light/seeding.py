@@ -0,0 +1,199 @@
+"""
+亂數來源：每個 (表, shard) 各自衍生的 random.Random / numpy Generator / Faker，
+以及 --name-pools 用的姓名 pool。Faker 與 numpy 都在第一次用到時才 import。
+"""
+import bisect
+import hashlib
+import json
+import os
+import random
+import uuid
+from datetime import timedelta
+from functools import lru_cache
+
+from . import config
+
+
+def derive_seed(table, shard=0):
+    """由 (全域 seed, 表名, shard 編號) 衍生 64-bit 種子，與執行順序、worker 數無關。"""
+    digest = hashlib.sha256(f"{config.SEED}:{table}:{shard}".encode()).digest()
+    return int.from_bytes(digest[:8], 'big')
+
+def make_rng(table, shard=0):
+    return random.Random(derive_seed(table, shard))
+
+def make_np_rng(table, shard=0):
+    """向量化路徑用的 numpy Generator，種子與 make_rng 相同來源。"""
+    import numpy as np
+    return np.random.default_rng(derive_seed(table, shard))
+
+def make_fakers(table, shard=0):
+    """
+    回傳 (fake_ch, fake_en)：中英文 Faker 與專門產生英文名的 Faker，種子同樣由 (表, shard) 衍生。
+    --name-pools 時改回傳同介面的 PoolFaker。
+    """
+    if config.USE_NAME_POOLS:
+        pools = load_name_pools()
+        return (PoolFaker(pools, derive_seed(table, shard), english=False),
+                PoolFaker(pools, derive_seed(f"{table}:en", shard), english=True))
+    from faker import Faker
+
+    # 設置 Faker 使用中文和英文
+    fake_ch = Faker(['zh_TW', 'en_US'])
+    fake_ch.seed_instance(derive_seed(table, shard))
+    # 設置一個專門用於生成英文名的 Faker 實例
+    fake_en = Faker('en_US')
+    fake_en.seed_instance(derive_seed(f"{table}:en", shard))
+    return fake_ch, fake_en
+
+def random_uuid4(rng):
+    """用指定的亂數流產生 version 4 UUID（取代 uuid4()，輸出才可重現）。"""
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def get_suffix(fake, serial):
+    """
+    Generates a random integer suffix in [100000, 999999].
+    Usernames stay unique because of the serial / index placed before the suffix, not because of this value.
+    """
+    if config.USE_NAME_POOLS:
+        # 由序號一對一換算（SUFFIX_MULTIPLIER 與 900000 互質），不同序號不會撞號
+        return 100000 + serial * config.SUFFIX_MULTIPLIER % 900000
+    return fake.random_int(min=100000, max=999999)
+
+def serial_email(fake, serial):
+    """email 的 local part 加上使用者序號：不必靠 Faker.unique 重抽也保證唯一。"""
+    local, domain = fake.email().split('@')
+    return f"{local}.{serial}@{domain}"
+
+# ---------------------------
+# --skew：Zipf 熱門度
+# 真實流量集中在少數熱門對象（少數獎學金吸走大部分申請、少數供應者擁有大部分資源），
+# 均勻抽樣測不出 hot row 的鎖競爭與偏斜資料下的 index / planner 行為。
+# ---------------------------
+def popularity(kind, n):
+    """
+    n 個 kind（config.SKEW_KINDS）對象的 Zipf 累積權重，config.SKEW[kind] 為 0 時回傳 None（均勻）。
+    第 r 熱門（r 從 1 起）的權重為 1 / r^s；誰最熱門由 (seed, kind) 決定的亂數排列指定，
+    不會總是前幾號最熱門。
+    """
+    s = config.SKEW[kind]
+    if not s or n <= 0:
+        return None
+    return _zipf_cum_weights(kind, n, s, config.SEED)
+
+@lru_cache(maxsize=None)
+def _zipf_cum_weights(kind, n, s, seed):
+    rank = list(range(1, n + 1))
+    make_rng(f"popularity:{kind}").shuffle(rank)
+    cum_weights = []
+    total = 0.0
+    for r in rank:
+        total += r ** -s
+        cum_weights.append(total)
+    return cum_weights
+
+def weighted_index(rng, cum_weights):
+    """依累積權重抽一個 index（與 rng.choices(range(n), cum_weights=...) 相同，但不建 list）。"""
+    return bisect.bisect(cum_weights, rng.random() * cum_weights[-1], 0, len(cum_weights) - 1)
+
+def subset_weights(cum_weights, items):
+    """popularity() 的累積權重限制在 items（對象的 index）上；cum_weights 為 None 時回傳 None。"""
+    if cum_weights is None:
+        return None
+    subset = []
+    total = 0.0
+    for i in items:
+        total += cum_weights[i] - (cum_weights[i - 1] if i else 0.0)
+        subset.append(total)
+    return subset
+
+def weighted_sample(rng, n, k, cum_weights=None):
+    """
+    從 range(n) 不重複抽 k 個。cum_weights 為 None 時就是 rng.sample(range(n), k)（亂數消耗也相同）；
+    否則依權重逐一抽、抽到重複就重抽，重抽超過 4k 次（k 接近 n、冷門對象權重太小）時，
+    剩下的名額從還沒抽到的對象中均勻補齊。
+    """
+    if cum_weights is None:
+        return rng.sample(range(n), k)
+    chosen = {}
+    attempts = 0
+    while len(chosen) < k and attempts < 4 * k:
+        chosen.setdefault(weighted_index(rng, cum_weights))
+        attempts += 1
+    if len(chosen) < k:
+        rest = [i for i in range(n) if i not in chosen]
+        chosen.update(dict.fromkeys(rng.sample(rest, k - len(chosen))))
+    return list(chosen)
+
+# ---------------------------
+# --name-pools：預先抽好的姓名 / email / 公司名 pool
+# 只在第一次用 Faker 抽 NAME_POOL_SIZE 個值，之後從快取檔讀取，逐筆產生時只剩 rng.choice + 字串格式化
+# ---------------------------
+NAME_POOL_SIZE = 5000
+_name_pools = None
+
+def load_name_pools(size=NAME_POOL_SIZE):
+    global _name_pools
+    if _name_pools is not None:
+        return _name_pools
+
+    path = os.path.join(config.CACHE_DIR, f"name_pools_seed{config.SEED}_n{size}.json")
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            _name_pools = json.load(f)
+        return _name_pools
+
+    from faker import Faker
+
+    fake_ch = Faker(['zh_TW', 'en_US'])
+    fake_ch.seed_instance(derive_seed('name_pool'))
+    fake_en = Faker('en_US')
+    fake_en.seed_instance(derive_seed('name_pool:en'))
+    emails = [fake_ch.email().split('@') for _ in range(size)]
+    _name_pools = {
+        'name': [fake_ch.name() for _ in range(size)],
+        'first_name': [fake_ch.first_name() for _ in range(size)],
+        'last_name': [fake_ch.last_name() for _ in range(size)],
+        'first_name_en': [fake_en.first_name() for _ in range(size)],
+        'company': [fake_ch.company() for _ in range(size)],
+        'email_local': [local for local, _ in emails],
+        'email_domain': sorted({domain for _, domain in emails}),
+    }
+
+    # 先寫暫存檔再 rename，平行執行時不會讀到寫一半的快取
+    os.makedirs(config.CACHE_DIR, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(_name_pools, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+    print(f"✅ 已建立姓名 pool 快取 {path}")
+    return _name_pools
+
+class PoolFaker:
+    """與 make_fakers() 用到的 Faker 方法同介面，值從 name pool 取樣，亂數用自己的 random.Random。"""
+    def __init__(self, pools, seed, english=False):
+        self.pools = pools
+        self.rng = random.Random(seed)
+        self.english = english
+
+    def name(self):
+        return self.rng.choice(self.pools['name'])
+
+    def first_name(self):
+        return self.rng.choice(self.pools['first_name_en' if self.english else 'first_name'])
+
+    def last_name(self):
+        return self.rng.choice(self.pools['last_name'])
+
+    def company(self):
+        return self.rng.choice(self.pools['company'])
+
+    def email(self):
+        return f"{self.rng.choice(self.pools['email_local'])}@{self.rng.choice(self.pools['email_domain'])}"
+
+    def random_int(self, min=0, max=9999):
+        return self.rng.randint(min, max)
+
+    def date_time_between(self, start_date, end_date, tzinfo=None):
+        seconds = max(0, int((end_date - start_date).total_seconds()))
+        return (start_date + timedelta(seconds=self.rng.randint(0, seconds))).astimezone(tzinfo)
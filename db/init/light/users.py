@@ -0,0 +1,560 @@
+"""
+使用者相關表格：user（department / company / student）、各種 profile、user FK 更新與 user_application。
+學生以 shard 為單位產生，後續表格需要的欄位收在 StudentSpine。
+"""
+import csv
+import re
+from array import array
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from types import MappingProxyType
+
+from . import config
+from .config import (TZ, DEFAULT_PASSWORD_HASH, STUDENT_SHARD_SIZE, CSV_FILENAME,
+                     NUM_SOFT_DELETED_STUDENTS, NUM_SOFT_DELETED_COMPANIES, MAX_ACHIEVEMENTS_PER_STUDENT)
+from .seeding import make_rng, make_fakers, random_uuid4, get_suffix, serial_email
+from .writers import ONE_MICROSECOND, ROW_TYPES, open_table_writer, stitch_parts, table_selected
+
+UserRow = ROW_TYPES['user']
+
+
+def generate_sequential_uuid(n):
+    """
+    生成固定前綴 + 序號的 UUID 字串
+    例如：
+      1 -> 00000000-0000-0000-0000-000000000001
+      2 -> 00000000-0000-0000-0000-000000000002
+    """
+    return f"00000000-0000-0000-0000-{n:012d}"
+
+
+def generate_soft_delete_timestamps(registered_at, rng):
+    """生成在註冊時間之後的刪除時間。"""
+    time_diff = timedelta(days=rng.randint(1, 365*2))
+    deleted_at = registered_at + time_diff
+    
+    if deleted_at > config.NOW:
+        deleted_at = config.NOW
+        
+    return deleted_at
+
+def generate_nickname(role, real_name, dept_name=None, company_name=None, rng=None, fakes=None):
+    """根據角色生成特殊的 nickname (已修正)。學生需要傳入 rng 與 (fake_ch, fake_en)。"""
+    if role == 'student':
+        fake_ch, fake_en = fakes
+        # 50% 英文名 (綽號)，50% 中文綽號
+        if rng.random() < 0.5:
+            # 學生英文綽號
+            return fake_en.first_name() 
+        else:
+            # 學生中文綽號
+            return fake_ch.last_name() if real_name[-1] in '惠芳美麗' else fake_ch.first_name()
+    
+    elif role == 'department':
+        # [學系名稱]聯絡人 (無空格)
+        return f"{dept_name.strip().replace(' ', '')}聯絡人"
+        
+    elif role == 'company':
+        # [公司名稱]聯絡人 (無空格)
+        return f"{company_name.strip().replace(' ', '')}聯絡人"
+    
+    return real_name
+
+# --- 3. 讀取學系資料並處理特殊情況 ---
+
+def load_department_data(csv_filename):
+    """讀取 CSV 並處理特殊學系重複的問題。"""
+    departments = []
+    
+    try:
+        # 使用 UTF-8 讀取
+        with open(csv_filename, 'r', encoding='utf-8') as f:
+            csv_content = f.read()
+    except FileNotFoundError:
+        print(f"錯誤: 找不到檔案 {csv_filename}。請確認檔案存在於同目錄下。")
+        return []
+
+    reader = csv.reader(StringIO(csv_content))
+    next(reader)  # 跳過標題行
+    
+    pharmacy_count = 0
+    pt_count = 0
+
+    for row in reader:
+        if not row or len(row) < 2: continue
+        
+        dept_code = row[0].strip()
+        dept_name = row[1].strip()
+        
+        # 處理藥學系 (代碼 A120)
+        if dept_code == 'A120':
+            pharmacy_count += 1
+            if pharmacy_count == 1:
+                dept_name = '藥學系(六年制)'
+            else:
+                dept_name = '藥學系(四年制)'
+        
+        # 處理物理治療學系 (代碼 B040)
+        if dept_code == 'B040':
+            pt_count += 1
+            if pt_count == 1:
+                dept_name = '物理治療學系(六年制)'
+            else:
+                dept_name = '物理治療學系(四年制)'
+
+        departments.append({
+            'code': dept_code,
+            'name': dept_name.strip().replace(' ', ''), # 確保學系名稱無空格
+            'abbr': dept_name.strip().replace(' ', '')[:3] # 仍然保留一個簡稱用於 username
+        })
+        
+    print(f"✅ 成功讀取並處理 {len(departments)} 筆學系資料。")
+    return departments
+
+# --- 4. 主生成邏輯 ---
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# student_id = 學制(1) + 入學年末兩碼(2) + 系代碼前三碼(3) + 系所-年度流水號，student_profile.student_id 為 VARCHAR(10)，
+# 流水號最多 4 碼：1..999 為 3 位數字（原本的格式）、1000..9999 為 4 位數字，再之後為英文字母開頭的 4 碼 36 進位
+# （A000..ZZZZ）。三種寫法的長度或首字不同，彼此不會撞號；流水號依印出來的 (入學年末兩碼, 系代碼前三碼) 分組，
+# 每組最多 STUDENT_NO_CAPACITY（約 122 萬）人，不必重抽也不必檢查是否重複。
+BASE36_DIGITS = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+STUDENT_NO_DECIMAL_MAX = 9999
+STUDENT_NO_CAPACITY = STUDENT_NO_DECIMAL_MAX + 26 * 36 ** 3
+
+def format_student_no(no):
+    """系所-年度流水號 → student_id 的末 3~4 碼（見上方說明）。"""
+    if no <= STUDENT_NO_DECIMAL_MAX:
+        return f"{no:03d}"
+    if no > STUDENT_NO_CAPACITY:
+        raise ValueError(f"系所-年度流水號 {no} 超過上限 {STUDENT_NO_CAPACITY}")
+    n, d2 = divmod(no - STUDENT_NO_DECIMAL_MAX - 1, 36)
+    n, d1 = divmod(n, 36)
+    n, d0 = divmod(n, 36)
+    return chr(ord('A') + n) + BASE36_DIGITS[d0] + BASE36_DIGITS[d1] + BASE36_DIGITS[d2]
+
+def num_student_shards():
+    return (config.NUM_STUDENTS + STUDENT_SHARD_SIZE - 1) // STUDENT_SHARD_SIZE
+
+def shard_range(shard):
+    """第 shard 批學生在全體學生中的 index 範圍 [start, end)。"""
+    start = shard * STUDENT_SHARD_SIZE
+    return start, min(config.NUM_STUDENTS, start + STUDENT_SHARD_SIZE)
+
+
+class StudentSpine:
+    """
+    學生的精簡欄位（array 儲存），取代把所有學生 dict 留在 all_users 裡。
+    後續每張表都用 student(i) / iter_students() 逐筆重建學生資料，
+    每位學生只佔幾十 bytes，scale-factor 放大時記憶體不會跟著 dict 數量暴增。
+    """
+    def __init__(self, department_data):
+        self.department_data = department_data
+        self.serial = array('q')          # user_id 序號（generate_sequential_uuid）
+        self.registered_us = array('q')   # registered_at，epoch 微秒
+        self.dept_idx = array('H')        # main_dept_code 在 department_data 的位置
+        self.level = bytearray()          # b'B' / b'R'
+        self.entry_year = array('h')      # 民國入學年
+        self.student_no = array('l')      # 系所-年度流水號，assign_student_numbers() 決定
+        self.num_achievements = array('B')
+        self.real_name = []               # 只有 --search-snapshot 時保留（student_search_mv 需要）
+
+    def __len__(self):
+        return len(self.serial)
+
+    def add_shard(self, result):
+        """接上 student_user_shard() 回傳的一批學生（必須依 shard 順序呼叫）。"""
+        self.serial.extend(result['serial'])
+        self.registered_us.extend(result['registered_us'])
+        self.dept_idx.extend(result['dept_idx'])
+        self.level.extend(result['level'])
+        self.entry_year.extend(result['entry_year'])
+        self.student_no.extend(array('l', bytes(len(result['serial']) * self.student_no.itemsize)))
+        self.num_achievements.extend(result['num_achievements'])
+        self.real_name.extend(result.get('real_name', ()))
+
+    def user_id(self, i):
+        return generate_sequential_uuid(self.serial[i])
+
+    def registered_at(self, i):
+        return (EPOCH + timedelta(microseconds=self.registered_us[i])).astimezone(TZ)
+
+    def student(self, i):
+        """重建第 i 位學生的 dict（欄位與舊版 all_users 內的學生相同）。"""
+        dept_code = self.department_data[self.dept_idx[i]]['code']
+        entry_year = self.entry_year[i]
+        return {
+            'user_id': self.user_id(i),
+            'role': 'student',
+            'registered_at': self.registered_at(i),
+            'main_dept_code': dept_code,
+            'entry_year': entry_year,
+            'student_id': f"{chr(self.level[i])}{str(entry_year)[-2:]}{dept_code[:3]}{format_student_no(self.student_no[i])}",
+        }
+
+    def iter_students(self, start=0, end=None):
+        for i in range(start, len(self) if end is None else end):
+            yield self.student(i)
+
+def generate_user_data(csv_filename=CSV_FILENAME):
+    """
+    生成 department / company 使用者（供應者，數量少，保留在 list）。
+    學生數量大，改由 student_user_shard() 分批平行產生。
+    """
+    uuid_user = 0
+    supplier_users = []
+    used_abbrs = set()   # username 的系所簡稱不可重複（簡稱相同時接上系代碼）
+    rng = make_rng('supplier_user')
+    fake_ch, fake_en = make_fakers('supplier_user')
+    
+    # 讀取學系資料
+    department_data = load_department_data(csv_filename)
+    if not department_data:
+        return [], []
+
+    # ---------------------------------------------
+    # A. DEPARTMENT USERS (學系聯絡人)
+    # ---------------------------------------------
+    for dept in department_data:
+        uuid_user += 1
+        user_id = generate_sequential_uuid(uuid_user)
+        real_name = fake_ch.name() 
+        registered_at = fake_ch.date_time_between(start_date=config.NOW - timedelta(days=5*365),
+                                                  end_date=config.NOW - timedelta(days=365), tzinfo=TZ)
+        safe_abbr = re.sub(r'[^a-zA-Z0-9]', '', dept['abbr'])
+        if not safe_abbr:
+            safe_abbr = dept['code'].lower()
+        if safe_abbr in used_abbrs:
+            safe_abbr = f"{safe_abbr}{dept['code'].lower()}"
+        used_abbrs.add(safe_abbr)
+        
+        # 如果是資管系聯絡人，is_admin 設為 True
+        is_admin_flag = True if dept['code'] == '7050' else False
+
+        user = {
+            'user_id': user_id,
+            'real_name': real_name,
+            'email': serial_email(fake_ch, uuid_user) if config.USE_NAME_POOLS else fake_ch.unique.email(),
+            'username': f"{safe_abbr}_host_{get_suffix(fake_ch, uuid_user)}",
+            'password': DEFAULT_PASSWORD_HASH,
+            'nickname': generate_nickname('department', real_name, dept_name=dept['name']),
+            'role': 'department',
+            'is_admin': is_admin_flag,   # <-- 這裡設定
+            'registered_at': registered_at,
+            'deleted_at': datetime(9999, 12, 31, 23, 59, 59, tzinfo=TZ)
+        }
+        supplier_users.append(user)
+        dept['contact_person_id'] = user_id
+    
+    print(f"✅ 生成 {len(department_data)} 筆 'department' 使用者資料。")
+
+    # ---------------------------------------------
+    # B. COMPANY USERS (公司聯絡人)
+    # ---------------------------------------------
+    
+    for i in range(config.NUM_COMPANIES):
+        is_deleted = i < NUM_SOFT_DELETED_COMPANIES
+        
+        uuid_user += 1
+        user_id = generate_sequential_uuid(uuid_user)
+        real_name = fake_ch.name()
+        raw_company_name = fake_ch.company()
+        # 後綴不再用在名稱上，但仍照舊抽一次：維持 Faker 的亂數消耗，後面的欄位才與原本相同
+        get_suffix(fake_ch, uuid_user)
+        
+        registered_at = fake_ch.date_time_between(start_date=config.NOW - timedelta(days=3*365), end_date=config.NOW, tzinfo=TZ)
+        
+        if is_deleted:
+            deleted_at = generate_soft_delete_timestamps(registered_at, rng)
+        else:
+            deleted_at = datetime(9999, 12, 31, 23, 59, 59, tzinfo=TZ)
+
+        user = {
+            'user_id': user_id,
+            'real_name': real_name,
+            'email': serial_email(fake_ch, uuid_user) if config.USE_NAME_POOLS else fake_ch.unique.email(),
+            'username': f"comp_{i}_{get_suffix(fake_ch, uuid_user)}",
+            'password': DEFAULT_PASSWORD_HASH,
+            # 使用完整的公司名稱
+            'nickname': generate_nickname('company', real_name, company_name=raw_company_name),
+            'role': 'company',
+            'is_admin': False,
+            'registered_at': registered_at,
+            'deleted_at': deleted_at,
+            'company_name': raw_company_name # 暫存原始公司名，供後續 company_profile 使用
+        }
+        supplier_users.append(user)
+
+    print(f"✅ 生成 {config.NUM_COMPANIES} 筆 'company' 使用者資料。")
+
+    return supplier_users, department_data
+
+class UserIndex:
+    """
+    department / company 使用者的唯讀索引：generate_user_data() 之後建一次，所有 generator 共用，
+    不必在每一筆資料裡重新依 role 過濾 supplier_users。
+    """
+    def __init__(self, supplier_users, department_data):
+        self.users = tuple(supplier_users)
+        self.by_id = MappingProxyType({u['user_id']: u for u in supplier_users})
+        self.departments = tuple(u for u in supplier_users if u['role'] == 'department')
+        self.companies = tuple(u for u in supplier_users if u['role'] == 'company')
+        self.department_emails = tuple(u['email'] for u in self.departments)
+        self.company_emails = tuple(u['email'] for u in self.companies)
+        self.company_names = tuple(u['company_name'] for u in self.companies)
+        self.dept_codes = tuple(dept['code'] for dept in department_data)
+        self.dept_names = tuple(dept['name'] for dept in department_data)
+        # department 聯絡人 user_id -> department_id
+        self.dept_code_by_contact = MappingProxyType(
+            {dept['contact_person_id']: dept['code'] for dept in department_data})
+        # company 聯絡人 user_id -> company_id
+        self.company_id_by_user = MappingProxyType(
+            {u['user_id']: generate_sequential_company_uuid(int(u['user_id'][-12:])) for u in self.companies})
+
+def calculate_entry_year(registered_at):
+    """
+    registered_at: datetime
+    回傳學生入學民國年
+    """
+    # 以月份為判斷，如果已過 9 個月就算 n 年，否則 n-1 年
+    diff = config.NOW - registered_at
+    diff_in_months = diff.days // 30  # 粗略換算月份
+    years = diff_in_months // 12
+
+    # 超過 9 個月就算 n 年，否則 n-1 年
+    if (diff_in_months % 12) >= 9:
+        entry_year_ad = registered_at.year + years
+    else:
+        entry_year_ad = registered_at.year + years - 1
+
+    # 轉成民國年
+    entry_year_minguo = entry_year_ad - 1911
+    return entry_year_minguo
+
+def student_user_shard(shard, first_serial, department_data):
+    """
+    C. STUDENT USERS (學生) —— Phase 1，一次處理一個 shard。
+    user 資料寫到 part 檔；後續表格需要的欄位（主修系、學制、入學年、成就數）
+    以 array 回傳，由主程序依 shard 順序接成 StudentSpine。
+    """
+    start, end = shard_range(shard)
+    rng = make_rng('student_user', shard)
+    fake_ch, fake_en = make_fakers('student_user', shard)
+    profile_rng = make_rng('student_profile', shard)
+    achievement_rng = make_rng('achievement_count', shard)
+
+    result = {
+        'shard': shard,
+        'serial': array('q'),
+        'registered_us': array('q'),
+        'dept_idx': array('H'),
+        'level': bytearray(),
+        'entry_year': array('h'),
+        'num_achievements': array('B'),
+    }
+    if table_selected('student_search_mv'):
+        result['real_name'] = []
+
+    with open_table_writer('user', part=shard) as w:
+        for i in range(start, end):
+            is_deleted = i < NUM_SOFT_DELETED_STUDENTS
+
+            uuid_user = first_serial + i
+            real_name = fake_ch.name()
+            registered_at = fake_ch.date_time_between(start_date=config.NOW - timedelta(days=4*365), end_date=config.NOW, tzinfo=TZ)
+
+            if is_deleted:
+                deleted_at = generate_soft_delete_timestamps(registered_at, rng)
+            else:
+                deleted_at = datetime(9999, 12, 31, 23, 59, 59, tzinfo=TZ)
+
+
+            w.write(UserRow(
+                user_id=generate_sequential_uuid(uuid_user),
+                real_name=real_name,
+                email=serial_email(fake_ch, uuid_user),  # 各 shard 獨立產生也不會撞號
+                # 學生 index 已經唯一（與 {系所簡稱}_host_ / comp_{i}_ 也不同形），隨機後綴只是裝飾，不必檢查重複
+                username=f"std_{i}_{get_suffix(fake_ch, uuid_user)}",
+                password=DEFAULT_PASSWORD_HASH,
+                nickname=generate_nickname('student', real_name, rng=rng, fakes=(fake_ch, fake_en)),
+                role='student',
+                is_admin=False,
+                registered_at=registered_at,
+                deleted_at=deleted_at,
+                company_id=None,
+                department_id=None,
+            ))
+
+            result['serial'].append(uuid_user)
+            result['registered_us'].append((registered_at - EPOCH) // ONE_MICROSECOND)
+            result['dept_idx'].append(rng.randrange(len(department_data)))  # 供後續 student_profile 使用
+            result['level'].append(ord(profile_rng.choice(['B', 'R'])))
+            result['entry_year'].append(calculate_entry_year(registered_at))
+            result['num_achievements'].append(achievement_rng.randint(0, MAX_ACHIEVEMENTS_PER_STUDENT))
+            if 'real_name' in result:
+                result['real_name'].append(real_name)
+
+    result['parts'] = {'user': w.count}
+    return result
+
+def assign_student_numbers(spine):
+    """
+    依學生順序分配系所-年度流水號（需要全體學生，所以在主程序執行）：同一組（入學年末兩碼, 系代碼前三碼）的學生
+    依 index 順序編為 1, 2, 3……，與 shard / worker 數無關。以 numpy 穩定排序一次算完，不必逐筆查 dict。
+    """
+    import numpy as np
+
+    if not len(spine):
+        return
+    prefixes = {}
+    dept_prefix = np.array([prefixes.setdefault(dept['code'][:3], len(prefixes)) for dept in spine.department_data],
+                           dtype=np.int64)
+    year = np.frombuffer(spine.entry_year, dtype=spine.entry_year.typecode).astype(np.int64) % 100
+    group = year * len(prefixes) + dept_prefix[np.frombuffer(spine.dept_idx, dtype=spine.dept_idx.typecode)]
+
+    order = np.argsort(group, kind='stable')
+    sorted_group = group[order]
+    starts = np.flatnonzero(np.append(True, sorted_group[1:] != sorted_group[:-1]))
+    sizes = np.diff(np.append(starts, len(group)))
+    if sizes.max() > STUDENT_NO_CAPACITY:
+        raise ValueError(f"❌ 同一系所-年度有 {sizes.max()} 位學生，超過 student_id 流水號的上限 {STUDENT_NO_CAPACITY}")
+    numbers = np.empty(len(group), dtype=np.int64)
+    numbers[order] = np.arange(len(group)) - np.repeat(starts, sizes) + 1
+    np.frombuffer(spine.student_no, dtype=spine.student_no.typecode)[:] = numbers
+
+# --- 5. 將資料寫入 SQL 文件 ---
+
+def supplier_user_row(user, index):
+    """department / company 使用者：department_id / company_id 在這裡就填好，不必事後再 UPDATE。"""
+    return UserRow(
+        user['user_id'], user['real_name'], user['email'], user['username'],
+        user['password'], user['nickname'], user['role'], user['is_admin'],
+        user['registered_at'], user['deleted_at'],
+        index.company_id_by_user.get(user['user_id']),
+        index.dept_code_by_contact.get(user['user_id'])
+    )
+
+def write_sql_file(index, student_results):
+    """先寫 department / company，再依 shard 順序接上學生的 part 檔，回傳寫入筆數。"""
+    w = open_table_writer('user')
+    for user in index.users:
+        w.write(supplier_user_row(user, index))
+    stitch_parts('user', student_results, writer=w)
+    return w.count
+
+def write_department_profile_sql(department_data):
+    with open_table_writer('department_profile') as w:
+        for dept in department_data:
+            w.write([dept['code'], dept['name'], dept['contact_person_id']])
+    print(f"🎉 成功生成 {w.count} 筆 'department_profile' 資料到 {w.filename}。")
+    return w.count
+
+def generate_sequential_company_uuid(n):
+    """
+    公司 ID 使用土方法固定前綴 + 序號
+    例如：
+      1 -> 00000000-0000-0001-0000-000000000001
+      81 -> 00000000-0000-0001-0000-000000000081
+    """
+    return f"00000000-0000-0000-0001-{int(n):012d}"
+
+INDUSTRY_BOX = ['科技業','生技業','服務業','金融業','醫療業','教育業','餐飲業','零售業','製造業','建築業','運輸業','物流業','能源業','農業','漁業','林業','娛樂業','媒體業','廣告業','旅遊業','保險業','電信業','資訊服務業','軟體業','硬體業','半導體業','汽車業','航太業','化工業','製藥業','時尚業','美容業','健身業','房地產業','法律業','會計業','諮詢業','非營利組織','藝術業','音樂業','影視業','出版業','電子商務','遊戲業','體育產業','環保產業','醫美業','家具業','餐飲連鎖業','跨境電商','社群媒體業','智能家居業']
+
+def write_company_profile_sql(index):
+    rng = make_rng('company_profile')
+    with open_table_writer('company_profile') as w:
+        for u in index.companies:
+            company_id = index.company_id_by_user[u['user_id']]  # 取 user_id 最後 12 位轉數字
+            w.write([company_id, u['company_name'], u['user_id'], rng.choice(INDUSTRY_BOX)])
+    
+    print(f"🎉 成功生成 {w.count} 筆 'company_profile' 資料到 {w.filename}。")
+    return w.count
+
+def student_profile_row(spine, i):
+    """第 i 位學生的 student_profile（student_search_mv 的快照也用同一份欄位）。"""
+    entry_year = spine.entry_year[i]
+    dept_code = spine.department_data[spine.dept_idx[i]]['code']  # 對應 department_profile.department_id
+    student_id = spine.student(i)['student_id']
+    grade = config.NOW.year - (entry_year + 1911) + 1
+    return [spine.user_id(i), student_id, dept_code, entry_year, grade]
+
+def write_student_profile_part(spine, shard):
+    """student_profile：entry_year / level / 流水號都已在 spine 裡，這裡只負責輸出。"""
+    start, end = shard_range(shard)
+    with open_table_writer('student_profile', part=shard) as w:
+        for i in range(start, end):
+            w.write(student_profile_row(spine, i))
+    return w
+
+APPL_STUDENT_NUM = 50
+APPL_COMPANY_NUM = 5
+
+def write_user_application_sql(index, admin_user_id):
+    """
+    index: department / company 使用者的 UserIndex（學生不會出現在 user_application）
+    admin_user_id: 資管系管理人 user_id
+    """
+    rng = make_rng('user_application')
+
+    with open_table_writer('user_application') as w:
+
+        # -----------------------------
+        # 1. 已註冊 user -> approved
+        # -----------------------------
+        approved_users = index.departments + index.companies
+        for u in approved_users:
+            application_id = random_uuid4(rng)
+            registered_at = u['registered_at']
+            submit_time = registered_at - timedelta(days=2)
+            review_time = registered_at - timedelta(hours=1)
+            status = 'approved'
+            review_comment = status
+
+            w.write([
+                application_id,
+                u['real_name'],
+                u['email'],
+                u['username'],
+                u['password'],
+                u['nickname'],
+                u['role'],
+                registered_at,
+                status,
+                submit_time,
+                review_time,
+                admin_user_id,
+                review_comment
+            ])
+
+        # -----------------------------
+        # 2. 額外公司 -> pending / rejected
+        # -----------------------------
+        extra_users = rng.sample(index.companies, APPL_COMPANY_NUM)
+        for u in extra_users:
+            application_id = random_uuid4(rng)
+            registered_at = u['registered_at']
+            submit_time = registered_at - timedelta(days=2)
+            status = rng.choice(['pending', 'rejected'])
+            review_time = registered_at - timedelta(hours=1) if status != 'pending' else None
+            reviewed_by = admin_user_id if status != 'pending' else None
+            review_comment = status
+
+            w.write([
+                application_id,
+                u['real_name'],
+                u['email'],
+                u['username'],
+                u['password'],
+                u['nickname'],
+                u['role'],
+                registered_at,
+                status,
+                submit_time,
+                review_time,
+                reviewed_by,
+                review_comment
+            ])
+
+    print(f"✅ 成功生成 user_application SQL 到 {w.filename}")
+    return w.count
@@ -0,0 +1,154 @@
+"""
+檢查輸出目錄：每張表的輸出檔是否存在、各有幾列。
+輸出格式由檔案本身判斷（.pgcopy / .tsv / COPY 區塊 / multi-row INSERT），不需要知道當初的 --format。
+"""
+import os
+import re
+from functools import lru_cache
+
+from .writers import TABLE_SPECS, BINARY_COPY_TYPES, COLUMN_TYPES, LOAD_ORDER, SNAPSHOT_TABLES, read_pgcopy
+
+# 可能的合併輸出（merge.py）
+MERGED_FILES = ['merged.sql', 'merged.sql.gz', 'merged.sql.zst', 'chunks/load_chunks.sh', 'load_tsv.sql']
+
+
+def find_table_file(key, directory='.'):
+    """依 binary → tsv → sql 的順序找 TABLE_SPECS[key] 的輸出檔，找不到回傳 None。"""
+    filename, table = TABLE_SPECS[key][:2]
+    stem = filename[:-4]
+    candidates = [stem + '.tsv', filename]
+    if table in BINARY_COPY_TYPES:
+        candidates.insert(0, stem + '.pgcopy')
+    for name in candidates:
+        path = os.path.join(directory, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+def count_rows(path, table):
+    """計算輸出檔的資料列數。"""
+    if path.endswith('.pgcopy'):
+        return sum(1 for _ in read_pgcopy(path, BINARY_COPY_TYPES[table]))
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.tsv'):
+            return sum(1 for _ in f)
+        rows = 0
+        in_copy = False
+        for line in f:
+            if in_copy:
+                if line.startswith('\\.'):
+                    in_copy = False
+                else:
+                    rows += 1
+            elif line.startswith('COPY '):
+                in_copy = True
+            elif line.startswith('('):
+                rows += 1
+        return rows
+
+_COPY_ESCAPES = {'\\': '\\', 't': '\t', 'n': '\n', 'r': '\r'}
+_COPY_ESCAPE = re.compile(r'\\(.)')
+# INSERT 的一個欄位：'字串'（'' 為跳脫的引號）或沒有引號的 NULL / TRUE / 數字
+_SQL_FIELD = re.compile(r"('[^']*(?:''[^']*)*')|([^\s,();]+)")
+
+def _unescape_copy(text):
+    return _COPY_ESCAPE.sub(lambda m: _COPY_ESCAPES.get(m.group(1), m.group(1)), text)
+
+# 欄位型別 -> 由欄位文字 v 還原成產生時的值的運算式（與 row_encoder 的 formatter 相反）；
+# 數字 / bool 轉回原本的型別，日期時間與 text[] 維持字串。INSERT 的 v 為 'xxx'（含引號）或 NULL / TRUE / 數字
+_FIELD_EXPR = {
+    'copy': ({'int4': "None if {v} == NULL else int({v})",
+              'float8': "None if {v} == NULL else float({v})",
+              'bool': "None if {v} == NULL else {v} == 't'",
+              'uuid': "None if {v} == NULL else {v}"},
+             "None if {v} == NULL else unescape({v}) if '\\\\' in {v} else {v}"),
+    'sql': ({'int4': "None if {v} == 'NULL' else int({v})",
+             'float8': "None if {v} == 'NULL' else float({v})",
+             'bool': "None if {v} == 'NULL' else {v} == 'TRUE'",
+             'uuid': "None if {v} == 'NULL' else {v}[1:-1]"},
+            "None if {v} == 'NULL' else {v}[1:-1].replace(\"''\", \"'\")"),
+}
+
+@lru_cache(maxsize=None)
+def row_decoder(kind, types):
+    """
+    回傳 decode(line) -> tuple：row_encoder 的反向，把 COPY text 的一行（kind='copy'）或 INSERT 的一列 '(...)'
+    （kind='sql'，結尾的 , 或 ; 可有可無）還原成一列的值。同一組 (kind, types) 只產生一次，例如 push_record 的 copy decoder 相當於
+        def decode(line):
+            v0, v1, v2, v3, v4, = line.rstrip('\\n').split('\\t')
+            return (None if v0 == NULL else int(v0), None if v1 == NULL else v1, ...)
+    INSERT 先以 ', ' 切開，字串裡剛好有 ', '（切出的欄位數不對）時才改用 regex 逐欄比對。
+    """
+    exprs, text_expr = _FIELD_EXPR[kind]
+    names = ''.join(f'v{i}, ' for i in range(len(types)))
+    if kind == 'copy':
+        split = [f"    {names}= line.rstrip('\\n').split('\\t')"]
+    else:
+        split = ["    fields = line.rstrip().rstrip(',;')[1:-1].split(', ')",
+                 f"    if len(fields) != {len(types)}:",
+                 "        fields = [q or b for q, b in findall(line)]",
+                 f"    {names}= fields"]
+    fields = ''.join(exprs.get(t, text_expr).format(v=f"v{i}") + ', ' for i, t in enumerate(types))
+    source = '\n'.join(["def decode(line):", *split, f"    return ({fields})"]) + '\n'
+    namespace = {'NULL': '\\N', 'unescape': _unescape_copy, 'findall': _SQL_FIELD.findall}
+    exec(source, namespace)
+    return namespace['decode']
+
+def iter_rows(path, key):
+    """
+    逐列讀回輸出檔的資料（.pgcopy / .tsv / COPY 區塊 / multi-row INSERT），yield tuple。
+    文字格式的日期時間 / text[] 維持字串；INSERT 的字串可能跨行（description 等），引號成對才算一列結束。
+    """
+    table = TABLE_SPECS[key][1]
+    if path.endswith('.pgcopy'):
+        yield from read_pgcopy(path, BINARY_COPY_TYPES[table])
+        return
+    parse_copy = row_decoder('copy', tuple(COLUMN_TYPES[key]))
+    parse_sql = row_decoder('sql', tuple(COLUMN_TYPES[key]))
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.tsv'):
+            for line in f:
+                yield parse_copy(line)
+            return
+        in_copy = False
+        pending = ''
+        for line in f:
+            if pending or (not in_copy and line.startswith('(')):
+                pending += line
+                if pending.count("'") % 2:
+                    continue    # 字串還沒結束
+                yield parse_sql(pending)
+                pending = ''
+            elif in_copy:
+                if line.startswith('\\.'):
+                    in_copy = False
+                else:
+                    yield parse_copy(line)
+            elif line.startswith('COPY '):
+                in_copy = True
+
+def validate_output(directory='.', tables=None):
+    """
+    逐表列出輸出檔與列數，回傳 {key: 列數}；有表缺檔時回傳的 dict 中該表為 None。
+    tables 為 None 時檢查 LOAD_ORDER 中所有資料表，以及有輸出的快照表（--search-snapshot）。
+    """
+    keys = [key for key in LOAD_ORDER if tables is None or key in tables]
+    if tables is None:
+        keys += [key for key in SNAPSHOT_TABLES if find_table_file(key, directory)]
+    counts = {}
+    for key in keys:
+        path = find_table_file(key, directory)
+        if path is None:
+            print(f"❌ {key}: 找不到 {TABLE_SPECS[key][0]}")
+            counts[key] = None
+            continue
+        counts[key] = count_rows(path, TABLE_SPECS[key][1])
+        print(f"✅ {key}: {counts[key]} 列（{os.path.basename(path)}）")
+
+    if tables is None:
+        merged = [name for name in MERGED_FILES if os.path.exists(os.path.join(directory, name))]
+        if merged:
+            print(f"✅ 載入腳本: {', '.join(merged)}")
+        else:
+            print(f"⚠️ 找不到 {' / '.join(MERGED_FILES)}")
+    return counts
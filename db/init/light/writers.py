@@ -0,0 +1,761 @@
+"""
+各種輸出格式的 writer（multi-row INSERT / COPY text / TSV / binary PGCOPY）與各表的輸出設定。
+"""
+import itertools
+import os
+import shutil
+import struct
+import uuid
+from collections import namedtuple
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+from . import config
+
+
+def sql_value(value):
+    if value is None:
+        return 'NULL'
+    
+    if isinstance(value, str):
+        safe = value.replace("'", "''")
+        return f"'{safe}'"
+    
+    if isinstance(value, uuid.UUID):
+        return f"'{value}'"
+    
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    
+    if isinstance(value, datetime):
+        # 支援 tz-aware datetime
+        return f"'{value.strftime('%Y-%m-%d %H:%M:%S%z')}'"
+    
+    if isinstance(value, date):
+        return f"'{value.strftime('%Y-%m-%d')}'"
+    
+    return str(value)
+
+class TableWriter:
+    """
+    各種輸出格式 writer 的共同介面：write() 逐筆寫入、with 結束時 close()。
+    fragment=True 時只寫資料本身（不含檔頭 / 檔尾），給 shard 的 part 檔使用，
+    主程序再用 append_part() 依 shard 順序接回完整檔案。
+    batch 為還沒寫出的列（已經依 kind 編碼好），flush() 時寫出並換成新的 list。
+    """
+    binary = False
+    kind = None     # batch 中每列的編碼：'sql' / 'copy'（row_encoder）或 'binary'（PGCOPY）
+
+    def _open(self, filename, fragment):
+        self.filename = filename
+        self.fragment = fragment
+        self.batch = []
+        self.count = 0
+        if self.binary:
+            self.f = open(filename, 'wb')
+        else:
+            self.f = open(filename, 'w', encoding='utf-8')
+
+    def append_part(self, part_path, count):
+        """把 shard 寫好的 part 檔接到目前位置，接完刪除 part 檔。"""
+        self.flush()
+        if self.binary:
+            fin = open(part_path, 'rb')
+        else:
+            fin = open(part_path, 'r', encoding='utf-8')
+        with fin:
+            shutil.copyfileobj(fin, self.f)
+        os.remove(part_path)
+        self.count += count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class SqlBatchWriter(TableWriter):
+    """
+    串流寫入 multi-row INSERT：write() 逐筆加入，滿 batch_size 才輸出一次，
+    整張表不需要先放在記憶體裡。搭配 with 使用，結束時自動寫 COMMIT。
+    """
+    kind = 'sql'
+
+    def __init__(self, filename, table, columns, comment, batch_size=1000, fragment=False, types=None):
+        self._open(filename, fragment)
+        self.insert_sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES\n"
+        self.batch_size = batch_size
+        # types（COLUMN_TYPES）已知時用預先編好的整列 encoder，否則逐欄 sql_value
+        self.encode = row_encoder('sql', tuple(types or ['any'] * len(columns)))
+        if not fragment:
+            self.f.write(f"-- {comment}\n\nBEGIN;\n\n")
+
+    def write(self, values):
+        self.batch.append(self.encode(values))
+        self.count += 1
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.f.write(self.insert_sql)
+            self.f.write(",\n".join(self.batch) + ";\n\n")
+            self.batch = []
+
+    def close(self):
+        self.flush()
+        if not self.fragment:
+            self.f.write("COMMIT;\n")
+        self.f.close()
+
+def copy_value(value):
+    """
+    COPY text format 的欄位值：NULL 為 \\N，字串跳脫 \\ / tab / 換行，
+    日期時間格式與 sql_value 相同（只是不加引號）。
+    """
+    if value is None:
+        return '\\N'
+
+    if isinstance(value, str):
+        if '\\' in value or '\t' in value or '\n' in value or '\r' in value:
+            value = (value.replace('\\', '\\\\').replace('\t', '\\t')
+                          .replace('\n', '\\n').replace('\r', '\\r'))
+        return value
+
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S%z')
+
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+
+    return str(value)
+
+class CopyTextWriter(TableWriter):
+    """
+    與 SqlBatchWriter 相同介面，但輸出 PostgreSQL COPY text format。
+    with_header=True 時包成 `COPY table (cols) FROM STDIN; ... \\.` 區塊（.sql 可直接給 psql）；
+    False 時只寫純資料列（.tsv，用 \\copy 載入）。
+    """
+    kind = 'copy'
+
+    def __init__(self, filename, table, columns, comment, batch_size=1000, with_header=True, fragment=False,
+                 types=None):
+        self._open(filename, fragment)
+        self.batch_size = batch_size
+        self.encode = row_encoder('copy', tuple(types or ['any'] * len(columns)))
+        self.with_header = with_header and not fragment
+        if self.with_header:
+            self.f.write(f"-- {comment.replace('INSERT', 'COPY')}\n\nCOPY {table} ({', '.join(columns)}) FROM STDIN;\n")
+
+    def write(self, values):
+        self.batch.append(self.encode(values))
+        self.count += 1
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.f.writelines(self.batch)
+            self.batch = []
+
+    def close(self):
+        self.flush()
+        if self.with_header:
+            self.f.write("\\.\n\n")
+        self.f.close()
+
+# ---------------------------
+# 預先編好的整列 encoder：每張表的欄位型別固定（COLUMN_TYPES），
+# 依型別挑好每一欄的 formatter，再產生一個以單一 f-string 格式化整列的函式，
+# 不必每一格都跑一次 sql_value / copy_value 的 isinstance 判斷與 strftime。
+# 每個 formatter 只處理預期的型別，遇到其他值（None 等）一律交回 sql_value / copy_value，輸出與逐欄格式化完全相同。
+# ---------------------------
+_TZ_SUFFIX = {}    # utcoffset -> strftime('%z') 的結果
+_last_datetime = [None, None]
+
+# isoformat() 是 C 實作，前 10 / 19 個字元與 strftime('%Y-%m-%d %H:%M:%S') 相同（微秒在後面，切掉即可）
+def _format_date(v):
+    if v.year < 1000:    # strftime 的 %Y 不補零，交給 strftime 保持一致
+        return v.strftime('%Y-%m-%d')
+    return v.isoformat()
+
+def _format_datetime(v):
+    # 同一個 datetime 物件常連續出現很多列（例如同一次 push 的所有 receiver），直接沿用上一次的結果
+    if v is _last_datetime[0]:
+        return _last_datetime[1]
+    if v.year < 1000:
+        return v.strftime('%Y-%m-%d %H:%M:%S%z')
+    offset = v.utcoffset()
+    suffix = _TZ_SUFFIX.get(offset)
+    if suffix is None:
+        suffix = _TZ_SUFFIX[offset] = v.strftime('%z')
+    text = v.isoformat(' ')[:19] + suffix
+    _last_datetime[:] = v, text
+    return text
+
+def _sql_text(v):
+    if type(v) is str:
+        return "'" + v.replace("'", "''") + "'"
+    return sql_value(v)
+
+def _sql_number(v):
+    if type(v) is int or type(v) is float:
+        return str(v)
+    return sql_value(v)
+
+def _sql_bool(v):
+    if v is True:
+        return 'TRUE'
+    if v is False:
+        return 'FALSE'
+    return sql_value(v)
+
+def _sql_date(v):
+    if type(v) is date:
+        return "'" + _format_date(v) + "'"
+    return sql_value(v)
+
+def _sql_datetime(v):
+    if type(v) is datetime:
+        return "'" + _format_datetime(v) + "'"
+    return sql_value(v)
+
+def _copy_text(v):
+    if type(v) is str:
+        if '\\' in v or '\t' in v or '\n' in v or '\r' in v:
+            return copy_value(v)
+        return v
+    return copy_value(v)
+
+def _copy_number(v):
+    if type(v) is int or type(v) is float:
+        return str(v)
+    return copy_value(v)
+
+def _copy_bool(v):
+    if v is True:
+        return 't'
+    if v is False:
+        return 'f'
+    return copy_value(v)
+
+def _copy_date(v):
+    if type(v) is date:
+        return _format_date(v)
+    return copy_value(v)
+
+def _copy_datetime(v):
+    if type(v) is datetime:
+        return _format_datetime(v)
+    return copy_value(v)
+
+def array_literal(values):
+    """text[] 的陣列字面值 '{"a","b"}'：元素一律加雙引號（跳脫 \\ 與 "），None 為 NULL。"""
+    return '{' + ','.join('NULL' if v is None else '"' + v.replace('\\', '\\\\').replace('"', '\\"') + '"'
+                          for v in values) + '}'
+
+def _sql_text_array(v):
+    if type(v) is tuple or type(v) is list:
+        return _sql_text(array_literal(v))
+    return sql_value(v)
+
+def _copy_text_array(v):
+    if type(v) is tuple or type(v) is list:
+        return _copy_text(array_literal(v))
+    return copy_value(v)
+
+# 輸出格式 -> (欄位型別 -> formatter, 列開頭, 欄位分隔, 列結尾)；'any' 為不知道型別時的逐欄格式化
+TEXT_FORMATTERS = {
+    'sql': ({'uuid': _sql_text, 'text': _sql_text, 'int4': _sql_number, 'float8': _sql_number,
+             'bool': _sql_bool, 'date': _sql_date, 'timestamptz': _sql_datetime, 'timestamp': _sql_datetime,
+             'text[]': _sql_text_array, 'any': sql_value}, '(', ', ', ')'),
+    'copy': ({'uuid': _copy_text, 'text': _copy_text, 'int4': _copy_number, 'float8': _copy_number,
+              'bool': _copy_bool, 'date': _copy_date, 'timestamptz': _copy_datetime, 'timestamp': _copy_datetime,
+              'text[]': _copy_text_array, 'any': copy_value}, '', '\t', '\n'),
+}
+
+def _fstring_literal(s):
+    return (s.replace('\\', '\\\\').replace('\n', '\\n').replace('\t', '\\t')
+             .replace('"', '\\"').replace('{', '{{').replace('}', '}}'))
+
+@lru_cache(maxsize=None)
+def row_encoder(kind, types):
+    """
+    回傳 encode(row) -> str：依 types（tuple）把一整列格式化成 INSERT 的 '(...)'（kind='sql'）
+    或 COPY text 的一行（kind='copy'）。同一組 (kind, types) 只產生一次，例如 push_record 的 sql encoder 相當於
+        def encode(row):
+            v0, v1, v2, v3, v4, = row
+            return f"({f0(v0)}, {f1(v1)}, {f2(v2)}, {f3(v3)}, {f4(v4)})"
+    """
+    formatters, prefix, sep, suffix = TEXT_FORMATTERS[kind]
+    namespace = {f"f{i}": formatters[t] for i, t in enumerate(types)}
+    fields = _fstring_literal(sep).join(f"{{f{i}(v{i})}}" for i in range(len(types)))
+    source = (f"def encode(row):\n"
+              f"    {''.join(f'v{i}, ' for i in range(len(types)))}= row\n"
+              f"    return f\"{_fstring_literal(prefix)}{fields}{_fstring_literal(suffix)}\"\n")
+    exec(source, namespace)
+    return namespace['encode']
+
+# ---------------------------
+# Binary PGCOPY（COPY ... WITH (FORMAT binary)）
+# 欄位直接編成 PostgreSQL wire format，不經過 strftime / f-string
+# ---------------------------
+PGCOPY_SIGNATURE = b'PGCOPY\n\xff\r\n\x00'
+PG_EPOCH = datetime(2000, 1, 1)
+PG_EPOCH_UTC = datetime(2000, 1, 1, tzinfo=timezone.utc)
+PG_EPOCH_DATE = date(2000, 1, 1)
+ONE_MICROSECOND = timedelta(microseconds=1)
+VERIFY_SAMPLE_ROWS = 1000   # --verify-binary 只比對每個檔案（或 part 檔）的前幾筆
+
+_int16 = struct.Struct('!h')
+_int32 = struct.Struct('!i')
+_int64 = struct.Struct('!q')
+_float8 = struct.Struct('!d')
+_field_int32 = struct.Struct('!ii')    # (長度, 值)
+_field_int64 = struct.Struct('!iq')
+_field_float8 = struct.Struct('!id')
+_NULL_FIELD = _int32.pack(-1)
+
+def _encode_uuid(v):
+    return b'\x00\x00\x00\x10' + (v.bytes if isinstance(v, uuid.UUID) else bytes.fromhex(v.replace('-', '')))
+
+def _encode_text(v):
+    b = v.encode('utf-8')
+    return _int32.pack(len(b)) + b
+
+def _encode_int4(v):
+    return _field_int32.pack(4, v)
+
+def _encode_float8(v):
+    return _field_float8.pack(8, v)
+
+def _encode_bool(v):
+    return b'\x00\x00\x00\x01\x01' if v else b'\x00\x00\x00\x01\x00'
+
+def _encode_date(v):
+    return _field_int32.pack(4, (v - PG_EPOCH_DATE).days)
+
+# 時間欄位與 sql_value / copy_value 一樣只到秒（文字格式 '%Y-%m-%d %H:%M:%S%z' 會捨去微秒）
+def _encode_timestamptz(v):
+    return _field_int64.pack(8, (v.replace(microsecond=0) - PG_EPOCH_UTC) // ONE_MICROSECOND)
+
+def _encode_timestamp(v):
+    # TIMESTAMP (without time zone)：與文字載入相同，只保留當地時間、忽略時區
+    return _field_int64.pack(8, (v.replace(tzinfo=None, microsecond=0) - PG_EPOCH) // ONE_MICROSECOND)
+
+TEXT_OID = 25
+
+def _encode_text_array(v):
+    # 一維 text[]：ndim、has_null、元素型別 OID、(長度, 下界 1)，再接各元素（NULL 為長度 -1）
+    elements = [_NULL_FIELD if e is None else _encode_text(e) for e in v]
+    header = (struct.pack('!iii', 1, any(e is None for e in v), TEXT_OID) + struct.pack('!ii', len(v), 1)
+              if v else struct.pack('!iii', 0, 0, TEXT_OID))
+    body = header + b''.join(elements)
+    return _int32.pack(len(body)) + body
+
+PGCOPY_ENCODERS = {
+    'uuid': _encode_uuid,
+    'text': _encode_text,
+    'int4': _encode_int4,
+    'float8': _encode_float8,
+    'bool': _encode_bool,
+    'date': _encode_date,
+    'timestamptz': _encode_timestamptz,
+    'timestamp': _encode_timestamp,
+    'text[]': _encode_text_array,
+}
+
+# 各表輸出欄位（TABLE_SPECS 的 columns 順序）的型別，對應 01_schema.sql；
+# 文字格式用來挑 row_encoder 的 formatter，binary 大表用來挑 PGCOPY encoder
+COLUMN_TYPES = {
+    'user': ['uuid', 'text', 'text', 'text', 'text', 'text', 'text',
+             'bool', 'timestamptz', 'timestamptz', 'uuid', 'text'],
+    'department_profile': ['text', 'text', 'uuid'],
+    'company_profile': ['uuid', 'text', 'uuid', 'text'],
+    'student_profile': ['uuid', 'text', 'text', 'int4', 'int4'],
+    'user_application': ['uuid', 'text', 'text', 'text', 'text', 'text', 'text',
+                         'timestamptz', 'text', 'timestamptz', 'timestamptz', 'uuid', 'text'],
+    'student_gpa': ['uuid', 'text', 'float8'],
+    'student_course_record': ['uuid', 'text', 'text', 'text', 'int4', 'float8'],
+    'student_department': ['uuid', 'text', 'text', 'text', 'text'],
+    'resource': ['uuid', 'text', 'int4', 'uuid', 'text', 'date', 'text', 'text'],
+    'resource_condition': ['uuid', 'text', 'float8', 'float8', 'bool'],
+    'application': ['uuid', 'uuid', 'date', 'text'],
+    'achievement': ['uuid', 'uuid', 'text', 'text', 'text', 'date', 'date', 'timestamp', 'text'],
+    'achievement_verification': ['uuid', 'text', 'text', 'text', 'timestamp', 'timestamp'],
+    'push_record': ['int4', 'uuid', 'uuid', 'uuid', 'timestamp'],
+    'student_search_mv': ['uuid', 'text', 'text', 'text', 'int4', 'int4', 'float8', 'float8', 'text[]', 'text[]'],
+}
+
+# 大表使用 binary PGCOPY
+BINARY_COPY_TYPES = {key: COLUMN_TYPES[key] for key in ('student_course_record', 'push_record', 'resource_condition')}
+
+# 同一批資料中 uuid / 時間常常重複（同一次推播的 pusher、resource、時間，同一個學生的多筆選課），解碼結果直接快取
+@lru_cache(maxsize=1 << 16)
+def _decode_uuid(b):
+    h = b.hex()    # 比 str(uuid.UUID(bytes=b)) 快好幾倍
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+def _decode_text(b):
+    return b.decode('utf-8')
+
+def _decode_int4(b):
+    return _int32.unpack(b)[0]
+
+def _decode_float8(b):
+    return _float8.unpack(b)[0]
+
+def _decode_bool(b):
+    return b != b'\x00'
+
+@lru_cache(maxsize=1 << 16)
+def _decode_date(b):
+    return PG_EPOCH_DATE + timedelta(days=_int32.unpack(b)[0])
+
+@lru_cache(maxsize=1 << 16)
+def _decode_timestamptz(b):
+    return PG_EPOCH_UTC + timedelta(microseconds=_int64.unpack(b)[0])
+
+@lru_cache(maxsize=1 << 16)
+def _decode_timestamp(b):
+    return PG_EPOCH + timedelta(microseconds=_int64.unpack(b)[0])
+
+def _decode_text_array(b):
+    ndim = _int32.unpack(b[:4])[0]
+    if ndim == 0:
+        return []
+    if ndim != 1:
+        raise ValueError(f"只支援一維 text[]，收到 {ndim} 維")
+    n = _int32.unpack(b[12:16])[0]
+    pos, values = 20, []
+    for _ in range(n):
+        length = _int32.unpack(b[pos:pos + 4])[0]
+        pos += 4
+        if length == -1:
+            values.append(None)
+        else:
+            values.append(b[pos:pos + length].decode('utf-8'))
+            pos += length
+    return values
+
+PGCOPY_DECODERS = {
+    'uuid': _decode_uuid,
+    'text': _decode_text,
+    'int4': _decode_int4,
+    'float8': _decode_float8,
+    'bool': _decode_bool,
+    'date': _decode_date,
+    'timestamptz': _decode_timestamptz,
+    'timestamp': _decode_timestamp,
+    'text[]': _decode_text_array,
+}
+
+def _decode_field(pg_type, b):
+    if pg_type not in PGCOPY_DECODERS:
+        raise ValueError(f"未知的 PGCOPY 型別: {pg_type}")
+    return PGCOPY_DECODERS[pg_type](b)
+
+def read_pgcopy(filename, types):
+    """解碼 binary PGCOPY 檔，逐列 yield tuple（round-trip 檢查用）。"""
+    with open(filename, 'rb') as f:
+        skip_pgcopy_header(f, filename)
+        yield from iter_pgcopy_rows(f, types, filename)
+
+def skip_pgcopy_header(f, filename='PGCOPY'):
+    if f.read(len(PGCOPY_SIGNATURE)) != PGCOPY_SIGNATURE:
+        raise ValueError(f"{filename} 不是 PGCOPY 檔案")
+    f.read(4)                                  # flags
+    f.read(_int32.unpack(f.read(4))[0])        # header extension
+
+def iter_pgcopy_rows(f, types, filename='PGCOPY'):
+    """從 f 目前的位置逐列解碼到檔尾標記（或檔案結束，例如沒有檔頭檔尾的 part 檔）。"""
+    while True:
+        header = f.read(2)
+        if len(header) < 2:
+            return
+        nfields = _int16.unpack(header)[0]
+        if nfields == -1:
+            return
+        if nfields != len(types):
+            raise ValueError(f"{filename}: 欄位數 {nfields} 與預期 {len(types)} 不符")
+        row = []
+        for pg_type in types:
+            length = _int32.unpack(f.read(4))[0]
+            row.append(None if length == -1 else _decode_field(pg_type, f.read(length)))
+        yield tuple(row)
+
+def decode_pgcopy_rows(data, types, filename='PGCOPY'):
+    """
+    與 iter_pgcopy_rows 相同，但直接從記憶體中的 bytes 逐列解碼（沒有檔頭檔尾的連續資料列，例如 writer 的 batch），
+    不必每個欄位都 read() 一次。
+    """
+    decoders = [PGCOPY_DECODERS[t] for t in types]
+    unpack_int16, unpack_int32 = _int16.unpack_from, _int32.unpack_from
+    pos, end = 0, len(data)
+    while pos < end:
+        nfields = unpack_int16(data, pos)[0]
+        if nfields == -1:
+            return
+        if nfields != len(types):
+            raise ValueError(f"{filename}: 欄位數 {nfields} 與預期 {len(types)} 不符")
+        pos += 2
+        row = []
+        for decode in decoders:
+            length = unpack_int32(data, pos)[0]
+            pos += 4
+            if length == -1:
+                row.append(None)
+            else:
+                row.append(decode(data[pos:pos + length]))
+                pos += length
+        yield tuple(row)
+
+def pgcopy_normalize(pg_type, v):
+    """把寫入前的值換成解碼後會得到的形式，讓兩邊可以直接比對。"""
+    if v is None:
+        return None
+    if pg_type == 'uuid':
+        return str(v)
+    if pg_type == 'float8':
+        return float(v)
+    if pg_type == 'timestamp':
+        return v.replace(tzinfo=None, microsecond=0)
+    if pg_type == 'timestamptz':
+        return v.replace(microsecond=0).astimezone(timezone.utc)
+    if pg_type == 'text[]':
+        return list(v)
+    return v
+
+class PgBinaryCopyWriter(TableWriter):
+    """
+    與 SqlBatchWriter 相同介面，輸出 binary PGCOPY（\\copy ... WITH (FORMAT binary) 載入）。
+    verify=True 時記下前 VERIFY_SAMPLE_ROWS 筆，close() 後只解碼這幾筆逐欄比對（part 檔也各自比對），
+    不必把整個檔案再讀一次。
+    """
+    binary = True
+    kind = 'binary'
+
+    def __init__(self, filename, table, columns, types, batch_size=1000, verify=False, fragment=False):
+        self._open(filename, fragment)
+        self.columns = columns
+        self.types = types
+        self.encoders = [PGCOPY_ENCODERS[t] for t in types]
+        self.field_count = _int16.pack(len(columns))
+        self.batch_size = batch_size
+        self.sample = [] if verify else None
+        if not fragment:
+            self.f.write(PGCOPY_SIGNATURE + _int32.pack(0) + _int32.pack(0))
+
+    def write(self, values):
+        parts = [self.field_count]
+        for enc, v in zip(self.encoders, values):
+            parts.append(_NULL_FIELD if v is None else enc(v))
+        self.batch.append(b''.join(parts))
+        self.count += 1
+        if self.sample is not None and self.count <= VERIFY_SAMPLE_ROWS:
+            self.sample.append(tuple(values))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.batch:
+            self.f.write(b''.join(self.batch))
+            self.batch = []
+
+    def close(self):
+        self.flush()
+        if not self.fragment:
+            self.f.write(_int16.pack(-1))
+        self.f.close()
+        if self.sample:    # 接 part 檔的完整檔案沒有自己寫的列，由各 part 檔各自比對
+            self.verify()
+
+    def verify(self):
+        """解碼檔案開頭的 len(sample) 筆，與寫入前的值逐欄比對。"""
+        with open(self.filename, 'rb') as f:
+            if not self.fragment:
+                skip_pgcopy_header(f, self.filename)
+            decoded = list(itertools.islice(iter_pgcopy_rows(f, self.types, self.filename), len(self.sample)))
+        if len(decoded) != len(self.sample):
+            raise ValueError(f"❌ {self.filename} round-trip 失敗：寫入 {len(self.sample)} 筆，只解碼出 {len(decoded)} 筆")
+        for n, (source, row) in enumerate(zip(self.sample, decoded)):
+            for column, pg_type, v, got in zip(self.columns, self.types, source, row):
+                if pgcopy_normalize(pg_type, v) != got:
+                    raise ValueError(f"❌ {self.filename} round-trip 失敗：第 {n + 1} 列 {column} "
+                                     f"寫入 {v!r}，解碼為 {got!r}")
+        if not self.fragment:
+            print(f"✅ {self.filename} round-trip 檢查通過（前 {len(self.sample)} 筆）")
+
+# ---------------------------
+# 各表輸出設定：key -> (檔名, table, columns, 檔頭註解, batch_size)
+# shard 的 part 檔與主程序的完整檔案共用同一份設定
+# ---------------------------
+TABLE_SPECS = {
+    'user': (config.OUTPUT_SQL_FILE, '"user"',
+             ["user_id", "real_name", "email", "username", "password", "nickname", "role",
+              "is_admin", "registered_at", "deleted_at", "company_id", "department_id"],
+             "PostgreSQL INSERT script for 'user' table", 100),
+    'department_profile': ('insert_department_profile.sql', 'department_profile',
+                           ['department_id', 'department_name', 'contact_person'],
+                           "PostgreSQL INSERT script for 'department_profile' table", 100),
+    'company_profile': ('insert_company_profile.sql', 'company_profile',
+                        ['company_id', 'company_name', 'contact_person', 'industry'],
+                        "PostgreSQL INSERT script for 'company_profile' table", 100),
+    'student_profile': ('insert_student_profile.sql', 'student_profile',
+                        ['user_id', 'student_id', 'department_id', 'entry_year', 'grade'],
+                        "PostgreSQL INSERT script for 'student_profile' table", 100),
+    'user_application': ('user_application.sql', 'user_application',
+                         ["application_id", "real_name", "email", "username", "password", "nickname", "role",
+                          "registered_at", "status", "submit_time", "review_time", "reviewed_by", "review_comment"],
+                         "PostgreSQL INSERT script for 'user_application' table", 50),
+    'student_gpa': ('insert_student_gpa.sql', 'student_gpa', ['user_id', 'semester', 'gpa'],
+                    "PostgreSQL INSERT script for 'student_gpa' table (batch mode)", 1000),
+    'student_course_record': ('insert_student_course_record.sql', 'student_course_record',
+                              ['user_id', 'semester', 'course_id', 'course_name', 'credit', 'score'],
+                              "PostgreSQL INSERT script for 'student_course_record' table (batch mode)", 1000),
+    'student_department': ('insert_student_department.sql', 'student_department',
+                           ['user_id', 'department_id', 'role', 'start_semester', 'end_semester'],
+                           "insert for student_department (batch mode)", 1000),
+    'resource': ('insert_resource.sql', 'resource',
+                 ["resource_id", "resource_type", "quota", "supplier_id", "title", "deadline", "description", "status"],
+                 "PostgreSQL INSERT for resource (batch mode)", 1000),
+    'resource_condition': ('insert_resource_condition.sql', 'resource_condition',
+                           ["resource_id", "department_id", "avg_gpa", "current_gpa", "is_poor"],
+                           "PostgreSQL INSERT for resource_condition (batch mode)", 1000),
+    'application': ('insert_application.sql', 'application',
+                    ["user_id", "resource_id", "apply_date", "review_status"],
+                    "PostgreSQL INSERT for application (batch mode)", 1000),
+    'achievement': ('insert_achievement.sql', 'achievement',
+                    ["achievement_id", "user_id", "category", "title", "description",
+                     "start_date", "end_date", "creation_date", "status"],
+                    "PostgreSQL INSERT script for achievement (batch mode)", 1000),
+    'achievement_verification': ('insert_achievement_verification.sql', 'achievement_verification',
+                                 ["achievement_id", "verifier_type", "verifier_email", "verification_status",
+                                  "created_at", "decided_at"],
+                                 "PostgreSQL INSERT script for achievement_verification (batch mode)", 1000),
+    'push_record': ('insert_push_record.sql', 'push_record',
+                    ["push_id", "pusher_id", "receiver_id", "resource_id", "push_datetime"],
+                    "PostgreSQL INSERT script for push_record", 1000),
+    'student_search_mv': ('insert_student_search_snapshot.sql', 'student_search_snapshot',
+                          ["user_id", "real_name", "student_id", "department_id", "entry_year", "grade",
+                           "current_gpa", "avg_gpa", "courses_taken", "achievements"],
+                          "student_search_mv snapshot (load with load_student_search.sql)", 1000),
+}
+
+def _row_type_name(key):
+    return ''.join(part.title() for part in key.split('_')) + 'Row'
+
+# 各表的資料列型別：欄位順序與 TABLE_SPECS 相同的 namedtuple。
+# 本身就是 tuple（__slots__ = ()，沒有每筆一個 dict），writer 直接依序取值，產生端也能用 row.欄位 讀取
+ROW_TYPES = {key: namedtuple(_row_type_name(key), spec[2]) for key, spec in TABLE_SPECS.items()}
+
+# 各表依賴的上游表（對應 01_schema.sql 的 FK），tables 子指令與只產生部分表時使用
+TABLE_DEPENDS = {
+    'user': [],
+    'department_profile': ['user'],
+    'company_profile': ['user'],
+    'student_profile': ['user', 'department_profile'],
+    'user_application': ['user'],
+    'student_gpa': ['user'],
+    'student_course_record': ['user'],
+    'student_department': ['user', 'department_profile'],
+    'resource': ['user'],
+    'resource_condition': ['resource', 'department_profile'],
+    'application': ['user', 'resource'],
+    'achievement': ['user'],
+    'achievement_verification': ['achievement'],
+    'push_record': ['user', 'resource'],
+}
+
+# merged.sql / load_tsv.sql 的載入順序（FK 順序）
+LOAD_ORDER = ['user', 'department_profile', 'student_profile', 'company_profile', 'user_application',
+              'student_gpa', 'student_course_record', 'student_department', 'resource',
+              'resource_condition', 'application', 'achievement', 'achievement_verification', 'push_record']
+
+# 由其他表彙整出來的快照（不在 schema 裡，不進 LOAD_ORDER / merged.sql），只有 --search-snapshot 時產生
+SNAPSHOT_TABLES = ['student_search_mv']
+
+def table_selected(key):
+    """
+    --tables 沒指定時全部輸出；有指定時只輸出指定的表（其餘表仍會在記憶體中產生供下游使用）。
+    SNAPSHOT_TABLES 只看 --search-snapshot，與 --tables 無關。
+    """
+    if key in SNAPSHOT_TABLES:
+        return config.SEARCH_SNAPSHOT
+    return config.SELECTED_TABLES is None or key in config.SELECTED_TABLES
+
+def output_path(filename, table=None):
+    """實際輸出路徑：tsv / binary 模式下資料檔改為 .tsv，binary 大表為 .pgcopy，其餘維持 .sql。"""
+    if config.OUTPUT_FORMAT == 'binary' and table in BINARY_COPY_TYPES:
+        return filename[:-4] + '.pgcopy'
+    if config.OUTPUT_FORMAT in ('tsv', 'binary') and filename.endswith('.sql'):
+        return filename[:-4] + '.tsv'
+    return filename
+
+def table_output(key):
+    """TABLE_SPECS[key] 的 (table, columns, 實際路徑, 是否 binary)，產生 load_tsv.sql 時使用。"""
+    filename, table, columns = TABLE_SPECS[key][:3]
+    return table, columns, output_path(filename, table), config.OUTPUT_FORMAT == 'binary' and table in BINARY_COPY_TYPES
+
+def part_path(key, shard):
+    filename, table = TABLE_SPECS[key][:2]
+    return f"{output_path(filename, table)}.part{shard:05d}"
+
+def open_table_writer(key, part=None):
+    """
+    依 --format 回傳 TABLE_SPECS[key] 對應的 writer（INSERT / COPY / TSV / PGCOPY），介面都是 write() + with。
+    part 為 shard 編號時寫成不含檔頭檔尾的 part 檔，由主程序 append_part() 接回。
+    沒有被 --tables 選到的表回傳 NullWriter（只計數、不寫檔）；--check-constraints 時每列也送給 constraints.py 的 validator process 檢查。
+    """
+    filename, table, columns, comment, batch_size = TABLE_SPECS[key]
+    if not table_selected(key):
+        return NullWriter(filename)
+    path = output_path(filename, table)
+    fragment = part is not None
+    if fragment:
+        path = part_path(key, part)
+
+    if config.OUTPUT_FORMAT == 'binary' and table in BINARY_COPY_TYPES:
+        writer = PgBinaryCopyWriter(path, table, columns, BINARY_COPY_TYPES[table], batch_size,
+                                    verify=config.VERIFY_BINARY, fragment=fragment)
+    elif config.OUTPUT_FORMAT == 'copy':
+        writer = CopyTextWriter(path, table, columns, comment, batch_size, fragment=fragment, types=COLUMN_TYPES[key])
+    elif config.OUTPUT_FORMAT in ('tsv', 'binary'):
+        writer = CopyTextWriter(path, table, columns, comment, batch_size, with_header=False, fragment=fragment,
+                                types=COLUMN_TYPES[key])
+    else:
+        writer = SqlBatchWriter(path, table, columns, comment, batch_size, fragment=fragment, types=COLUMN_TYPES[key])
+    if config.CHECK_CONSTRAINTS:
+        from .constraints import attach_checks
+        writer = attach_checks(key, writer)
+    return writer
+
+class NullWriter(TableWriter):
+    """沒有被選到的表：介面與其他 writer 相同，但只計數、不寫任何檔案。"""
+    def __init__(self, filename):
+        self.filename = filename
+        self.fragment = False
+        self.count = 0
+
+    def write(self, values):
+        self.count += 1
+
+    def append_part(self, part_path, count):
+        self.count += count
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+def stitch_parts(key, results, writer=None):
+    """依 shard 順序把各 part 檔接成完整的表格檔；writer 已開啟時接在其後面。"""
+    w = writer or open_table_writer(key)
+    with w:
+        for r in results:
+            w.append_part(part_path(key, r['shard']), r['parts'][key])
+    return w
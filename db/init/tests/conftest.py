@@ -0,0 +1,5 @@
+import os
+import sys
+
+# light 套件位於 db/init（與 python -m light 相同，以 PYTHONPATH=db/init 匯入）
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,127 @@
+"""--check-constraints 的 validator：key 集合的 hash 碰撞、各輸出格式編碼好的 batch 解碼後的檢查。"""
+import pytest
+
+from light.constraints import KeySet, ConstraintValidator, ConstraintViolation, parse_schema
+from light.writers import COLUMN_TYPES, PgBinaryCopyWriter, TABLE_SPECS, row_encoder
+
+
+class Colliding:
+    """hash 全部相同、值不同的 key：模擬 64-bit hash 碰撞。"""
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return 42
+
+    def __eq__(self, other):
+        return isinstance(other, Colliding) and self.value == other.value
+
+    def __repr__(self):
+        return f"Colliding({self.value!r})"
+
+
+def test_hash_collision_is_not_a_duplicate():
+    keys = KeySet('user', 'PRIMARY KEY(user_id)')
+    for chunk in range(3):
+        for i in range(4):
+            value = Colliding(chunk * 4 + i)
+            keys.recent[value] = (value,)
+        keys.flush()
+    assert len(keys) == 12
+    keys.close()
+
+
+def test_duplicate_across_chunks_is_confirmed():
+    keys = KeySet('user', 'PRIMARY KEY(user_id)')
+    keys.recent.update({Colliding(1): ('a',), Colliding(2): ('b',)})
+    keys.flush()
+    keys.recent[Colliding(2)] = ('c',)
+    with pytest.raises(ConstraintViolation, match=r"PRIMARY KEY\(user_id\).*\['c'\]"):
+        keys.flush()
+    keys.close()
+
+
+def test_runs_merge_logarithmically():
+    """每次 flush 一段，一樣大的 run 才合併：16 段只剩 1 段，之後 3 段對應二進位 11；舊 run 中的重複仍抓得到。"""
+    keys = KeySet('user', 'PRIMARY KEY(user_id)')
+    for chunk in range(19):
+        keys.recent.update({f"k{chunk}-{i}": (i,) for i in range(8)})
+        keys.flush()
+        if chunk == 15:
+            assert [len(h) for h, _ in keys.runs] == [128]
+    assert [len(h) for h, _ in keys.runs] == [128, 16, 8]
+    assert all((h[1:] >= h[:-1]).all() for h, _ in keys.runs)
+    keys.recent['k3-5'] = ('again',)
+    with pytest.raises(ConstraintViolation, match=r"\['again'\]"):
+        keys.flush()
+    keys.close()
+
+
+def test_missing_checks_recent_and_flushed_keys():
+    keys = KeySet('user', 'PRIMARY KEY(user_id)')
+    keys.recent.update({'a': ('a',), 'b': ('b',)})
+    keys.flush()
+    keys.recent['c'] = ('c',)
+    assert keys.missing(['a', 'x', 'c', 'b', 'y']) == [1, 4]
+    keys.close()
+
+
+USER = '00000000-0000-0000-0000-000000000001'
+GPA_ROWS = [(USER, '113-1', 3.9), (USER, '113-2', None)]
+
+
+def encoded(kind, key, rows, tmp_path):
+    """rows 依 kind 編碼成 writer batch 送給 validator 的樣子。"""
+    types = COLUMN_TYPES[key]
+    if kind == 'binary':
+        path = tmp_path / f"{key}.pgcopy"
+        with PgBinaryCopyWriter(str(path), key, TABLE_SPECS[key][2], types, fragment=True) as w:
+            for row in rows:
+                w.write(row)
+        return path.read_bytes()
+    return '\x00'.join(map(row_encoder(kind, tuple(types)), rows))
+
+
+@pytest.fixture
+def validator():
+    v = ConstraintValidator(parse_schema())
+    v.refs[('user', 'user_id')].recent[USER] = (USER,)
+    yield v
+    v.finish()
+
+
+@pytest.mark.parametrize('kind', ['sql', 'copy', 'binary'])
+def test_encoded_batches_are_checked(validator, kind, tmp_path):
+    validator.check([('student_gpa', kind, encoded(kind, 'student_gpa', GPA_ROWS, tmp_path))])
+    assert validator.rows == 2
+    bad = [(USER, '113-3', 4.5)]
+    with pytest.raises(ConstraintViolation, match=r"gpa CHECK\(gpa BETWEEN 0 AND 4.3\)"):
+        validator.check([('student_gpa', kind, encoded(kind, 'student_gpa', bad, tmp_path))])
+
+
+@pytest.mark.parametrize('kind', ['sql', 'copy'])
+def test_foreign_key_and_unique(validator, kind, tmp_path):
+    other = '00000000-0000-0000-0000-000000000002'
+    with pytest.raises(ConstraintViolation, match=r"REFERENCES user\(user_id\)"):
+        validator.check([('student_gpa', kind, encoded(kind, 'student_gpa', [(other, '113-1', 3.0)], tmp_path))])
+    validator.check([('student_gpa', kind, encoded(kind, 'student_gpa', GPA_ROWS[:1], tmp_path))])
+    with pytest.raises(ConstraintViolation, match=r"PRIMARY KEY\(user_id, semester\)"):
+        validator.check([('student_gpa', kind, encoded(kind, 'student_gpa', GPA_ROWS[:1], tmp_path))])
+
+
+def test_foreign_key_to_keys_checked_in_this_run(tmp_path):
+    """上游表與下游表都在這次產生：FK 直接查上游 PK 的 KeySet，已經 flush 出 recent 的 key 也查得到。"""
+    validator = ConstraintValidator(parse_schema())
+    ids = [f'00000000-0000-0000-0000-0000000001{i:02d}' for i in range(3)]
+    achievements = [(a, None, 'Research', 'title', 'desc', None, None, None, 'recognized') for a in ids]
+    validator.check([('achievement', 'copy', encoded('copy', 'achievement', achievements, tmp_path))])
+    validator.refs[('achievement', 'achievement_id')].flush()
+
+    def verification(achievement_id):
+        row = (achievement_id, 'professor', 'a@example.com', 'pending', None, None)
+        return [('achievement_verification', 'copy', encoded('copy', 'achievement_verification', [row], tmp_path))]
+
+    validator.check(verification(ids[1]))
+    with pytest.raises(ConstraintViolation, match=r"achievement_id REFERENCES achievement\(achievement_id\)"):
+        validator.check(verification('00000000-0000-0000-0000-000000000999'))
+    validator.finish()
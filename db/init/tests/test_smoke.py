@@ -0,0 +1,44 @@
+"""以極小的 --scale-factor 實際跑一次 python -m light generate / bench：確認資源、學生只有個位數時整條流程不會出錯。"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+INIT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_ROOT = os.path.dirname(os.path.dirname(INIT_DIR))
+CSV_FILES = ['學系代碼表.csv', '課程_校碼3.csv']
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    """放好學系 / 課程 CSV 的空目錄（與在專案根目錄執行相同）。"""
+    for name in CSV_FILES:
+        shutil.copy(os.path.join(REPO_ROOT, name), tmp_path / name)
+    return tmp_path
+
+
+def run_light(workdir, *args):
+    env = dict(os.environ, PYTHONPATH=INIT_DIR)
+    result = subprocess.run([sys.executable, '-m', 'light', *args], cwd=workdir, env=env,
+                            capture_output=True, text=True, timeout=300)
+    assert result.returncode == 0, result.stdout[-2000:] + result.stderr[-2000:]
+    return result
+
+
+@pytest.mark.parametrize('scale_factor', ['0.01', '0.002'])
+def test_generate_tiny_scale_factor(workdir, scale_factor):
+    """NUM_RESOURCE 只有 1～2 個，比每位學生最多申請的數量還少。"""
+    run_light(workdir, 'generate', '--scale-factor', scale_factor)
+    assert (workdir / 'insert_application.sql').stat().st_size > 0
+
+
+def test_bench_runs_every_stage(workdir):
+    """bench 的每個階段都要跑得完（各階段自己重組 shard 結果，改了 pipeline 的結構容易漏改）。"""
+    from light.bench import STAGES
+    run_light(workdir, 'bench', '--scale-factors', '0.01', '--no-memory')
+    with open(workdir / 'bench_results.json', encoding='utf-8') as f:
+        run, = json.load(f)['runs']
+    assert [s['stage'] for s in run['stages']] == [name for name, _ in STAGES]